@@ -0,0 +1,180 @@
+""" Benchmark of hdtPoissonDiscSampling for increasing radius/domain ratios.
+
+    Compares the current implementation with the previous one (list based active lists with
+    pop(index) and a linear level scan) to show how generation time scales with the number of
+    samples. The legacy sampler is quadratic so it is only run up to --legacy-max-ratio.
+
+    Usage: python benchmarks/bench_hdt.py [--ratios 100 250 500 1000 2500 5000] [--legacy-max-ratio 500]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import hdt
+from hdt import farthestCornerDistance, euclideanDistance
+
+# Lookup grid of the legacy sampler with one list of points per cell of the disc radius
+
+def isOutOfRange(x, min, max):
+    """ Checks if the given value is outside of the given interval.
+        Params
+        ===
+            x: Value of which to test
+            min: Minimum value of the interval
+            max: Maximum value of the interval
+    """
+    return  x < min or x > max
+
+def checkNeighboursMinDistance(lookupGrid, cX, cZ, row, col, gridDims, radius, squareLength = 0):
+    """ In a 3x3 neighbourhood from the given lookup grid, check min distance based on given disc radius.
+        Function returns true if no points lays within the minimum distance of given coordinates.
+        Params
+        ===
+            lookupGrid: An acceleration grid for quickly getting points close to each other
+            cX: X-coordinate of point to check min distance
+            cZ: Z-coordinate of point to check min distance
+            row: Row index for the lookup grid of the point to check min distance
+            col: Column index for the lookup grid of the point to check min distance
+            gridDims: Num of rows and columns of the lookup grid
+            radius: The radius used to check min distance
+            squareLength (optional): Side length of a square to check if its covered by a point based on min distance
+            return: A boolean set to True if the min distance check is passed
+    """
+    for i in range(-1, 2):
+            # Make sure not to look outside of grid range
+            if isOutOfRange(row + i, 0, gridDims - 1):
+                continue
+                
+            for j in range(-1, 2):
+                # Make sure not to look outside of grid range
+                if isOutOfRange(col + j, 0, gridDims - 1):
+                    continue 
+                 
+                lookupIndex = gridDims * (row + i) + (col + j)
+                
+                # Do minimum distance check with all points in current grid cell
+                for point in lookupGrid[lookupIndex]:
+                    # If a square length is provided, check if the square is clear from a point
+                    if squareLength > 0:
+                        if farthestCornerDistance(point, (cX, cZ), squareLength) < radius:
+                            return False
+                    else:
+                        if euclideanDistance(point, (cX, cZ)) < radius:
+                            return False
+                        
+    return True
+
+def legacyHdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, maxIterations = None):
+    """ The previous implementation of hdtPoissonDiscSampling without the progress window. """
+    length = max(xMax - xMin, zMax - zMin)
+    baseLength = length / math.ceil( length * ( 1.41421356237 / radius ) )
+    numColumns = int(length / baseLength)
+    radiusInvert = 1 / radius
+
+    maxLevels = 16
+    xValues = [ xMin + baseLength * i for i in range(numColumns) ]
+    zValues = [ zMin + baseLength * ( i + 1 ) for i in range(numColumns) ]
+    activeLists = [ [] for _ in range(maxLevels) ]
+    for i in range(numColumns):
+        for j in range(numColumns):
+            activeLists[0].append((xValues[i], zValues[j]))
+
+    activeListAreas = [0] * maxLevels
+    areaTotal = length * length
+    activeListAreas[0] = areaTotal
+
+    gridDims = int(length * radiusInvert) + 1
+    lookupGrid = [ [] for _ in range(gridDims*gridDims) ]
+
+    samples = []
+    numIterations = 0
+    while areaTotal > 0.00001:
+        if maxIterations is not None and numIterations > maxIterations:
+            break
+        numIterations += 1
+
+        currentSquare = None
+        activeListIndex = 0
+        previous = 0.0
+        probabilityProportionalToArea = areaTotal * random.uniform(0, 0.999999)
+        for i in range(len(activeLists)):
+            if len(activeLists[i]) > 0:
+                if previous <= probabilityProportionalToArea and probabilityProportionalToArea < activeListAreas[i]:
+                    randomIndex = random.randint( 0, len(activeLists[i]) - 1 )
+                    currentSquare = activeLists[i][randomIndex]
+                    activeLists[i].pop(randomIndex)
+                    activeListIndex = i
+                    break
+            previous = activeListAreas[i]
+
+        if currentSquare == None:
+            continue
+
+        squareLength = baseLength / pow(2, activeListIndex)
+        squareArea = squareLength * squareLength
+        activeListAreas[activeListIndex] = max(activeListAreas[activeListIndex] - squareArea, 0)
+        areaTotal = max(areaTotal - squareArea, 0)
+
+        sX = currentSquare[0] + (squareLength * 0.5)
+        sZ = currentSquare[1] - (squareLength * 0.5)
+        sRow = int((sZ - zMin) * radiusInvert)
+        sCol = int((sX - xMin) * radiusInvert)
+        if checkNeighboursMinDistance(lookupGrid, sX, sZ, sRow, sCol, gridDims, radius, squareLength) == False:
+            continue
+
+        rX = currentSquare[0] + random.uniform(0, 1) * squareLength
+        rZ = currentSquare[1] - random.uniform(0, 1) * squareLength
+        rRow = int((rZ - zMin) * radiusInvert)
+        rCol = int((rX - xMin) * radiusInvert)
+        if checkNeighboursMinDistance(lookupGrid, rX, rZ, rRow, rCol, gridDims, radius):
+            lookupIndex = gridDims * rRow + rCol
+            if lookupIndex < len(lookupGrid):
+                lookupGrid[lookupIndex].append((rX, rZ))
+                samples.append((rX, rZ))
+        elif (activeListIndex + 1) < maxLevels:
+            childLength = squareLength * 0.5
+            childArea = (childLength * childLength)
+            for i in range(2):
+                for j in range(2):
+                    childX = (currentSquare[0] + (childLength * i)) + (childLength * 0.5)
+                    childZ = (currentSquare[1] - (childLength * j)) - (childLength * 0.5)
+                    if checkNeighboursMinDistance(lookupGrid, sX, sZ, sRow, sCol, gridDims, radius, childLength):
+                        activeLists[activeListIndex + 1].append((childX, childZ))
+                        activeListAreas[activeListIndex + 1] += childArea
+                        areaTotal += childArea
+
+    return samples
+
+def timeSampler(sampler, ratio, seed):
+    random.seed(seed)
+    start = time.perf_counter()
+    samples = sampler(0.0, float(ratio), 0.0, float(ratio), 1.0, None)
+    return len(samples), time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ratios', type=int, nargs='+', default=[100, 250, 500, 1000, 2500, 5000],
+                        help='Domain side length divided by the disc radius')
+    parser.add_argument('--legacy-max-ratio', type=int, default=500,
+                        help='Largest ratio to run the legacy sampler for')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print('%8s  %-8s %10s %10s %12s' % ('ratio', 'sampler', 'samples', 'seconds', 'us/sample'))
+    for ratio in args.ratios:
+        runs = [ ('current', hdt.hdtPoissonDiscSampling) ]
+        if ratio <= args.legacy_max_ratio:
+            runs.append(('legacy', legacyHdtPoissonDiscSampling))
+        for name, sampler in runs:
+            numSamples, seconds = timeSampler(sampler, ratio, args.seed)
+            print('%8s  %-8s %10d %10.2f %12.2f' % ('1:%d' % ratio, name, numSamples, seconds,
+                                                    1e6 * seconds / max(numSamples, 1)))
+            sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+""" Speedup benchmark of parallelHdtPoissonDiscSampling for an increasing number of worker processes.
+
+    Every run uses the same seed, the benchmark checks that all worker counts produce the same samples
+    and that the minimum distance holds across tile borders.
+
+    Usage: python benchmarks/bench_parallel_hdt.py [--ratio 1000] [--workers 1 4 8 16] [--tiles-per-side 16]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from parallel_hdt import parallelHdtPoissonDiscSampling
+
+def minimumDistance(samples, radius):
+    """ Returns the smallest distance between two samples, using a grid with cell length = radius. """
+    grid = {}
+    for x, z in samples:
+        grid.setdefault( (int(x / radius), int(z / radius)), [] ).append((x, z))
+
+    minDistance = float('inf')
+    for (col, row), points in grid.items():
+        for i in range(-1, 2):
+            for j in range(-1, 2):
+                for other in grid.get((col + i, row + j), ()):
+                    for point in points:
+                        if point is not other:
+                            minDistance = min(minDistance, math.hypot(point[0] - other[0], point[1] - other[1]))
+    return minDistance
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ratio', type=int, default=1000, help='Domain side length divided by the disc radius')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--tiles-per-side', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print('cores available: %d' % (os.cpu_count() or 1))
+    print('%8s %10s %10s %10s' % ('workers', 'samples', 'seconds', 'speedup'))
+
+    reference = None
+    baseSeconds = None
+    for numWorkers in args.workers:
+        # Start the pool before timing so process start-up is not measured
+        executor = ProcessPoolExecutor(max_workers=numWorkers) if numWorkers > 1 else None
+        if executor is not None:
+            list( executor.map(abs, range(numWorkers)) )
+
+        start = time.perf_counter()
+        samples = parallelHdtPoissonDiscSampling( 0.0, float(args.ratio), 0.0, float(args.ratio), 1.0,
+                                                  numWorkers=numWorkers, tilesPerSide=args.tiles_per_side,
+                                                  seed=args.seed, executor=executor )
+        seconds = time.perf_counter() - start
+        if executor is not None:
+            executor.shutdown()
+
+        if baseSeconds is None:
+            baseSeconds = seconds
+        print('%8d %10d %10.2f %9.2fx' % (numWorkers, len(samples), seconds, baseSeconds / seconds))
+        sys.stdout.flush()
+
+        if reference is None:
+            reference = samples
+        elif samples != reference:
+            print('  samples differ from the %d worker run' % args.workers[0])
+
+    print('minimum distance: %.6f' % minimumDistance(reference, 1.0))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+""" Stand-in for maya.OpenMaya (API 1.0) with the classes used by the scatter tool.
+    Meshes are created with createMesh or createGridMesh and registered by name. MFnMesh.closestIntersection
+    is a NumPy ray/triangle test, so its timings measure the Python side of the calls, not Maya's intersector.
+"""
+import numpy as np
+
+# name -> FakeMesh
+meshes = {}
+
+class FakeMesh(object):
+    """ A polygon mesh with one normal per vertex.
+        Params
+        ===
+            name: Name of the mesh transform, the shape is name + 'Shape'
+            points: (V, 3) array of vertex positions
+            faceVertexCounts: Number of vertices of each face
+            faceVertexIds: Vertex ids of all faces, face after face
+    """
+    def __init__(self, name, points, faceVertexCounts, faceVertexIds):
+        self.name = name
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.faceVertexCounts = np.asarray(faceVertexCounts, dtype=np.int64)
+        self.faceVertexIds = np.asarray(faceVertexIds, dtype=np.int64)
+        faceOffsets = np.cumsum(self.faceVertexCounts) - self.faceVertexCounts
+
+        # Fan triangulation of each face
+        triangles = []
+        triangleFaces = []
+        triangleLocalIds = []
+        for face, (offset, count) in enumerate(zip(faceOffsets.tolist(), self.faceVertexCounts.tolist())):
+            for i in range(count - 2):
+                triangles.append( (self.faceVertexIds[offset], self.faceVertexIds[offset + i + 1], self.faceVertexIds[offset + i + 2]) )
+                triangleFaces.append(face)
+                triangleLocalIds.append(i)
+        self.triangles = np.array(triangles, dtype=np.int64).reshape(-1, 3)
+        self.triangleFaces = np.array(triangleFaces, dtype=np.int64)
+        self.triangleLocalIds = np.array(triangleLocalIds, dtype=np.int64)
+
+        # Area weighted vertex normals
+        corners = self.points[self.triangles]
+        triangleNormals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        normals = np.zeros_like(self.points)
+        for i in range(3):
+            np.add.at(normals, self.triangles[:, i], triangleNormals)
+        self.normals = normals / np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+
+        self.v0 = corners[:, 0]
+        self.edge1 = corners[:, 1] - corners[:, 0]
+        self.edge2 = corners[:, 2] - corners[:, 0]
+        self.triangleMin = corners.min(axis=1)
+        self.triangleMax = corners.max(axis=1)
+
+def createMesh(name, points, faceVertexCounts, faceVertexIds):
+    meshes[name] = FakeMesh(name, points, faceVertexCounts, faceVertexIds)
+    return meshes[name]
+
+def createGridMesh(name, size = 100.0, resolution = 100, height = None):
+    """ Creates a quad grid in the xz-plane centered at the origin.
+        Params
+        ===
+            name: Name of the mesh
+            size (optional): Side length of the grid
+            resolution (optional): Number of quads along each side
+            height (optional): Function height(x, z) applied to the vertices, flat if None
+            return: The FakeMesh
+    """
+    coordinates = np.linspace(-size * 0.5, size * 0.5, resolution + 1)
+    x, z = np.meshgrid(coordinates, coordinates)
+    y = np.zeros_like(x) if height is None else height(x, z)
+    points = np.column_stack(( x.ravel(), y.ravel(), z.ravel() ))
+
+    rows, cols = np.meshgrid(np.arange(resolution), np.arange(resolution), indexing='ij')
+    first = (rows * (resolution + 1) + cols).ravel()
+    # Counter-clockwise seen from above so the normals point up
+    faceVertexIds = np.column_stack(( first, first + resolution + 1, first + resolution + 2, first + 1 )).ravel()
+    return createMesh(name, points, np.full(resolution * resolution, 4), faceVertexIds)
+
+class MSpace(object):
+    kInvalid = 0
+    kTransform = 1
+    kPreTransform = 2
+    kPostTransform = 3
+    kWorld = 4
+    kObject = kPreTransform
+
+class MFloatPoint(object):
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0, w = 1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = w
+
+class MPoint(MFloatPoint):
+    pass
+
+class MFloatVector(object):
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __sub__(self, other):
+        return MFloatVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def length(self):
+        return (self.x * self.x + self.y * self.y + self.z * self.z) ** 0.5
+
+    def normalize(self):
+        length = self.length()
+        if length > 0:
+            self.x /= length
+            self.y /= length
+            self.z /= length
+        return self
+
+class MArray(object):
+    """ Base of the MIntArray, MPointArray and MFloatVectorArray stand-ins. """
+    def __init__(self, length = 0, value = 0):
+        self.values = [value] * length
+
+    def append(self, value):
+        self.values.append(value)
+
+    def set(self, value, index):
+        self.values[index] = value
+
+    def setLength(self, length):
+        self.values = self.values[:length] + [None] * max(length - len(self.values), 0)
+
+    def length(self):
+        return len(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+class MIntArray(MArray):
+    pass
+
+class MPointArray(MArray):
+    pass
+
+class MFloatVectorArray(MArray):
+    pass
+
+class Reference(object):
+    """ Value cell returned by the MScriptUtil pointer methods. """
+    def __init__(self, value):
+        self.value = value
+
+class MScriptUtil(object):
+    def __init__(self, value = 0):
+        self.reference = value if isinstance(value, Reference) else Reference(value)
+
+    def createFromInt(self, *values):
+        self.reference.value = values[0]
+
+    def createFromDouble(self, *values):
+        self.reference.value = values[0]
+
+    def asIntPtr(self):
+        return self.reference
+
+    asUintPtr = asIntPtr
+    asFloatPtr = asIntPtr
+    asDoublePtr = asIntPtr
+
+    def asInt(self):
+        return int(self.reference.value)
+
+    def asFloat(self):
+        return float(self.reference.value)
+
+    @staticmethod
+    def getFloat(pointer):
+        return float(pointer.value)
+
+    @staticmethod
+    def getInt(pointer):
+        return int(pointer.value)
+
+    @staticmethod
+    def getUint(pointer):
+        return int(pointer.value)
+
+class MDagPath(object):
+    def __init__(self):
+        self.name = None
+
+    def extendToShape(self):
+        pass
+
+    def fullPathName(self):
+        return '|{}|{}Shape'.format(self.name, self.name)
+
+    def partialPathName(self):
+        return self.name
+
+class MSelectionList(object):
+    def __init__(self):
+        self.names = []
+
+    def add(self, name):
+        # Strip components and DAG paths, shapes are named after their transform
+        name = name.split('.')[0].split('|')[-1]
+        if name.endswith('Shape') and name[:-5] in meshes:
+            name = name[:-5]
+        self.names.append(name)
+
+    def length(self):
+        return len(self.names)
+
+    def getDagPath(self, index, dagPath, *args):
+        dagPath.name = self.names[index]
+
+class MGlobal(object):
+    activeSelection = MSelectionList()
+
+    @staticmethod
+    def selectByName(name, *args):
+        MGlobal.activeSelection = MSelectionList()
+        MGlobal.activeSelection.add(name)
+
+    @staticmethod
+    def getActiveSelectionList(selectionList):
+        selectionList.names = list(MGlobal.activeSelection.names)
+
+class MMeshIsectAccelParams(object):
+    pass
+
+class MFnMesh(object):
+    def __init__(self, dagPath):
+        name = dagPath if isinstance(dagPath, str) else dagPath.name
+        self.mesh = meshes[name]
+        self.faceSubsets = {}
+
+    def name(self):
+        return self.mesh.name + 'Shape'
+
+    def numPolygons(self):
+        return len(self.mesh.faceVertexCounts)
+
+    def numVertices(self):
+        return len(self.mesh.points)
+
+    def getPoints(self, pointArray, space = MSpace.kObject):
+        pointArray.values = [ MPoint(*p) for p in self.mesh.points.tolist() ]
+
+    def getNormals(self, normalArray, space = MSpace.kObject):
+        normalArray.values = [ MFloatVector(*n) for n in self.mesh.normals.tolist() ]
+
+    def getVertices(self, vertexCounts, vertexIds):
+        vertexCounts.values = self.mesh.faceVertexCounts.tolist()
+        vertexIds.values = self.mesh.faceVertexIds.tolist()
+
+    def getNormalIds(self, normalCounts, normalIds):
+        # One normal per vertex, so normal ids are the vertex ids
+        normalCounts.values = self.mesh.faceVertexCounts.tolist()
+        normalIds.values = self.mesh.faceVertexIds.tolist()
+
+    def getTriangles(self, triangleCounts, triangleVertices):
+        triangleCounts.values = np.bincount(self.mesh.triangleFaces, minlength=self.numPolygons()).tolist()
+        triangleVertices.values = self.mesh.triangles.ravel().tolist()
+
+    @staticmethod
+    def autoUniformGridParams():
+        return MMeshIsectAccelParams()
+
+    def freeCachedIntersectionAccelerator(self):
+        self.faceSubsets.clear()
+
+    def candidateTriangles(self, faceIds):
+        if faceIds is None:
+            return None
+        key = id(faceIds)
+        if key not in self.faceSubsets or self.faceSubsets[key][0] is not faceIds:
+            self.faceSubsets[key] = ( faceIds, np.nonzero(np.isin(self.mesh.triangleFaces, list(faceIds.values)))[0] )
+        return self.faceSubsets[key][1]
+
+    def closestIntersection(self, raySource, rayDirection, faceIds, triIds, idsSorted, space, maxParam, testBothDirections,
+                            accelParams, hitPoint, hitRayParam, hitFace, hitTriangle, hitBary1, hitBary2,
+                            tolerance = 1e-6, *args):
+        mesh = self.mesh
+        origin = np.array((raySource.x, raySource.y, raySource.z))
+        direction = np.array((rayDirection.x, rayDirection.y, rayDirection.z))
+
+        candidates = self.candidateTriangles(faceIds)
+        v0 = mesh.v0 if candidates is None else mesh.v0[candidates]
+        edge1 = mesh.edge1 if candidates is None else mesh.edge1[candidates]
+        edge2 = mesh.edge2 if candidates is None else mesh.edge2[candidates]
+
+        # Moller-Trumbore against all candidate triangles
+        pVec = np.cross(direction, edge2)
+        determinant = np.einsum('ij,ij->i', edge1, pVec)
+        valid = np.abs(determinant) > 1e-12
+        inverse = np.where(valid, 1.0 / np.where(valid, determinant, 1.0), 0.0)
+        tVec = origin - v0
+        u = np.einsum('ij,ij->i', tVec, pVec) * inverse
+        qVec = np.cross(tVec, edge1)
+        v = (qVec @ direction) * inverse
+        t = np.einsum('ij,ij->i', edge2, qVec) * inverse
+        valid &= (u >= -tolerance) & (v >= -tolerance) & (u + v <= 1 + tolerance) & (t <= maxParam)
+        valid &= (t >= 0) if not testBothDirections else True
+        if not valid.any():
+            return False
+
+        best = np.nonzero(valid)[0][ np.argmin(np.abs(t[valid])) ]
+        triangle = best if candidates is None else candidates[best]
+        point = origin + t[best] * direction
+        hitPoint.x, hitPoint.y, hitPoint.z = point.tolist()
+        hitRayParam.value = float(t[best])
+        hitFace.value = int(mesh.triangleFaces[triangle])
+        hitTriangle.value = int(mesh.triangleLocalIds[triangle])
+        hitBary1.value = float(1.0 - u[best] - v[best])
+        hitBary2.value = float(u[best])
+        return True
+
+class MImage(object):
+    def readFromFile(self, path):
+        raise NotImplementedError("Images can not be read without Maya")
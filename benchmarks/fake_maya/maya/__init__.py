@@ -0,0 +1,3 @@
+""" Lightweight stand-in for the maya package, used to run the scatter tool headless in benchmarks.
+    Only the commands and API classes used by scripts/ are implemented, with a simple in-memory scene.
+"""
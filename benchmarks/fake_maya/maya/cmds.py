@@ -0,0 +1,245 @@
+""" Stand-in for maya.cmds with an in-memory scene of transforms, shapes and UI controls.
+    Every command call is counted in commandCounts so benchmarks can report the number of scene calls.
+"""
+import collections
+import functools
+
+from maya import OpenMaya
+
+commandCounts = collections.Counter()
+
+# name -> { 'type': node type, 'parent': name or None, 'attributes': {} }
+nodes = collections.OrderedDict()
+selection = []
+nameCounters = collections.Counter()
+
+# UI controls: name -> { 'kind': command name, flag: value }
+controls = {}
+
+def counted(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        commandCounts[function.__name__] += 1
+        return function(*args, **kwargs)
+    return wrapper
+
+def resetScene():
+    nodes.clear()
+    del selection[:]
+    nameCounters.clear()
+    commandCounts.clear()
+
+def uniqueName(base):
+    if base not in nodes and not base[-1].isdigit():
+        return base
+    stem = base.rstrip('0123456789')
+    while True:
+        nameCounters[stem] += 1
+        name = '{}{}'.format(stem, nameCounters[stem])
+        if name not in nodes:
+            return name
+
+def addNode(name, nodeType, parent = None):
+    nodes[name] = { 'type': nodeType, 'parent': parent, 'attributes': {} }
+    return name
+
+def shortName(name):
+    return name.split('|')[-1]
+
+#--------------#
+# Scene nodes  #
+#--------------#
+
+@counted
+def group(*args, **kwargs):
+    return addNode( uniqueName(kwargs.get('name', kwargs.get('n', 'group1'))), 'transform' )
+
+@counted
+def spaceLocator(*args, **kwargs):
+    name = uniqueName('locator1')
+    addNode(name, 'transform')
+    addNode(name[0:7] + 'Shape' + name[7:], 'locator', name)
+    return [name]
+
+@counted
+def particle(*args, **kwargs):
+    name = uniqueName(kwargs.get('name', 'particle1'))
+    addNode(name, 'transform')
+    shape = addNode(name + 'Shape', 'particle', name)
+    nodes[shape]['attributes']['position'] = [ tuple(p) for p in kwargs.get('position', []) ]
+    return [name, shape]
+
+@counted
+def instance(*args, **kwargs):
+    source = shortName(args[0])
+    name = uniqueName(source + '1')
+    addNode(name, 'transform')
+    nodes[name]['attributes'].update( dict(nodes.get(source, {}).get('attributes', {})) )
+    return [name]
+
+@counted
+def particleInstancer(particleShape, *args, **kwargs):
+    # Keeps the instanced objects and the per particle attribute mapping on the instancer node
+    name = addNode( uniqueName(kwargs.get('name', 'instancer1')), 'instancer' )
+    attributes = nodes[name]['attributes']
+    attributes['inputPoints'] = shortName(particleShape)
+    attributes['object'] = list(kwargs.get('object', []))
+    for mapping in ('position', 'rotation', 'scale', 'objectIndex'):
+        if mapping in kwargs:
+            attributes[mapping] = kwargs[mapping]
+    return name
+
+@counted
+def parent(children, parentName, **kwargs):
+    if isinstance(children, str):
+        children = [children]
+    for child in children:
+        nodes[shortName(child)]['parent'] = shortName(parentName)
+
+@counted
+def delete(*args, **kwargs):
+    names = set()
+    for arg in args:
+        names.update( shortName(name) for name in ([arg] if isinstance(arg, str) else arg) )
+    # Delete the descendants as well
+    changed = True
+    while changed:
+        changed = False
+        for name, node in nodes.items():
+            if name not in names and node['parent'] in names:
+                names.add(name)
+                changed = True
+    for name in names:
+        nodes.pop(shortName(name), None)
+
+@counted
+def objExists(name):
+    return shortName(name) in nodes or shortName(name) in OpenMaya.meshes
+
+@counted
+def listRelatives(name, children = False, allDescendents = False, type = None, fullPath = False, **kwargs):
+    name = shortName(name)
+    result = []
+    parents = set([name])
+    for childName, node in nodes.items():
+        if node['parent'] in parents:
+            if allDescendents:
+                parents.add(childName)
+            if type is None or node['type'] == type:
+                result.append( '|{}|{}'.format(name, childName) if fullPath else childName )
+    return result or None
+
+@counted
+def setAttr(attribute, *values, **kwargs):
+    name, attributeName = attribute.split('.', 1)
+    if kwargs.get('type') == 'vectorArray':
+        values = values[1:]
+    nodes[shortName(name)]['attributes'][attributeName] = values[0] if len(values) == 1 else list(values)
+
+@counted
+def getAttr(attribute, **kwargs):
+    name, attributeName = attribute.split('.', 1)
+    return nodes[shortName(name)]['attributes'].get(attributeName)
+
+@counted
+def addAttr(name, longName = None, dataType = None, **kwargs):
+    nodes[shortName(name)]['attributes'].setdefault(longName, None)
+
+@counted
+def saveInitialState(*args, **kwargs):
+    pass
+
+@counted
+def xform(name, query = False, q = False, **kwargs):
+    attributes = nodes[shortName(name)]['attributes']
+    flags = { 'translation': 't', 'rotation': 'ro', 'scale': 's' }
+    if query or q:
+        for longFlag, shortFlag in flags.items():
+            if kwargs.get(longFlag) or kwargs.get(shortFlag):
+                return list( attributes.get(longFlag, (1.0, 1.0, 1.0) if longFlag == 'scale' else (0.0, 0.0, 0.0)) )
+        return None
+    for longFlag, shortFlag in flags.items():
+        value = kwargs.get(longFlag, kwargs.get(shortFlag))
+        if value is not None:
+            attributes[longFlag] = tuple(value)
+
+@counted
+def select(*args, **kwargs):
+    if kwargs.get('cl') or kwargs.get('clear'):
+        del selection[:]
+    for arg in args:
+        selection.extend( [arg] if isinstance(arg, str) else arg )
+
+@counted
+def ls(*args, **kwargs):
+    if kwargs.get('sl') or kwargs.get('selection'):
+        return list(selection)
+    result = []
+    for arg in args:
+        result.extend( [arg] if isinstance(arg, str) else arg )
+    return result
+
+@counted
+def exactWorldBoundingBox(name, **kwargs):
+    mesh = OpenMaya.meshes[ shortName(name).split('.')[0] ]
+    return list(mesh.points.min(axis=0)) + list(mesh.points.max(axis=0))
+
+@counted
+def polyListComponentConversion(*args, **kwargs):
+    return list(args)
+
+# Set by maya.standalone.initialize
+batchMode = False
+
+@counted
+def about(*args, **kwargs):
+    if kwargs.get('batch'):
+        return batchMode
+    return None
+
+@counted
+def file(*args, **kwargs):
+    """ Opening a scene or creating a new one clears the scene nodes, the meshes in OpenMaya.meshes are kept. """
+    if kwargs.get('open') or kwargs.get('new'):
+        resetScene()
+        return args[0] if len(args) > 0 else 'untitled'
+    return kwargs.get('rename')
+
+@counted
+def progressWindow(*args, **kwargs):
+    if kwargs.get('query'):
+        return False
+    return True
+
+#--------------#
+# UI controls  #
+#--------------#
+
+def control(kind):
+    """ Creates a UI command which stores its flags and returns them when queried. """
+    def command(*args, **kwargs):
+        commandCounts[kind] += 1
+        if len(args) > 0 and args[0] in controls:
+            name = args[0]
+            if kwargs.pop('query', False) or kwargs.pop('q', False):
+                flag = [ key for key in kwargs ][0]
+                value = controls[name].get(flag)
+                if flag == 'value' and kind in ('intFieldGrp', 'floatFieldGrp') and value is None:
+                    return [ controls[name].get('value{}'.format(i)) for i in range(1, 5) if 'value{}'.format(i) in controls[name] ]
+                return value
+            kwargs.pop('edit', None)
+            kwargs.pop('e', None)
+            controls[name].update(kwargs)
+            return name
+        name = uniqueName(kind + '1')
+        controls[name] = dict(kwargs, kind=kind)
+        nodes[name] = { 'type': 'ui', 'parent': None, 'attributes': {} }
+        return name
+    command.__name__ = kind
+    return command
+
+for controlKind in ('window', 'columnLayout', 'separator', 'text', 'button', 'optionMenu', 'menuItem',
+                    'floatFieldGrp', 'intFieldGrp', 'floatSliderGrp', 'intSliderGrp', 'checkBoxGrp',
+                    'textFieldGrp', 'textFieldButtonGrp', 'dockControl', 'showWindow', 'deleteUI', 'fileDialog2',
+                    'progressBar'):
+    globals()[controlKind] = control(controlKind)
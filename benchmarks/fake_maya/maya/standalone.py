@@ -0,0 +1,8 @@
+""" Stand-in for maya.standalone, which switches the fake maya.cmds to batch mode. """
+from maya import cmds
+
+def initialize(name = 'python'):
+    cmds.batchMode = True
+
+def uninitialize():
+    cmds.batchMode = False
@@ -0,0 +1,15 @@
+""" Stand-in for maya.utils: deferred callbacks are queued until processIdleEvents is called, as in mayapy. """
+import queue
+
+deferredCallbacks = queue.Queue()
+
+def executeDeferred(function, *args, **kwargs):
+    deferredCallbacks.put( (function, args, kwargs) )
+
+def processIdleEvents():
+    while True:
+        try:
+            function, args, kwargs = deferredCallbacks.get_nowait()
+        except queue.Empty:
+            return
+        function(*args, **kwargs)
@@ -0,0 +1,342 @@
+""" Headless benchmark suite of the scatter tool hot paths.
+
+    Runs on plain Python with the stand-in maya package in benchmarks/fake_maya. Every benchmark is run for
+    several problem sizes to show how it scales, and reports the throughput and the peak memory allocated by
+    Python (measured in a second run with tracemalloc, so it does not slow down the timed run).
+    Results are written as JSON and can be compared with an earlier run.
+
+    Scene calls (locators, particles, instances) go to an in-memory fake scene, and the Maya API ray casts use
+    a NumPy stand-in for MFnMesh.closestIntersection, so those numbers measure the tool's own overhead.
+
+    Usage: python benchmarks/run_benchmarks.py [--quick] [--only hdt bvh ...] [--output results.json]
+                                               [--compare baseline.json]
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+benchmarksDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(benchmarksDir, '..', 'scripts'))
+sys.path.insert(0, os.path.join(benchmarksDir, 'fake_maya'))
+
+import numpy as np
+
+import maya.cmds as cmds
+import maya.OpenMaya as om
+
+from basic_sampler import basicRandomSampling
+from hdt import hdtPoissonDiscSampling
+from bridson import bridsonPoissonDiscSampling
+from mesh_cache import MeshGeometryCache
+from raycast import RayCaster
+from selection import compileSelection
+from scene_output import LocatorBackend, ParticleBackend
+from orientation import computeOrientations
+from point_table import ScatterPointTable, registerTable, findTable
+from scatter_brush import ScatterBrush
+from background import BackgroundScatter, ManualScheduler
+from hit_filters import SlopeFilter, HeightFilter, NormalConeFilter, CurveFalloffFilter, filterHits
+import scatter
+
+def terrainHeight(x, z):
+    return 2.0 * np.sin(x * 0.1) * np.cos(z * 0.13)
+
+def randomNormals(count, seed = 0):
+    rng = np.random.default_rng(seed)
+    normals = rng.normal(size=(count, 3))
+    normals[:, 1] = np.abs(normals[:, 1]) + 0.5
+    return normals / np.linalg.norm(normals, axis=1, keepdims=True)
+
+#-------------------------------------------------------------------#
+# Benchmarks: each setup function takes the problem size and returns #
+# a function which runs the measured work and returns its item count #
+#-------------------------------------------------------------------#
+
+def setupBasicSampling(resolution):
+    return lambda: len( basicRandomSampling(0.0, 0.0, 100.0, 100.0, resolution, 0.5, 0) )
+
+def setupHdtSampling(ratio):
+    return lambda: len( hdtPoissonDiscSampling(0.0, float(ratio), 0.0, float(ratio), 1.0, None, seed=0) )
+
+def setupBridsonSampling(ratio):
+    return lambda: len( bridsonPoissonDiscSampling(0.0, float(ratio), 0.0, float(ratio), 1.0, seed=0) )
+
+def createRaySamples(count, size):
+    rng = np.random.default_rng(1)
+    return rng.uniform(-size * 0.5, size * 0.5, size=(count, 2))
+
+def setupMayaApiRaycast(numRays):
+    om.meshes.clear()
+    om.createGridMesh('terrain', size=100.0, resolution=50, height=terrainHeight)
+    meshes = compileSelection(['terrain'])
+    geometryCaches = [ MeshGeometryCache(mesh.fnMesh) for mesh in meshes ]
+    samples = createRaySamples(numRays, 100.0).tolist()
+    return lambda: len( scatter.castRaysMayaApi(meshes, geometryCaches, samples, 20.0)[0] )
+
+def createTerrainSnapshots(resolution):
+    om.meshes.clear()
+    om.createGridMesh('terrain', size=100.0, resolution=resolution, height=terrainHeight)
+    meshes = compileSelection(['terrain'])
+    return [ MeshGeometryCache(mesh.fnMesh).createSnapshot(mesh.faceIds) for mesh in meshes ]
+
+def setupBvhBuild(resolution):
+    snapshots = createTerrainSnapshots(resolution)
+    def run():
+        RayCaster(snapshots)
+        return sum( len(snapshot.triangles) for snapshot in snapshots )
+    return run
+
+def setupBvhRaycast(numRays):
+    snapshots = createTerrainSnapshots(200)
+    rayCaster = RayCaster(snapshots)
+    samples = createRaySamples(numRays, 100.0)
+    return lambda: len( scatter.castRaysBvh(snapshots, samples, 20.0, rayCaster=rayCaster)[0] )
+
+def setupAimY(count):
+    normals = randomNormals(count).tolist()
+    def run():
+        for normal in normals:
+            scatter.aimY(normal)
+        return len(normals)
+    return run
+
+def setupOrientation(count):
+    normals = randomNormals(count)
+    rng = np.random.default_rng(2)
+    return lambda: len( computeOrientations(normals, [-180, 180], [0.5, 2.0], rng)[0] )
+
+def setupHitFilters(count):
+    rng = np.random.default_rng(3)
+    positions = rng.uniform(-50, 50, size=(count, 3))
+    hits = ( positions, randomNormals(count), np.zeros(count, dtype=np.int64), np.zeros(count, dtype=np.int64) )
+    curve = np.column_stack(( np.linspace(-50, 50, 50), np.zeros(50), 10.0 * np.sin(np.linspace(0, 6, 50)) ))
+    hitFilters = [ SlopeFilter(maxAngle=40), HeightFilter(minHeight=-40), NormalConeFilter((0, 1, 1), 80),
+                   CurveFalloffFilter(curve, 5.0, 25.0) ]
+    def run():
+        filterHits( hitFilters, hits, np.random.default_rng(0) )
+        return count
+    return run
+
+def setupLocators(count):
+    positions = np.random.default_rng(2).uniform(-50, 50, size=(count, 3))
+    rotations = np.zeros((count, 3))
+    scales = np.ones(count)
+    def run():
+        cmds.resetScene()
+        LocatorBackend(cmds).write('ScatterGroup', positions, rotations, scales, (255, 0, 0))
+        return count
+    return run
+
+def setupParticles(count):
+    positions = np.random.default_rng(2).uniform(-50, 50, size=(count, 3))
+    rotations = np.zeros((count, 3))
+    scales = np.ones(count)
+    def run():
+        cmds.resetScene()
+        ParticleBackend(cmds).write('ScatterGroup', positions, rotations, scales, (255, 0, 0))
+        return count
+    return run
+
+def setupInstances(count):
+    positions = np.random.default_rng(2).uniform(-50, 50, size=(count, 3))
+    table = ScatterPointTable(positions, np.zeros((count, 3)), np.ones(count))
+    def run():
+        cmds.resetScene()
+        model = cmds.group(em=True, name='rock')
+        groupName = cmds.group(em=True, name='ScatterGroup')
+        registerTable(groupName, table)
+        groupField = cmds.textFieldGrp(text=groupName)
+        cacheField = cmds.textFieldButtonGrp(text='')
+        cmds.select(model)
+        scatter.createModels(groupField, cacheField)
+        return count
+    return run
+
+def setupRescatter(regionSize):
+    cmds.resetScene()
+    om.meshes.clear()
+    om.createGridMesh('terrain', size=100.0, resolution=50, height=terrainHeight)
+    groupName = scatter.scatterPoints( ['terrain'], scatter.ScatterSettings(discRadius=1.0) )
+    region = ( -regionSize * 0.5, -regionSize * 0.5, regionSize * 0.5, regionSize * 0.5 )
+    return lambda: scatter.rescatterRegion( groupName, region )[1]
+
+def setupScatter(resolution, chunkSize = 0):
+    # End-to-end scatter of one point per grid cell, the peak memory shows what grows with the number of points
+    cmds.resetScene()
+    om.meshes.clear()
+    om.createGridMesh('terrain', size=100.0, resolution=50, height=terrainHeight)
+    settings = scatter.ScatterSettings( sampler='Simple Randomizer', resolution=resolution, probability=1.0,
+                                        output='Particles', chunkSize=chunkSize )
+    def run():
+        cmds.resetScene()
+        scatter.resultCache.clear()
+        groupName = scatter.scatterPoints( ['terrain'], settings )
+        return len( findTable(groupName) )
+    return run
+
+def setupStreamScatter(resolution):
+    return setupScatter( resolution, chunkSize=16384 )
+
+def setupBackgroundScatter(resolution):
+    # The scatter of setupScatter in a worker thread, with the scene writes run by a stand-in main thread scheduler
+    cmds.resetScene()
+    om.meshes.clear()
+    om.createGridMesh('terrain', size=100.0, resolution=50, height=terrainHeight)
+    settings = scatter.ScatterSettings( sampler='Simple Randomizer', resolution=resolution, probability=1.0, output='Particles' )
+    def run():
+        cmds.resetScene()
+        scheduler = ManualScheduler()
+        job = BackgroundScatter( ['terrain'], settings, scheduler ).start()
+        scheduler.runUntilDone( job )
+        return len( findTable(job.groupName) )
+    return run
+
+def setupBrush(numPoints):
+    # A jittered grid with a spacing of 1.5 disc radii stands in for a large scatter
+    cmds.resetScene()
+    om.meshes.clear()
+    size = math.ceil( math.sqrt(numPoints) ) * 1.5
+    om.createGridMesh('terrain', size=size + 10.0, resolution=100, height=terrainHeight)
+    coordinates = np.arange(-size * 0.5, size * 0.5, 1.5)
+    x, z = np.meshgrid(coordinates, coordinates)
+    positions = np.column_stack(( x.ravel(), np.zeros(x.size), z.ravel() ))[:numPoints]
+    params = dict( scatter.ScatterSettings(discRadius=1.0, output='Particles').toDict(), meshes=['terrain'], faceIds=[[]] )
+    groupName = ParticleBackend(cmds).write('ScatterGroup', positions, np.zeros((len(positions), 3)), np.ones(len(positions)), (255, 0, 0))
+    registerTable(groupName, ScatterPointTable(positions, np.zeros((len(positions), 3)), np.ones(len(positions)), params=params))
+    brush = ScatterBrush(groupName, brushRadius=10.0, seed=0)
+    def run():
+        # One stroke of alternating erase and paint events, without the particle rebuild at the end of the stroke
+        for i in range(40):
+            if i % 2 == 0:
+                brush.erase(i * 2.0, 0.0)
+            else:
+                brush.paint((i - 1) * 2.0, 0.0)
+            brush.flush()
+        return 40
+    return run
+
+# name, unit, setup function, sizes, quick sizes
+benchmarkDefinitions = [
+    ( 'basic', 'samples', setupBasicSampling, [250, 500, 1000, 2000], [250, 500] ),
+    ( 'hdt', 'samples', setupHdtSampling, [50, 100, 200, 400], [50, 100] ),
+    ( 'bridson', 'samples', setupBridsonSampling, [50, 100, 200, 400], [50, 100] ),
+    ( 'mayaRaycast', 'rays', setupMayaApiRaycast, [500, 1000, 2000], [250, 500] ),
+    ( 'bvhBuild', 'triangles', setupBvhBuild, [50, 100, 200], [50, 100] ),
+    ( 'bvh', 'rays', setupBvhRaycast, [10000, 100000, 400000], [10000, 50000] ),
+    ( 'aimY', 'normals', setupAimY, [10000, 100000], [10000] ),
+    ( 'orientation', 'normals', setupOrientation, [10000, 100000, 1000000], [10000, 100000] ),
+    ( 'hitFilters', 'hits', setupHitFilters, [10000, 100000, 1000000], [10000, 100000] ),
+    ( 'locators', 'points', setupLocators, [1000, 5000, 20000], [1000, 5000] ),
+    ( 'particles', 'points', setupParticles, [10000, 100000, 500000], [10000, 50000] ),
+    ( 'instances', 'points', setupInstances, [1000, 20000, 100000], [1000, 5000] ),
+    ( 'rescatter', 'points', setupRescatter, [5, 10, 20], [5, 10] ),
+    ( 'brush', 'events', setupBrush, [10000, 100000, 500000], [10000, 100000] ),
+    ( 'scatter', 'points', setupScatter, [200, 400, 800], [100, 200] ),
+    ( 'streamScatter', 'points', setupStreamScatter, [200, 400, 800], [100, 200] ),
+    ( 'backgroundScatter', 'points', setupBackgroundScatter, [200, 400, 800], [100, 200] ),
+]
+
+def runBenchmark(setup, size, measureMemory = True):
+    """ Runs one benchmark case.
+        Params
+        ===
+            setup: Setup function of the benchmark
+            size: Problem size
+            measureMemory (optional): Run the case a second time with tracemalloc to measure the peak memory
+            return: A dictionary with the item count, seconds, throughput and peak memory in bytes
+    """
+    run = setup(size)
+    start = time.perf_counter()
+    count = run()
+    seconds = time.perf_counter() - start
+
+    peakMemory = None
+    if measureMemory:
+        run = setup(size)
+        tracemalloc.start()
+        run()
+        peakMemory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return { 'size': size, 'count': count, 'seconds': seconds, 'rate': count / max(seconds, 1e-12),
+             'peakMemoryBytes': peakMemory }
+
+def scalingExponent(first, second):
+    """ Exponent k of time ~ count^k between two cases, 1 means linear scaling. """
+    if first['count'] <= 0 or second['count'] <= first['count'] or first['seconds'] <= 0:
+        return None
+    return math.log(second['seconds'] / first['seconds']) / math.log(second['count'] / float(first['count']))
+
+def gitCommit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=benchmarksDir,
+                                       stderr=subprocess.DEVNULL).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compareResults(results, baseline):
+    """ Prints the throughput of each case relative to a baseline result file. """
+    baselineRates = {}
+    for benchmark in baseline['benchmarks']:
+        for case in benchmark['cases']:
+            baselineRates[(benchmark['name'], case['size'])] = case['rate']
+
+    print('\nCompared with %s (%s)' % (baseline.get('commit'), baseline.get('date')))
+    print('%-12s %10s %14s %14s %8s' % ('benchmark', 'size', 'rate', 'baseline', 'ratio'))
+    for benchmark in results['benchmarks']:
+        for case in benchmark['cases']:
+            baselineRate = baselineRates.get((benchmark['name'], case['size']))
+            if baselineRate is None:
+                continue
+            print('%-12s %10d %14.0f %14.0f %7.2fx' % (benchmark['name'], case['size'], case['rate'], baselineRate,
+                                                       case['rate'] / baselineRate))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help='Run the smaller problem sizes only')
+    parser.add_argument('--only', nargs='+', help='Names of the benchmarks to run')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the peak memory runs')
+    parser.add_argument('--output', default='benchmark_results.json', help='Path of the JSON result file')
+    parser.add_argument('--compare', help='JSON result file of an earlier run to compare with')
+    args = parser.parse_args()
+
+    results = { 'date': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': gitCommit(),
+                'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+                'cpuCount': os.cpu_count(), 'quick': args.quick, 'benchmarks': [] }
+
+    print('%-12s %10s %10s %10s %14s %10s %8s' % ('benchmark', 'size', 'count', 'seconds', 'rate', 'peak MB', 'scaling'))
+    for name, unit, setup, sizes, quickSizes in benchmarkDefinitions:
+        if args.only and name not in args.only:
+            continue
+
+        cases = []
+        for size in (quickSizes if args.quick else sizes):
+            case = runBenchmark(setup, size, not args.no_memory)
+            case['scaling'] = scalingExponent(cases[-1], case) if len(cases) > 0 else None
+            cases.append(case)
+
+            peak = '-' if case['peakMemoryBytes'] is None else '%.1f' % (case['peakMemoryBytes'] / 1048576.0)
+            scaling = '-' if case['scaling'] is None else '%.2f' % case['scaling']
+            print('%-12s %10d %10d %10.3f %9.0f %-4s %10s %8s' % (name, size, case['count'], case['seconds'],
+                                                                   case['rate'], unit[:4] + '/s', peak, scaling))
+            sys.stdout.flush()
+
+        results['benchmarks'].append({ 'name': name, 'unit': unit + '/s', 'cases': cases })
+
+    with open(args.output, 'w') as resultFile:
+        json.dump(results, resultFile, indent=2)
+    print('\nResults written to %s' % args.output)
+
+    if args.compare:
+        with open(args.compare) as baselineFile:
+            compareResults(results, json.load(baselineFile))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+try:
+    import maya.cmds as cmds
+    import maya.utils as mayaUtils
+except ImportError:
+    # The computation runs outside of Maya as well, with a ManualScheduler instead of Maya's idle queue
+    cmds = None
+    mayaUtils = None
+
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from footprint import rasterizeFootprint
+from hit_filters import createHitFilters
+from variable_radius import loadDensityImage
+from raycast import RayCaster
+from mesh_cache import MeshGeometryCache
+from selection import compileSelection
+from scene_output import createOutputBackend
+from point_table import ScatterCacheWriter, registerTable, findTable, loadTable, concatenateTables
+from scatter import iterSamples, iterSampleChunks, samplingCellLength, createRayCast, processSampleChunk
+from scatter import mergeBoundingBoxes, loadScatterDensity, createScatterParameters, readScatterSettings
+from scatter import scatterPoints, groupSnapshots
+import instrumentation
+
+# Number of points per scene write of a background scatter which is not streamed with a chunk size of its own
+backgroundChunkSize = 16384
+
+class MayaScheduler(object):
+    """ Runs callbacks on Maya's main thread when Maya is idle. Scene commands must only be called there. """
+    def call(self, function, *args):
+        mayaUtils.executeDeferred( function, *args )
+
+class ManualScheduler(object):
+    """ Stand-in for MayaScheduler outside of Maya, for scripts and tests: the callbacks are queued until the thread
+        which owns the scene runs them with runPending.
+    """
+    def __init__(self):
+        self.callbacks = queue.Queue()
+
+    def call(self, function, *args):
+        self.callbacks.put( (function, args) )
+
+    def runPending(self, timeout = 0.0):
+        """ Runs the queued callbacks, waiting up to timeout seconds for the first one.
+            Params
+            ===
+                timeout (optional): Seconds to wait if no callback is queued
+                return: The number of callbacks which were run
+        """
+        numCalls = 0
+        try:
+            function, args = self.callbacks.get( timeout=timeout ) if timeout > 0 else self.callbacks.get_nowait()
+            while True:
+                function(*args)
+                numCalls += 1
+                function, args = self.callbacks.get_nowait()
+        except queue.Empty:
+            pass
+        return numCalls
+
+    def runUntilDone(self, scatter, timeout = None):
+        """ Runs the callbacks of a background scatter until it has finished, failed or was cancelled.
+            Params
+            ===
+                scatter: A BackgroundScatter
+                timeout (optional): Maximum number of seconds to wait, None to wait until the scatter is done
+                return: True if the scatter is done
+        """
+        endTime = None if timeout is None else time.perf_counter() + timeout
+        while not scatter.isDone():
+            if endTime is not None and time.perf_counter() > endTime:
+                return False
+            self.runPending( 0.05 )
+        return True
+
+class BackgroundScatter(object):
+    """ Scatter of the "Generate Scatter" button which keeps Maya responsive: the meshes are copied on the main
+        thread, then sampling, ray casting against the copies, hit filters and transforms run in a worker thread.
+        The points are handed back to the main thread in chunks through a scheduler, which writes them to the scene.
+        The worker runs at most maxPendingChunks ahead of the scene writes, so unwritten chunks do not pile up.
+        Only the BVH ray caster is used, the Maya API may only be called from the main thread.
+        Params
+        ===
+            selected: Names of the meshes or mesh faces to scatter on
+            settings: A ScatterSettings
+            scheduler (optional): Runs callbacks on the main thread, a MayaScheduler by default
+            progress (optional): Function called on the main thread with the finished fraction of the sampling
+            done (optional): Function called on the main thread with the scatter group name when the scatter has
+                             finished, or with None if it failed or was cancelled
+            maxPendingChunks (optional): Maximum number of computed chunks waiting for their scene write
+    """
+    def __init__(self, selected, settings, scheduler = None, progress = None, done = None, maxPendingChunks = 4):
+        self.selected = selected
+        self.settings = settings
+        self.scheduler = MayaScheduler() if scheduler is None else scheduler
+        self.progress = progress
+        self.done = done
+        self.pendingChunks = threading.Semaphore( maxPendingChunks )
+        self.cancelEvent = threading.Event()
+        self.finished = False
+        self.groupName = None
+        self.error = None
+        self.thread = None
+        self.stats = None
+        self.workerStats = None
+
+    def start(self):
+        """ Copies the meshes on the calling (main) thread and starts the worker thread. """
+        settings = self.settings
+        # The worker records into stats of its own, which are merged with the stats of the main thread in finish
+        self.stats = instrumentation.createStats( 'backgroundScatter' )
+        self.workerStats = instrumentation.createStats( 'backgroundScatterWorker' )
+        with instrumentation.Recording( self.stats ):
+            with instrumentation.stage('selection'):
+                fnMeshes = compileSelection( self.selected )
+            with instrumentation.stage('boundingBox'):
+                self.bbox = mergeBoundingBoxes( [ cmds.exactWorldBoundingBox( name ) for name in self.selected ] )
+            with instrumentation.stage('meshCache'):
+                self.snapshots = [ MeshGeometryCache(mesh.fnMesh).createSnapshot(mesh.faceIds) for mesh in fnMeshes ]
+        self.density = loadScatterDensity( settings )[0]
+        self.scatterParameters = createScatterParameters( settings, fnMeshes, self.bbox )
+        self.hitFilters = createHitFilters( settings.filters, self.bbox, loadDensityImage )
+        self.outputBackend = createOutputBackend( settings.output )
+
+        self.thread = threading.Thread( target=self.compute, name='BackgroundScatter' )
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """ Stops the worker after its current chunk, the points written so far are removed from the scene. """
+        self.cancelEvent.set()
+
+    def isCancelled(self):
+        return self.cancelEvent.is_set()
+
+    def isDone(self):
+        """ Checks if the scatter has finished, failed or was cancelled and the main thread has cleaned up. """
+        return self.finished
+
+    #----------------#
+    # Worker thread  #
+    #----------------#
+
+    def compute(self):
+        with instrumentation.Recording( self.workerStats ):
+            try:
+                self.computeChunks()
+            except Exception as error:
+                self.cancelEvent.set()
+                self.scheduler.call( self.finish, None, error )
+
+    def computeChunks(self):
+        settings = self.settings
+        bbox = self.bbox
+        footprint = None
+        if settings.footprint:
+            with instrumentation.stage('footprint'):
+                footprint = rasterizeFootprint( self.snapshots, bbox[0], bbox[2], bbox[3], bbox[5],
+                                                samplingCellLength( settings.sampler, bbox, settings.discRadius,
+                                                                    settings.resolution, settings.classRadii ) )
+        with instrumentation.stage('bvhBuild'):
+            rayCaster = RayCaster( self.snapshots )
+
+        # Streamed scatters keep their points in an on-disk scatter cache, the others in memory
+        cachePath = None
+        cacheWriter = None
+        columns = []
+        if settings.chunkSize > 0:
+            cachePath = settings.cachePath if len(settings.cachePath) > 0 else tempfile.mkdtemp( prefix='scatter_cache_' )
+            cacheWriter = ScatterCacheWriter( cachePath, self.scatterParameters )
+
+        lastProgress = [0.0]
+        def reportProgress(fraction):
+            # The progress is shown at most ten times a second, the sampler stops as soon as the scatter is cancelled
+            now = time.perf_counter()
+            if self.progress is not None and now - lastProgress[0] > 0.1:
+                lastProgress[0] = now
+                self.scheduler.call( self.progress, fraction )
+            return self.cancelEvent.is_set()
+
+        castRays = createRayCast( 'BVH (NumPy)', None, None, self.snapshots, bbox[4] + 10.0, settings.smoothNormals, rayCaster )
+        rng = np.random.default_rng( settings.seed )
+        sampleChunks = iterSampleChunks( iterSamples( settings.sampler, bbox, settings.discRadius, settings.resolution,
+                                                      settings.probability, settings.seed, reportProgress, settings.maxDiscRadius,
+                                                      self.density, settings.classRadii, footprint ),
+                                         settings.chunkSize if settings.chunkSize > 0 else backgroundChunkSize )
+        table = None
+        try:
+            try:
+                while not self.cancelEvent.is_set():
+                    with instrumentation.stage('sampling'):
+                        samples = next( sampleChunks, None )
+                    if samples is None:
+                        break
+                    instrumentation.count('samples', len(samples))
+
+                    chunk = processSampleChunk( samples, castRays, self.hitFilters, settings, rng, self.scatterParameters )
+                    if cacheWriter is not None:
+                        with instrumentation.stage('cacheWrite'):
+                            cacheWriter.append( chunk )
+                    else:
+                        columns.append( chunk )
+                    instrumentation.sampleMemory()
+
+                    # Wait until the main thread has caught up with the scene writes
+                    while not self.pendingChunks.acquire( timeout=0.1 ):
+                        if self.cancelEvent.is_set():
+                            break
+                    else:
+                        self.scheduler.call( self.writeChunk, chunk )
+            finally:
+                if cacheWriter is not None:
+                    cacheWriter.close()
+
+            if not self.cancelEvent.is_set():
+                if cachePath is not None:
+                    table = loadTable( cachePath, owned=len(settings.cachePath) == 0 )
+                else:
+                    table = concatenateTables( columns, self.scatterParameters )
+        finally:
+            # The temporary scatter cache of a cancelled or failed scatter is removed, also if the worker raised
+            if table is None and cachePath is not None and len(settings.cachePath) == 0:
+                shutil.rmtree( cachePath, ignore_errors=True )
+        self.scheduler.call( self.finish, table, None )
+
+    #----------------#
+    # Main thread    #
+    #----------------#
+
+    def writeChunk(self, chunk):
+        self.pendingChunks.release()
+        if self.cancelEvent.is_set():
+            return
+        settings = self.settings
+        with instrumentation.Recording( self.stats ), instrumentation.stage('sceneOutput'):
+            if self.groupName is None:
+                self.groupName = self.outputBackend.write( settings.groupName, chunk.positions, chunk.rotations,
+                                                           chunk.scales, settings.color )
+            else:
+                self.outputBackend.append( self.groupName, chunk.positions, chunk.rotations, chunk.scales, settings.color )
+
+    def finish(self, table, error):
+        if table is not None and self.groupName is None:
+            self.groupName = self.outputBackend.write( self.settings.groupName, np.zeros((0, 3)), np.zeros((0, 3)),
+                                                       np.zeros(0), self.settings.color )
+
+        if table is None:
+            # Remove the chunks written so far, the scatter is either complete or not in the scene
+            if self.groupName is not None:
+                cmds.delete( self.groupName )
+                self.groupName = None
+            self.error = error
+            if error is not None:
+                print("Scatter failed: {}".format(error))
+            else:
+                print("Scatter cancelled")
+        else:
+            registerTable( self.groupName, table )
+            groupSnapshots[self.groupName] = self.snapshots
+
+        # The worker has stopped recording once it scheduled this call
+        if self.stats is not None:
+            self.stats.merge( self.workerStats )
+            instrumentation.endRun( self.stats )
+        self.finished = True
+        if self.done is not None:
+            self.done( self.groupName )
+
+#-------------------#
+# Tool window       #
+#-------------------#
+
+# The background scatter started from the tool window, only one runs at a time
+activeScatter = None
+
+def generateScatterInBackground( progressBar, scatterFields, *pArgs ):
+    """ "Generate in Background" button: reads the settings from the fields of the tool window and starts a
+        BackgroundScatter, whose progress is shown in the progress bar of the window. Scatters with the Maya API
+        ray caster run on the main thread as usual.
+    """
+    global activeScatter
+    if activeScatter is not None and not activeScatter.isDone():
+        print("A scatter is already running")
+        return
+
+    selected = cmds.ls( sl=True )
+    if len(selected) == 0:
+        print("No mesh selected")
+        return
+
+    settings = readScatterSettings( *scatterFields )
+    if settings is None:
+        return
+    if settings.raycast == 'Maya API':
+        scatterPoints( selected, settings )
+        cmds.select( cl=True )
+        return
+
+    def showProgress(fraction):
+        cmds.progressBar( progressBar, edit=True, progress=int(min(max(fraction, 0.0), 1.0) * 100) )
+
+    def showResult(groupName):
+        cmds.progressBar( progressBar, edit=True, progress=0 )
+        if groupName is not None:
+            print("Scattered {} points into {}".format(len( findTable(groupName) ), groupName))
+
+    cmds.progressBar( progressBar, edit=True, progress=0 )
+    activeScatter = BackgroundScatter( selected, settings, progress=showProgress, done=showResult ).start()
+    cmds.select( cl=True )
+
+def cancelBackgroundScatter( *pArgs ):
+    """ "Cancel" button of the tool window. """
+    if activeScatter is not None and not activeScatter.isDone():
+        activeScatter.cancel()
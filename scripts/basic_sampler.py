@@ -1,53 +1,109 @@
-import random
+import numpy as np
 
 def lerp( a, b, t ):
     return a * (1 - t) + b * t
 
-def basicRandomSampling( xMin, zMin, xMax, zMax, resolution, P ):
+def createRandomGenerator( seed=None ):
+    """ Returns a NumPy random generator for the given seed.
+        Params
+        ===
+            seed: An integer seed, an existing numpy.random.Generator (returned as is) or None for a random seed
+            return: A numpy.random.Generator
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+def basicGridDimensions( xMin, zMin, xMax, zMax, resolution ):
+    """ Computes the dimensions and cell size of the sampling grid where the largest side has
+        the given resolution.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the sampling domain
+            zMin: Minimum z-coordinate of the sampling domain
+            xMax: Maximum x-coordinate of the sampling domain
+            zMax: Maximum z-coordinate of the sampling domain
+            resolution: Number of grid cells along the largest side
+            return: A tuple (dimX, dimZ, delta) where delta is the side length of a cell
+    """
     sizeX = (xMax - xMin)
     sizeZ = (zMax - zMin)
-    
-    delta = 0
-    dimX = 0
-    dimZ = 0
-    
+
     # Adjust grid dimensions based on the largest side
     if sizeX >= sizeZ:
         dimX = resolution
         dimZ = int((sizeZ/sizeX) * dimX)
-        
         delta = sizeX / resolution
     else:
         dimZ = resolution
         dimX = int((sizeX/sizeZ) * dimZ)
-        
         delta = sizeZ / resolution
-        
-    # Generate a discrete grid by interpolating between min and max
-    xValues = []
-    zValues = []
-    for i in range(dimX):
-        xValues.append( lerp( xMin, xMax, i / float(dimX) ) )
-        
-    for i in range(dimZ):
-        zValues.append( lerp( zMin, zMax, i / float(dimZ) ) )
-
-    # Calculate half of the cell size used for applying offsets
+
+    return dimX, dimZ, delta
+
+def basicRandomSamplingArray( xMin, zMin, xMax, zMax, resolution, P, seed=0 ):
+    """ Samples xz-coordinates on a jittered grid where each cell is kept with probability P.
+        The grid, the Bernoulli mask and the jitter offsets are generated in one batched pass.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the sampling domain
+            zMin: Minimum z-coordinate of the sampling domain
+            xMax: Maximum x-coordinate of the sampling domain
+            zMax: Maximum z-coordinate of the sampling domain
+            resolution: Number of grid cells along the largest side
+            P: Probability of keeping a grid cell
+            seed: Integer seed or numpy.random.Generator (None gives a random seed)
+            return: An (N, 2) float array of xz-coordinates
+    """
+    dimX, dimZ, delta = basicGridDimensions( xMin, zMin, xMax, zMax, resolution )
+    batches = list( iterBasicRandomSampling( xMin, zMin, xMax, zMax, resolution, P, seed,
+                                             batchSize=max((dimX - 1) * (dimZ - 1), 1) ) )
+    return batches[0] if len(batches) > 0 else np.empty((0, 2))
+
+def basicRandomSampling( xMin, zMin, xMax, zMax, resolution, P, seed=0 ):
+    """ List based version of basicRandomSamplingArray.
+        Params
+        ===
+            See basicRandomSamplingArray
+            return: A list of (x, z) tuples
+    """
+    samples = basicRandomSamplingArray( xMin, zMin, xMax, zMax, resolution, P, seed )
+    return [ (x, z) for x, z in samples.tolist() ]
+
+def iterBasicRandomSampling( xMin, zMin, xMax, zMax, resolution, P, seed=0, batchSize=65536 ):
+    """ Generator version of basicRandomSamplingArray. The grid rows are generated a batch at a time, so only the
+        cells of the current batch are in memory. The samples depend on the batch size, as the random numbers of
+        each batch are drawn together.
+        Params
+        ===
+            See basicRandomSamplingArray
+            batchSize (optional): Maximum number of grid cells, and so of samples, per batch
+            return: A generator of (N, 2) float arrays of xz-coordinates
+    """
+    dimX, dimZ, delta = basicGridDimensions( xMin, zMin, xMax, zMax, resolution )
+    if dimX < 2 or dimZ < 2:
+        return
+
+    rng = createRandomGenerator(seed)
+
+    # Generate a discrete grid by interpolating between min and max (the first row and column are skipped)
+    xValues = lerp( xMin, xMax, np.arange(1, dimX) / float(dimX) )
+    zValues = lerp( zMin, zMax, np.arange(1, dimZ) / float(dimZ) )
     deltaHalf = delta * 0.5
-    
-    # Sample xz-coordinates based on given probability P
-    samples = []
-    
-    # Use a specific starting seed
-    random.seed(0)
-    for j in range(1, dimZ):
-        for i in range(1, dimX):
-            if random.uniform(1.0, 0.0) < P:
-                # Add a random offset to reduce regular sampling artifacts
-                x = xValues[i] + random.uniform( deltaHalf, -deltaHalf )
-                z = zValues[j] + random.uniform( deltaHalf, -deltaHalf )
-                samples.append((x, z))
-    
-    random.seed()
-    return samples
-               
\ No newline at end of file
+    rowsPerBatch = max( batchSize // (dimX - 1), 1 )
+
+    for rowStart in range(0, dimZ - 1, rowsPerBatch):
+        rowEnd = min(rowStart + rowsPerBatch, dimZ - 1)
+
+        # Sample grid cells based on given probability P
+        keep = rng.random((rowEnd - rowStart, dimX - 1)) < P
+        rows, columns = np.nonzero(keep)
+
+        # Add a random offset to reduce regular sampling artifacts
+        offsets = rng.uniform(-deltaHalf, deltaHalf, size=(len(rows), 2))
+
+        samples = np.empty((len(rows), 2))
+        samples[:, 0] = xValues[columns] + offsets[:, 0]
+        samples[:, 1] = zValues[rowStart + rows] + offsets[:, 1]
+        if len(samples) > 0:
+            yield samples
@@ -0,0 +1,178 @@
+""" Scatters points over many scenes without the tool window, in a pool of mayapy worker processes.
+
+    Usage: mayapy batch_scatter.py jobs.json [--workers 4] [--output-dir results]
+
+    The job file lists the scenes with the meshes to scatter on, optional models to replace the scatter points
+    with, and the scatter settings (see ScatterSettings, settings of a scene override the shared settings):
+
+        {
+            "outputDir": "scatter_results",
+            "settings": { "sampler": "Poisson-Disc", "discRadius": 2.0 },
+            "scenes": [
+                { "scene": "forest_01.mb", "meshes": ["ground"], "models": ["tree", "rock"],
+                  "settings": { "seed": 1 }, "saveScene": "forest_01_scattered.mb", "saveCache": true }
+            ]
+        }
+
+    Every scene is opened in one worker, scattered and saved. A JSON file with the result and the stage times
+    of each scene is written to the output directory as soon as the scene is finished, together with a
+    summary.json of all scenes at the end. A failing scene does not stop the other scenes.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+scriptsDir = os.path.dirname(os.path.abspath(__file__))
+
+def loadJobs(path, outputDir = None):
+    """ Reads a job file and merges the shared settings into the settings of each scene.
+        Params
+        ===
+            path: Path of the JSON job file
+            outputDir (optional): Output directory, overrides the output directory of the job file
+            return: A tuple (output directory, list of scene jobs)
+    """
+    with open(path) as jobFile:
+        jobFileData = json.load(jobFile)
+
+    jobDir = os.path.dirname(os.path.abspath(path))
+    if outputDir is None:
+        outputDir = os.path.join(jobDir, jobFileData.get('outputDir', 'scatter_results'))
+
+    jobs = []
+    for index, scene in enumerate(jobFileData['scenes']):
+        settings = dict(jobFileData.get('settings', {}))
+        settings.update(scene.get('settings', {}))
+        job = dict(scene, settings=settings, outputDir=outputDir)
+        job['scene'] = os.path.join(jobDir, scene['scene'])
+        if scene.get('saveScene'):
+            job['saveScene'] = os.path.join(outputDir, scene['saveScene'])
+        job['name'] = scene.get('name', '{:04d}_{}'.format(index, os.path.splitext(os.path.basename(scene['scene']))[0]))
+        jobs.append(job)
+    return outputDir, jobs
+
+def initializeWorker():
+    """ Starts Maya in a worker process, once for all scenes of the worker. """
+    if scriptsDir not in sys.path:
+        sys.path.insert(0, scriptsDir)
+    import maya.standalone
+    maya.standalone.initialize( name='python' )
+
+def scatterScene(job):
+    """ Opens, scatters and saves one scene. Runs in a worker process.
+        Params
+        ===
+            job: A scene job of loadJobs
+            return: A dictionary with the result and the stage times of the scene
+    """
+    import maya.cmds as cmds
+    import instrumentation
+    from point_table import findTable, saveTable
+    from scatter import scatterPoints, instanceModels
+    from scatter_settings import ScatterSettings
+
+    instrumentation.enableInstrumentation( printReport=False )
+    result = { 'name': job['name'], 'scene': job['scene'], 'status': 'ok', 'numPoints': 0, 'stages': {} }
+    startTime = time.perf_counter()
+    try:
+        settings = ScatterSettings.fromDict( job['settings'] )
+        result['settings'] = settings.toDict()
+
+        stageStart = time.perf_counter()
+        cmds.file( job['scene'], open=True, force=True )
+        result['stages']['open'] = time.perf_counter() - stageStart
+
+        groupName = scatterPoints( job['meshes'], settings )
+        result['scatter'] = instrumentation.lastStats.toDict()
+        if groupName is None:
+            raise RuntimeError("Scatter cancelled")
+        result['numPoints'] = len( findTable(groupName) )
+
+        if job.get('saveCache'):
+            cachePath = os.path.join( job['outputDir'], job['name'] + '_cache' )
+            saveTable( findTable(groupName), cachePath )
+            result['cache'] = cachePath
+
+        if len( job.get('models', []) ) > 0:
+            instanceModels( job['models'], groupName )
+            result['models'] = instrumentation.lastStats.toDict()
+
+        if job.get('saveScene'):
+            stageStart = time.perf_counter()
+            cmds.file( rename=job['saveScene'] )
+            cmds.file( save=True, force=True, type='mayaAscii' if job['saveScene'].endswith('.ma') else 'mayaBinary' )
+            result['stages']['save'] = time.perf_counter() - stageStart
+            result['savedScene'] = job['saveScene']
+    except Exception as error:
+        result['status'] = 'failed'
+        result['error'] = '{}: {}'.format(type(error).__name__, error)
+        result['traceback'] = traceback.format_exc()
+
+    # Close the scene so the next scene of this worker starts from an empty scene
+    cmds.file( new=True, force=True )
+    result['seconds'] = time.perf_counter() - startTime
+
+    with open(os.path.join(job['outputDir'], job['name'] + '.json'), 'w') as resultFile:
+        json.dump(result, resultFile, indent=2)
+    return result
+
+def runJobs(jobs, outputDir, numWorkers = None):
+    """ Scatters all scenes in a pool of worker processes.
+        Params
+        ===
+            jobs: Scene jobs of loadJobs
+            outputDir: Directory of the result files
+            numWorkers (optional): Number of worker processes, None for the number of cores
+            return: A list with the result of each scene, in the order of the jobs
+    """
+    if not os.path.isdir(outputDir):
+        os.makedirs(outputDir)
+
+    # Each worker starts its own Maya, so workers are spawned instead of forked
+    numWorkers = min(numWorkers or os.cpu_count() or 1, max(len(jobs), 1))
+    results = [None] * len(jobs)
+    startTime = time.perf_counter()
+    with ProcessPoolExecutor( numWorkers, mp_context=multiprocessing.get_context('spawn'),
+                              initializer=initializeWorker ) as executor:
+        futures = dict( (executor.submit(scatterScene, job), index) for index, job in enumerate(jobs) )
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as error:
+                # The worker died, for example when Maya crashed on the scene
+                results[index] = { 'name': jobs[index]['name'], 'scene': jobs[index]['scene'], 'status': 'failed',
+                                   'error': '{}: {}'.format(type(error).__name__, error) }
+            result = results[index]
+            print('[{}/{}] {} {} ({} points, {:.1f} s)'.format( sum(r is not None for r in results), len(jobs),
+                  result['name'], result['status'], result.get('numPoints', 0), result.get('seconds', 0.0) ))
+            sys.stdout.flush()
+
+    summary = { 'numScenes': len(jobs), 'numFailed': sum(result['status'] != 'ok' for result in results),
+                'numWorkers': numWorkers, 'seconds': time.perf_counter() - startTime,
+                'scenes': [ dict( (key, result.get(key)) for key in ('name', 'scene', 'status', 'numPoints', 'seconds', 'error') )
+                            for result in results ] }
+    with open(os.path.join(outputDir, 'summary.json'), 'w') as summaryFile:
+        json.dump(summary, summaryFile, indent=2)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('jobFile', help='JSON file with the scenes to scatter')
+    parser.add_argument('--workers', type=int, help='Number of worker processes, defaults to the number of cores')
+    parser.add_argument('--output-dir', help='Directory of the result files, overrides the job file')
+    args = parser.parse_args()
+
+    outputDir, jobs = loadJobs( args.jobFile, args.output_dir )
+    results = runJobs( jobs, outputDir, args.workers )
+    numFailed = sum( result['status'] != 'ok' for result in results )
+    print('{} of {} scenes scattered, results in {}'.format(len(results) - numFailed, len(results), outputDir))
+    return 1 if numFailed > 0 else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
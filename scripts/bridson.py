@@ -0,0 +1,124 @@
+import math
+import random
+
+def bridsonPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, numCandidates = 30, seed = None):
+    """ Generates a Poisson-Disc point set within a given plane in linear time based on Bridson's algorithm.
+        New points are generated in an annulus around randomly chosen active points, and a background grid
+        with cell size radius / sqrt(2) holds at most one point per cell for constant time neighbour checks.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the sampling domain
+            xMax: Maximum x-coordinate of the sampling domain
+            zMin: Minimum z-coordinate of the sampling domain
+            zMax: Maximum z-coordinate of the sampling domain
+            radius: Disc radius (minimal distance between sample points)
+            numCandidates (optional): Number of candidates to try around an active point before it is retired
+            seed (optional): Seed of the random generator, None for a random seed
+            return: A list of sample points
+    """
+    samples = []
+    for batch in iterBridsonPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, numCandidates, seed):
+        samples.extend(batch)
+    return samples
+
+def iterBridsonPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, numCandidates = 30, seed = None, batchSize = 4096,
+                                   progress = None):
+    """ Generator version of bridsonPoissonDiscSampling which yields the samples in batches as they are accepted.
+        Params
+        ===
+            See bridsonPoissonDiscSampling
+            batchSize (optional): Number of samples per batch
+            progress (optional): Function called with an estimate of the covered fraction of the domain,
+                                 sampling stops when it returns True
+            return: A generator of lists of sample points
+    """
+    rng = random.Random(seed)
+
+    sizeX = xMax - xMin
+    sizeZ = zMax - zMin
+    if sizeX <= 0 or sizeZ <= 0:
+        return
+
+    # Background grid where each cell stores the index of the sample inside it (or -1)
+    cellSize = radius / math.sqrt(2)
+    cellSizeInvert = 1 / cellSize
+    numColumns = int(sizeX * cellSizeInvert) + 1
+    numRows = int(sizeZ * cellSizeInvert) + 1
+    grid = [-1] * (numColumns * numRows)
+
+    radiusSquared = radius * radius
+    sampleX = []
+    sampleZ = []
+    activeList = []
+
+    def isFarEnough(x, z, row, col):
+        # Points closer than the radius can be at most two cells away
+        for i in range(max(row - 2, 0), min(row + 3, numRows)):
+            rowOffset = i * numColumns
+            for j in range(max(col - 2, 0), min(col + 3, numColumns)):
+                index = grid[rowOffset + j]
+                if index >= 0:
+                    dX = sampleX[index] - x
+                    dZ = sampleZ[index] - z
+                    if dX * dX + dZ * dZ < radiusSquared:
+                        return False
+        return True
+
+    def addSample(x, z, row, col):
+        grid[row * numColumns + col] = len(sampleX)
+        activeList.append(len(sampleX))
+        sampleX.append(x)
+        sampleZ.append(z)
+
+    # Start from a random point in the domain
+    x = xMin + rng.random() * sizeX
+    z = zMin + rng.random() * sizeZ
+    addSample(x, z, int((z - zMin) * cellSizeInvert), int((x - xMin) * cellSizeInvert))
+
+    # A maximal set has roughly 0.65 samples per radius^2, used to estimate the progress
+    expectedSamples = max(0.65 * sizeX * sizeZ / radiusSquared, 1.0)
+    batchStart = 0
+    numIterations = 0
+
+    while len(activeList) > 0:
+        numIterations += 1
+        if progress is not None and (numIterations & 255) == 0:
+            if progress( min(len(sampleX) / expectedSamples, 1.0) ):
+                break
+
+        if len(sampleX) - batchStart >= batchSize:
+            yield list(zip(sampleX[batchStart:], sampleZ[batchStart:]))
+            batchStart = len(sampleX)
+
+        # Choose a random active point
+        activeIndex = int(rng.random() * len(activeList))
+        pX = sampleX[activeList[activeIndex]]
+        pZ = sampleZ[activeList[activeIndex]]
+
+        found = False
+        for _ in range(numCandidates):
+            # Uniformly distributed candidate in the annulus between radius and 2 * radius
+            angle = rng.random() * 2 * math.pi
+            distance = radius * math.sqrt(1 + 3 * rng.random())
+            x = pX + distance * math.cos(angle)
+            z = pZ + distance * math.sin(angle)
+            if x < xMin or x >= xMax or z < zMin or z >= zMax:
+                continue
+
+            row = int((z - zMin) * cellSizeInvert)
+            col = int((x - xMin) * cellSizeInvert)
+            # An occupied cell always contains a point closer than the radius
+            if grid[row * numColumns + col] >= 0:
+                continue
+            if isFarEnough(x, z, row, col):
+                addSample(x, z, row, col)
+                found = True
+                break
+
+        # Retire the point if no candidate was accepted (swap and pop to keep removal O(1))
+        if not found:
+            activeList[activeIndex] = activeList[-1]
+            activeList.pop()
+
+    if len(sampleX) > batchStart:
+        yield list(zip(sampleX[batchStart:], sampleZ[batchStart:]))
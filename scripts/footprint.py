@@ -0,0 +1,266 @@
+import math
+import numpy as np
+
+class FootprintMask(object):
+    """ Top-down raster of the area covered by the selected meshes in the xz-plane. The samplers skip squares
+        and samples outside of it, so that no darts are thrown and no rays are cast where there is no mesh.
+        A summed area table answers rectangle queries in constant time.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the raster
+            zMin: Minimum z-coordinate of the raster
+            cellLength: Side length of a cell
+            cells: (rows, columns) boolean array, rows along z and columns along x
+    """
+    def __init__(self, xMin, zMin, cellLength, cells):
+        self.xMin = xMin
+        self.zMin = zMin
+        self.cellLength = cellLength
+        self.cellLengthInvert = 1.0 / cellLength
+        self.cells = np.asarray(cells, dtype=bool)
+        self.numRows, self.numColumns = self.cells.shape
+
+        # Summed area table with a leading row and column of zeros
+        self.summedArea = np.zeros((self.numRows + 1, self.numColumns + 1), dtype=np.int32)
+        np.cumsum( np.cumsum(self.cells, axis=0, dtype=np.int32), axis=1, out=self.summedArea[1:, 1:] )
+
+    def coverage(self):
+        """ Returns the covered fraction of the raster. """
+        return float(self.summedArea[-1, -1]) / max(self.cells.size, 1)
+
+    def contains(self, x, z):
+        """ Checks if the given location lies in a covered cell. """
+        col = int((x - self.xMin) * self.cellLengthInvert)
+        row = int((z - self.zMin) * self.cellLengthInvert)
+        if x < self.xMin or z < self.zMin or col >= self.numColumns or row >= self.numRows:
+            return False
+        return self.cells[row, col]
+
+    def containsPoints(self, points):
+        """ Vectorised version of contains.
+            Params
+            ===
+                points: (N, 2) array of (x, z) coordinates
+                return: (N,) boolean array
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        cols = np.floor((points[:, 0] - self.xMin) * self.cellLengthInvert).astype(np.int64)
+        rows = np.floor((points[:, 1] - self.zMin) * self.cellLengthInvert).astype(np.int64)
+        inside = (cols >= 0) & (rows >= 0) & (cols < self.numColumns) & (rows < self.numRows)
+        result = np.zeros(len(points), dtype=bool)
+        result[inside] = self.cells[rows[inside], cols[inside]]
+        return result
+
+    def overlaps(self, xMin, zMin, xMax, zMax):
+        """ Checks if any covered cell overlaps the given rectangle. """
+        colMin = max( int(math.floor((xMin - self.xMin) * self.cellLengthInvert)), 0 )
+        rowMin = max( int(math.floor((zMin - self.zMin) * self.cellLengthInvert)), 0 )
+        colMax = min( int(math.floor((xMax - self.xMin) * self.cellLengthInvert)) + 1, self.numColumns )
+        rowMax = min( int(math.floor((zMax - self.zMin) * self.cellLengthInvert)) + 1, self.numRows )
+        if colMin >= colMax or rowMin >= rowMax:
+            return False
+        summedArea = self.summedArea
+        return (summedArea[rowMax, colMax] - summedArea[rowMin, colMax] - summedArea[rowMax, colMin] +
+                summedArea[rowMin, colMin]) > 0
+
+    def overlapsGrid(self, xMin, zMin, squareLength, numColumns, numRows):
+        """ Vectorised version of overlaps for a grid of equal squares.
+            Params
+            ===
+                xMin: Minimum x-coordinate of the grid
+                zMin: Minimum z-coordinate of the grid
+                squareLength: Side length of the grid squares
+                numColumns: Number of squares along x
+                numRows: Number of squares along z
+                return: (numRows, numColumns) boolean array, True where a square overlaps a covered cell
+        """
+        xEdges = xMin + squareLength * np.arange(numColumns + 1)
+        zEdges = zMin + squareLength * np.arange(numRows + 1)
+        return self.overlapsIntervals( xEdges[:-1], xEdges[1:], zEdges[:-1], zEdges[1:] )
+
+    def overlapsIntervals(self, xLow, xHigh, zLow, zHigh):
+        """ Checks the rectangles of every combination of a z-interval and an x-interval, see overlapsGrid.
+            Params
+            ===
+                xLow, xHigh: (numColumns,) arrays with the x-intervals, empty where xLow > xHigh
+                zLow, zHigh: (numRows,) arrays with the z-intervals, empty where zLow > zHigh
+                return: (numRows, numColumns) boolean array, True where a rectangle overlaps a covered cell
+        """
+        def cellRange(low, high, rasterMin, rasterSize):
+            cellLow = np.clip( np.floor((low - rasterMin) * self.cellLengthInvert).astype(np.int64), 0, rasterSize )
+            cellHigh = np.clip( np.floor((high - rasterMin) * self.cellLengthInvert).astype(np.int64) + 1, 0, rasterSize )
+            return cellLow, np.where(low <= high, np.maximum(cellHigh, cellLow), cellLow)
+
+        colMin, colMax = cellRange(np.asarray(xLow), np.asarray(xHigh), self.xMin, self.numColumns)
+        rowMin, rowMax = cellRange(np.asarray(zLow), np.asarray(zHigh), self.zMin, self.numRows)
+        summedArea = self.summedArea
+        counts = ( summedArea[rowMax[:, None], colMax[None, :]] - summedArea[rowMin[:, None], colMax[None, :]] -
+                   summedArea[rowMax[:, None], colMin[None, :]] + summedArea[rowMin[:, None], colMin[None, :]] )
+        return counts > 0
+
+    def crop(self, xMin, zMin, xMax, zMax):
+        """ Returns the part of the mask which overlaps the given rectangle, for example to send one tile of
+            the sampling domain to a worker process.
+        """
+        colMin = min( max( int(math.floor((xMin - self.xMin) * self.cellLengthInvert)), 0 ), self.numColumns )
+        rowMin = min( max( int(math.floor((zMin - self.zMin) * self.cellLengthInvert)), 0 ), self.numRows )
+        colMax = min( max( int(math.floor((xMax - self.xMin) * self.cellLengthInvert)) + 1, colMin ), self.numColumns )
+        rowMax = min( max( int(math.floor((zMax - self.zMin) * self.cellLengthInvert)) + 1, rowMin ), self.numRows )
+        return FootprintMask( self.xMin + colMin * self.cellLength, self.zMin + rowMin * self.cellLength,
+                              self.cellLength, self.cells[rowMin:rowMax, colMin:colMax] )
+
+    def clip(self, xMin, zMin, xMax, zMax):
+        """ Returns the mask limited to the exact rectangle, unlike crop which keeps whole cells. """
+        return ClippedFootprintMask( self, (xMin, zMin, xMax, zMax) )
+
+    def __getstate__(self):
+        # The summed area table is rebuilt after unpickling to keep the mask small for worker processes
+        return { 'xMin': self.xMin, 'zMin': self.zMin, 'cellLength': self.cellLength, 'cells': self.cells }
+
+    def __setstate__(self, state):
+        self.__init__( state['xMin'], state['zMin'], state['cellLength'], state['cells'] )
+
+class ClippedFootprintMask(object):
+    """ A FootprintMask limited to a rectangle which does not have to lie on cell borders, with the same queries.
+        Samplers reject darts outside of the rectangle before they are accepted, for example when only a region
+        of a scatter is sampled again.
+        Params
+        ===
+            footprint: A FootprintMask
+            rectangle: The rectangle (xMin, zMin, xMax, zMax)
+    """
+    def __init__(self, footprint, rectangle):
+        self.footprint = footprint
+        self.rectangle = tuple(rectangle)
+
+    def contains(self, x, z):
+        xMin, zMin, xMax, zMax = self.rectangle
+        return xMin <= x <= xMax and zMin <= z <= zMax and self.footprint.contains(x, z)
+
+    def containsPoints(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        xMin, zMin, xMax, zMax = self.rectangle
+        inside = (points[:, 0] >= xMin) & (points[:, 0] <= xMax) & (points[:, 1] >= zMin) & (points[:, 1] <= zMax)
+        return inside & self.footprint.containsPoints(points)
+
+    def overlaps(self, xMin, zMin, xMax, zMax):
+        xMin, zMin = max(xMin, self.rectangle[0]), max(zMin, self.rectangle[1])
+        xMax, zMax = min(xMax, self.rectangle[2]), min(zMax, self.rectangle[3])
+        return xMin <= xMax and zMin <= zMax and self.footprint.overlaps(xMin, zMin, xMax, zMax)
+
+    def overlapsGrid(self, xMin, zMin, squareLength, numColumns, numRows):
+        # The squares are clipped to the rectangle first, squares outside of it get empty intervals
+        xEdges = xMin + squareLength * np.arange(numColumns + 1)
+        zEdges = zMin + squareLength * np.arange(numRows + 1)
+        return self.footprint.overlapsIntervals( np.maximum(xEdges[:-1], self.rectangle[0]), np.minimum(xEdges[1:], self.rectangle[2]),
+                                                 np.maximum(zEdges[:-1], self.rectangle[1]), np.minimum(zEdges[1:], self.rectangle[3]) )
+
+def coverTriangles(cells, edgeNormals, edgeOffsets, rowMin, colMin, rowMax, colMax, span, xMin, zMin, cellLength):
+    """ Covers the cells of a group of triangles whose bounding boxes span at most span x span cells. A cell is
+        covered if its center lies at most half a cell diagonal outside of each edge of a triangle.
+        Params
+        ===
+            cells: The boolean raster to update
+            edgeNormals: (T, 3, 2) array of the inward unit normals of the edges
+            edgeOffsets: (T, 3) array of the dot products of the edge normals and the edge start points
+            rowMin, colMin, rowMax, colMax: (T,) arrays with the cell range of the bounding box of each triangle
+            span: Number of cells to test along each side of the bounding boxes
+            xMin: Minimum x-coordinate of the raster
+            zMin: Minimum z-coordinate of the raster
+            cellLength: Side length of a cell
+    """
+    halfDiagonal = cellLength * 0.70710678
+    for i in range(span):
+        rows = rowMin + i
+        for j in range(span):
+            cols = colMin + j
+            valid = (rows <= rowMax) & (cols <= colMax)
+            centerX = xMin + (cols + 0.5) * cellLength
+            centerZ = zMin + (rows + 0.5) * cellLength
+            distances = edgeNormals[:, :, 0] * centerX[:, None] + edgeNormals[:, :, 1] * centerZ[:, None] - edgeOffsets
+            inside = valid & (distances >= -halfDiagonal).all(axis=1)
+            cells[ rows[inside], cols[inside] ] = True
+
+def rasterizeFootprint(snapshots, xMin, zMin, xMax, zMax, cellLength, maxCells = 4096):
+    """ Rasterises the top-down projection of the triangles of the given meshes. The raster is conservative:
+        every cell which is touched by a triangle is covered, so no mesh area is lost at the borders.
+        Params
+        ===
+            snapshots: A MeshSnapshot per mesh, with the selected faces only
+            xMin: Minimum x-coordinate of the sampling domain
+            zMin: Minimum z-coordinate of the sampling domain
+            xMax: Maximum x-coordinate of the sampling domain
+            zMax: Maximum z-coordinate of the sampling domain
+            cellLength: Side length of a cell, increased if the raster would have more than maxCells columns or rows
+            maxCells (optional): Maximum number of columns and rows
+            return: A FootprintMask
+    """
+    cellLength = max( cellLength, (xMax - xMin) / float(maxCells), (zMax - zMin) / float(maxCells) )
+    numColumns = max( int(math.ceil((xMax - xMin) / cellLength)), 1 )
+    numRows = max( int(math.ceil((zMax - zMin) / cellLength)), 1 )
+    cells = np.zeros((numRows, numColumns), dtype=bool)
+    cellLengthInvert = 1.0 / cellLength
+
+    for snapshot in snapshots:
+        if len(snapshot.triangles) == 0:
+            continue
+        corners = snapshot.vertices[snapshot.triangles][:, :, [0, 2]]
+
+        # Cell range of the bounding box of each triangle
+        colMin = np.clip( np.floor((corners[:, :, 0].min(axis=1) - xMin) * cellLengthInvert).astype(np.int64), 0, numColumns - 1 )
+        colMax = np.clip( np.floor((corners[:, :, 0].max(axis=1) - xMin) * cellLengthInvert).astype(np.int64), 0, numColumns - 1 )
+        rowMin = np.clip( np.floor((corners[:, :, 1].min(axis=1) - zMin) * cellLengthInvert).astype(np.int64), 0, numRows - 1 )
+        rowMax = np.clip( np.floor((corners[:, :, 1].max(axis=1) - zMin) * cellLengthInvert).astype(np.int64), 0, numRows - 1 )
+        span = np.maximum(colMax - colMin, rowMax - rowMin) + 1
+
+        # Triangles which touch at most 2x2 cells cover their whole bounding box
+        small = span <= 2
+        for i in range(2):
+            for j in range(2):
+                cells[ np.minimum(rowMin[small] + i, rowMax[small]), np.minimum(colMin[small] + j, colMax[small]) ] = True
+
+        # Inward unit normals of the edges of the larger triangles, vertical triangles have no top-down area
+        edges = np.roll(corners, -1, axis=1) - corners
+        orientation = edges[:, 0, 0] * edges[:, 1, 1] - edges[:, 0, 1] * edges[:, 1, 0]
+        edgeLengths = np.maximum( np.hypot(edges[:, :, 0], edges[:, :, 1]), 1e-12 )
+        edgeNormals = np.stack(( -edges[:, :, 1], edges[:, :, 0] ), axis=2) * (np.sign(orientation)[:, None] / edgeLengths)[:, :, None]
+        edgeOffsets = (edgeNormals * corners).sum(axis=2)
+        large = ~small & (np.abs(orientation) > 1e-12)
+
+        # Test the cells of medium triangles in vectorised groups of similar size, and the few large ones one by one
+        previousSpan = 2
+        for groupSpan in (4, 8, 16):
+            group = np.nonzero( large & (span > previousSpan) & (span <= groupSpan) )[0]
+            if len(group) > 0:
+                coverTriangles( cells, edgeNormals[group], edgeOffsets[group], rowMin[group], colMin[group],
+                                rowMax[group], colMax[group], groupSpan, xMin, zMin, cellLength )
+            previousSpan = groupSpan
+        halfDiagonal = cellLength * 0.70710678
+        cols = np.arange(numColumns)
+        centerX = xMin + (cols + 0.5) * cellLength
+        for t in np.nonzero( large & (span > previousSpan) )[0].tolist():
+            for row in range(rowMin[t], rowMax[t] + 1):
+                centerZ = zMin + (row + 0.5) * cellLength
+                rowCols = slice(colMin[t], colMax[t] + 1)
+                distances = ( edgeNormals[t, :, 0] * centerX[rowCols, None] + edgeNormals[t, :, 1] * centerZ -
+                              edgeOffsets[t] )
+                cells[row, rowCols] |= (distances >= -halfDiagonal).all(axis=1)
+
+    return FootprintMask( xMin, zMin, cellLength, cells )
+
+def filterSamples(sampleBatches, footprint):
+    """ Removes the samples outside of the footprint from each batch of a sampler which does not support
+        footprint masks itself.
+        Params
+        ===
+            sampleBatches: A generator of lists or arrays of (x, z) or (x, z, label) samples
+            footprint: A FootprintMask
+            return: A generator of arrays with the samples inside of the footprint
+    """
+    for batch in sampleBatches:
+        batch = np.asarray(batch, dtype=np.float64)
+        if len(batch) == 0:
+            continue
+        batch = batch[ footprint.containsPoints(batch[:, :2]) ]
+        if len(batch) > 0:
+            yield batch
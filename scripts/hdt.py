@@ -1,8 +1,113 @@
-import maya.cmds as cmds
 import math
 import random
+from array import array
+import numpy as np
 
-def generateInitialActiveLists(xMin, zMin, baseLength, numColumns, maxLevels):
+from progress import ProgressReporter
+import instrumentation
+
+class SquarePool(object):
+    """ Array backed pool of squares where each square is stored by its (min x, max z) corner.
+        Squares are removed by swapping with the last element, which makes removal O(1).
+    """
+    def __init__(self):
+        self.xValues = array('d')
+        self.zValues = array('d')
+
+    def __len__(self):
+        return len(self.xValues)
+
+    def append(self, x, z):
+        self.xValues.append(x)
+        self.zValues.append(z)
+
+    def extend(self, xValues, zValues):
+        self.xValues.extend(xValues)
+        self.zValues.extend(zValues)
+
+    def pop(self, index):
+        """ Removes the square at the given index by moving the last square into its place.
+            Params
+            ===
+                index: Index of the square to remove
+                return: The (x, z) corner of the removed square
+        """
+        x = self.xValues[index]
+        z = self.zValues[index]
+        lastX = self.xValues.pop()
+        lastZ = self.zValues.pop()
+        if index < len(self.xValues):
+            self.xValues[index] = lastX
+            self.zValues[index] = lastZ
+        return x, z
+
+    def popRandom(self, rng = random):
+        """ Removes and returns a uniformly chosen square.
+            Params
+            ===
+                rng (optional): Random generator to use, defaults to the random module
+                return: The (x, z) corner of the removed square
+        """
+        return self.pop( int(rng.random() * len(self.xValues)) )
+
+class FenwickTree(object):
+    """ Binary indexed tree over a fixed number of non-negative values, used to select an index
+        with probability proportional to its value in O(log n).
+    """
+    def __init__(self, size):
+        self.size = size
+        self.values = [0.0] * size
+        self.tree = [0.0] * (size + 1)
+        self.highestBit = 1
+        while self.highestBit * 2 <= size:
+            self.highestBit *= 2
+
+    def set(self, index, value):
+        """ Sets the value at the given index.
+            Params
+            ===
+                index: Index of the value to set
+                value: The new value
+        """
+        delta = value - self.values[index]
+        self.values[index] = value
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & (-i)
+
+    def rebuild(self):
+        """ Recomputes the tree from the stored values to remove accumulated rounding errors. """
+        self.tree = [0.0] * (self.size + 1)
+        for index in range(self.size):
+            i = index + 1
+            while i <= self.size:
+                self.tree[i] += self.values[index]
+                i += i & (-i)
+
+    def total(self):
+        """ Returns the sum of all values. """
+        return sum(self.values)
+
+    def find(self, value):
+        """ Finds the smallest index where the cumulative sum exceeds the given value.
+            Params
+            ===
+                value: A value in the interval [0, total)
+                return: The index of the value interval containing the given value
+        """
+        position = 0
+        remaining = value
+        step = self.highestBit
+        while step > 0:
+            nextPosition = position + step
+            if nextPosition <= self.size and self.tree[nextPosition] <= remaining:
+                position = nextPosition
+                remaining -= self.tree[nextPosition]
+            step //= 2
+        return min(position, self.size - 1)
+
+def generateInitialActiveLists(xMin, zMin, baseLength, numColumns, maxLevels, footprint = None):
     """ Generates a list of active lists and computes the squares of the base level (index 0)
         based on given minimum coordinates and base square length.
         Params
@@ -12,7 +117,8 @@ def generateInitialActiveLists(xMin, zMin, baseLength, numColumns, maxLevels):
             baseLength: The side length of each square of the base level
             numColumns: Number of rows and columns of base squares
             maxLevels: Maximum number of active lists (limited by the numerical precision used)
-            return: A list of active lists and with the squares of the base level
+            footprint (optional): A FootprintMask, base squares outside of it are left out
+            return: A list of active lists (SquarePool) with the squares of the base level
     """
     
     # Compute the min corner coordinates of each base square
@@ -22,13 +128,23 @@ def generateInitialActiveLists(xMin, zMin, baseLength, numColumns, maxLevels):
         xValues.append( xMin + baseLength * i )
         zValues.append( zMin + baseLength * ( i + 1 ) )
     
-    # Create a list of lists
-    activeLists = [ [] for _ in range(maxLevels) ]
+    # Create a list of square pools
+    activeLists = [ SquarePool() for _ in range(maxLevels) ]
     
     # Add base squares to the base level (index 0) of active lists
-    for i in range(numColumns):
-        for j in range(numColumns):
-            activeLists[0].append((xValues[i], zValues[j]))
+    if footprint is None:
+        for i in range(numColumns):
+            activeLists[0].extend( [xValues[i]] * numColumns, zValues )
+    else:
+        # Test the squares against the footprint a block of columns at a time to bound the memory use
+        zArray = np.array(zValues)
+        blockSize = 256
+        for start in range(0, numColumns, blockSize):
+            count = min(blockSize, numColumns - start)
+            overlaps = footprint.overlapsGrid(xValues[start], zMin, baseLength, count, numColumns)
+            for i in range(count):
+                keptZValues = zArray[ overlaps[:, i] ].tolist()
+                activeLists[0].extend( [xValues[start + i]] * len(keptZValues), keptZValues )
             
     return activeLists
 
@@ -58,189 +174,341 @@ def euclideanDistance(P1, P2):
     return math.sqrt( A * A + B * B )
     
 
-def isOutOfRange(x, min, max):
-    """ Checks if the given value is outside of the given interval.
+class SampleGrid(object):
+    """ Sparse grid of the samples of one square for the minimum distance checks. Cells have the length
+        radius / sqrt(2), so a cell holds at most one sample and the grid only stores the cells which hold one.
+        Memory grows with the number of samples instead of the area of the square.
         Params
         ===
-            x: Value of which to test
-            min: Minimum value of the interval
-            max: Maximum value of the interval
+            xMin: Minimum x-coordinate of the square
+            zMin: Minimum z-coordinate of the square
+            length: Side length of the square
+            radius: Disc radius (minimal distance between sample points)
     """
-    return  x < min or x > max
+    def __init__(self, xMin, zMin, length, radius):
+        self.cellLength = radius / 1.41421356237
+        self.cellLengthInvert = 1 / self.cellLength
+        self.radiusSquared = radius * radius
+        
+        # A margin of two cells around the square holds the points of neighbouring regions which can be
+        # closer than the radius to a sample of the square
+        self.xMin = xMin - 2 * self.cellLength
+        self.zMin = zMin - 2 * self.cellLength
+        self.numColumns = int(length * self.cellLengthInvert) + 5
+        
+        # Cell index -> index of the sample in the coordinate arrays
+        self.cells = {}
+        self.xValues = array('d')
+        self.zValues = array('d')
+        
+        # Points closer than the radius lie at most two cells away, the corners of the 5x5 neighbourhood are
+        # always at least the radius away
+        self.neighbourOffsets = tuple( i * self.numColumns + j for i in range(-2, 3) for j in range(-2, 3)
+                                       if abs(i) + abs(j) < 4 )
+    
+    def __len__(self):
+        return len(self.xValues)
+    
+    def cellIndex(self, x, z):
+        """ Returns the index of the cell containing the given location, or -1 if it is outside of the grid. """
+        if x < self.xMin or z < self.zMin:
+            return -1
+        col = int((x - self.xMin) * self.cellLengthInvert)
+        row = int((z - self.zMin) * self.cellLengthInvert)
+        if col >= self.numColumns or row >= self.numColumns:
+            return -1
+        return row * self.numColumns + col
     
+    def insert(self, x, z):
+        """ Adds a point, points outside of the square and its margin are ignored since they can not be closer
+            than the radius to a sample of the square.
+            Params
+            ===
+                x: X-coordinate of the point
+                z: Z-coordinate of the point
+                return: True if the point was added
+        """
+        cell = self.cellIndex(x, z)
+        if cell < 0 or cell in self.cells:
+            return False
+        self.cells[cell] = len(self.xValues)
+        self.xValues.append(x)
+        self.zValues.append(z)
+        return True
+    
+    def isClear(self, cX, cZ, squareLength = 0):
+        """ Checks that no point lies within the radius of the given location, or of any location in the
+            given square. The location has to be inside of the square of the grid.
+            Params
+            ===
+                cX: X-coordinate of the location or square center
+                cZ: Z-coordinate of the location or square center
+                squareLength (optional): Side length of the square, 0 to check a single location
+                return: True if no point is too close
+        """
+        cell = ( int((cZ - self.zMin) * self.cellLengthInvert) * self.numColumns +
+                 int((cX - self.xMin) * self.cellLengthInvert) )
+        cells = self.cells
+        xValues = self.xValues
+        zValues = self.zValues
+        halfLength = squareLength * 0.5
+        radiusSquared = self.radiusSquared
+        for offset in self.neighbourOffsets:
+            index = cells.get(cell + offset)
+            if index is not None:
+                # Distance to the farthest corner of the square, or to the location itself
+                A = abs(xValues[index] - cX) + halfLength
+                B = abs(zValues[index] - cZ) + halfLength
+                if A * A + B * B < radiusSquared:
+                    return False
+        return True
 
-def checkNeighboursMinDistance(lookupGrid, cX, cZ, row, col, gridDims, radius, squareLength = 0):
-    """ In a 3x3 neighbourhood from the given lookup grid, check min distance based on given disc radius.
-        Function returns true if no points lays within the minimum distance of given coordinates.
+class ConstraintGrid(object):
+    """ Sparse grid of points where each point has its own minimum distance, for example the samples of
+        other classes in multi-class sampling. The cell length is the largest minimum distance.
         Params
         ===
-            lookupGrid: An acceleration grid for quickly getting points close to each other
-            cX: X-coordinate of point to check min distance
-            cZ: Z-coordinate of point to check min distance
-            row: Row index for the lookup grid of the point to check min distance
-            col: Column index for the lookup grid of the point to check min distance
-            gridDims: Num of rows and columns of the lookup grid
-            radius: The radius used to check min distance
-            squareLength (optional): Side length of a square to check if its covered by a point based on min distance
-            return: A boolean set to True if the min distance check is passed
+            cellLength: Largest minimum distance of the points that will be inserted
     """
-    for i in range(-1, 2):
-            # Make sure not to look outside of grid range
-            if isOutOfRange(row + i, 0, gridDims - 1):
-                continue
-                
-            for j in range(-1, 2):
-                # Make sure not to look outside of grid range
-                if isOutOfRange(col + j, 0, gridDims - 1):
-                    continue 
-                 
-                lookupIndex = gridDims * (row + i) + (col + j)
-                
-                # Do minimum distance check with all points in current grid cell
-                for point in lookupGrid[lookupIndex]:
-                    # If a square length is provided, check if the square is clear from a point
+    def __init__(self, cellLength):
+        self.cellLength = cellLength
+        self.cellLengthInvert = 1 / cellLength
+        self.cells = {}
+
+    def insert(self, x, z, distance):
+        key = ( int(math.floor(x * self.cellLengthInvert)), int(math.floor(z * self.cellLengthInvert)) )
+        if key in self.cells:
+            self.cells[key].append((x, z, distance))
+        else:
+            self.cells[key] = [(x, z, distance)]
+
+    def isClear(self, cX, cZ, squareLength = 0):
+        """ Checks that no point lies within its minimum distance of the given location, or of any location
+            in the given square.
+            Params
+            ===
+                cX: X-coordinate of the location or square center
+                cZ: Z-coordinate of the location or square center
+                squareLength (optional): Side length of the square, 0 to check a single location
+                return: True if no point is too close
+        """
+        col = int(math.floor(cX * self.cellLengthInvert))
+        row = int(math.floor(cZ * self.cellLengthInvert))
+        for i in range(col - 1, col + 2):
+            for j in range(row - 1, row + 2):
+                for point in self.cells.get((i, j), ()):
                     if squareLength > 0:
-                        if farthestCornerDistance(point, (cX, cZ), squareLength) < radius:
-                            return False
-                    else:
-                        if euclideanDistance(point, (cX, cZ)) < radius:
+                        if farthestCornerDistance(point, (cX, cZ), squareLength) < point[2]:
                             return False
-                        
-    return True    
+                    elif euclideanDistance(point, (cX, cZ)) < point[2]:
+                        return False
+        return True
 
-def hdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radius):
-    """ Generates a maximal point set within a given plane based on Poisson-Disc Sampling.
-        The method is called Hierarchical Dart Throwing which relies on quadtree subdivisions of the sampling domain.
+def countHdtStats(numIterations, numDarts, numCovered, numSubdivided, numSamples):
+    """ Adds the counters of the dart throwing loop to the active instrumentation stats. """
+    if instrumentation.currentStats() is not None:
+        instrumentation.count('hdtSquaresPopped', numIterations)
+        instrumentation.count('hdtDartsThrown', numDarts)
+        instrumentation.count('hdtSquaresCovered', numCovered)
+        instrumentation.count('hdtSquaresSubdivided', numSubdivided)
+        instrumentation.count('hdtSamplesAccepted', numSamples)
+
+def hdtSampleSquare(xMin, zMin, length, radius, rng, constraintPoints = (), maxIterations = None, progress = None,
+                    constraintGrid = None, footprint = None):
+    """ Collects all batches of iterHdtSampleSquare into one list.
         Params
         ===
-            xMin: Minimum x-coordinate of the sampling domain
-            xMax: Maximum x-coordinate of the sampling domain
-            zMin: Minimum z-coordinate of the sampling domain
-            zMax: Maximum z-coordinate of the sampling domain
+            See iterHdtSampleSquare
+            return: A list of sample points inside the square
+    """
+    samples = []
+    for batch in iterHdtSampleSquare(xMin, zMin, length, radius, rng, constraintPoints, maxIterations, progress=progress,
+                                     constraintGrid=constraintGrid, footprint=footprint):
+        samples.extend(batch)
+    return samples
+
+def iterHdtSampleSquare(xMin, zMin, length, radius, rng, constraintPoints = (), maxIterations = None,
+                        batchSize = 4096, progress = None, constraintGrid = None, footprint = None, progressInterval = 256):
+    """ Runs Hierarchical Dart Throwing inside a square region and yields the samples in batches as they are found.
+        Points which already exist around the region (for example the samples of neighbouring tiles) can be given
+        as constraints, no sample is placed within the disc radius of them.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the square
+            zMin: Minimum z-coordinate of the square
+            length: Side length of the square
             radius: Disc radius (minimal distance between sample points)
-            return: A list of sample points
+            rng: Random generator (random.Random) used to throw the darts
+            constraintPoints (optional): A list of (x, z) points, only points closer than radius to the square matter
+            maxIterations (optional): Maximum number of darts to throw, None for no limit
+            batchSize (optional): Number of samples per batch
+            progress (optional): Function called every progressInterval darts with the covered fraction of the area,
+                                 sampling stops when it returns True
+            constraintGrid (optional): A ConstraintGrid with points that have their own minimum distance
+            footprint (optional): A FootprintMask, squares outside of it are discarded and no samples are placed outside of it
+            progressInterval (optional): Number of darts between two progress calls
+            return: A generator of lists of sample points inside the square
     """
     # Base grid settings
-    length = max(xMax - xMin, zMax - zMin)
     baseLength = length / math.ceil( length * ( 1.41421356237 / radius ) )
-    numColumns = int(length / baseLength)
-    
-    # Store this as a variable to save computation time
-    radiusInvert = 1 / radius 
+    numColumns = int(round(length / baseLength))
     
     # Generate lists of active lists (including the base level squares)
     maxLevels = 16
-    activeLists = generateInitialActiveLists(xMin, zMin, baseLength, numColumns, maxLevels)
+    activeLists = generateInitialActiveLists(xMin, zMin, baseLength, numColumns, maxLevels, footprint)
+    numSquares = len(activeLists[0])
+    if numSquares == 0:
+        return
     
-    # Create a list to keep track of the area of the current active squares for each list
-    activeListAreas = [0] * maxLevels
-    areaTotal = length * length
-    activeListAreas[0] = areaTotal
+    # Side length and area of the squares at each level
+    squareLengths = [ baseLength / pow(2, i) for i in range(maxLevels) ]
+    squareAreas = [ l * l for l in squareLengths ]
     
-    # Create acceleration grid for minimum distance lookup where each cell has the length = disc radius
-    gridDims = int(length * radiusInvert) + 1
-    lookupGrid = [ [] for _ in range(gridDims*gridDims) ]
-    
-    # Open a progress window
+    # Keep track of the area of the current active squares for each list to select a level proportional to area
+    activeListAreas = FenwickTree(maxLevels)
+    activeListAreas.set(0, numSquares * squareAreas[0])
+    areaTotal = activeListAreas.total()
     maxAreaInv = 1 / areaTotal
-    cmds.progressWindow(title='Generating samples..', progress=0, status='Progress: 0%', isInterruptable=True)
-
-    # A list to store the final samples
+    
+    # Create a sparse acceleration grid for the minimum distance lookups, which also holds the constraint points
+    lookupGrid = SampleGrid(xMin, zMin, length, radius)
+    for point in constraintPoints:
+        lookupGrid.insert(point[0], point[1])
+    
+    # A list to store the samples of the current batch
     samples = []
     
+    # Counters for the instrumentation, added to the active stats with each batch
     numIterations = 0
-    maxIterations = 100000
-    while areaTotal > 0.00001:
-        if numIterations > maxIterations:
+    numDarts = 0
+    numCovered = 0
+    numSubdivided = 0
+    while numSquares > 0:
+        if maxIterations is not None and numIterations >= maxIterations:
             break
         
         numIterations += 1
         
-        amount = (1 - (areaTotal * maxAreaInv)) * 100.0
-        if int(amount) % 5 == 0:
-            cmds.progressWindow(edit=True, progress=amount, status='Progress: %d%%' % amount)
+        # Report progress and check for cancellation only every few hundred darts
+        if progress is not None and numIterations % progressInterval == 0:
+            if progress(1 - (areaTotal * maxAreaInv)):
+                break
         
-        currentSquare = None
-          
         # Select an active list based on the probability proportional to the area
-        activeListIndex = 0
-        previous = 0.0
-        probabilityProportionalToArea = areaTotal * random.uniform(0, 0.999999)
-        for i in range(len(activeLists)):
-            # If the current active list does not contain any active squares, move on to check next level
-            if len(activeLists[i]) > 0:
-                if previous <= probabilityProportionalToArea and probabilityProportionalToArea < activeListAreas[i]:
-                    # Randomly choose a square from the active list
-                    randomIndex = random.randint( 0, len(activeLists[i]) - 1 )
-                    currentSquare = activeLists[i][randomIndex]
-                    
-                    # Remove selected square from active list
-                    activeLists[i].pop(randomIndex)
-                    
-                    # Save chosen active list index
-                    activeListIndex = i
-                    break
-                    
-            previous = activeListAreas[i]
-            
-        if currentSquare == None:
-            continue;
-
-        # Subtract current square area from total area and active list area
-        squareLength = baseLength / pow(2, activeListIndex)
-        squareArea = squareLength * squareLength
-        activeListAreas[activeListIndex] = max(activeListAreas[activeListIndex] - squareArea, 0)
-        areaTotal = max(areaTotal - squareArea, 0)
+        activeListIndex = activeListAreas.find( rng.uniform(0, areaTotal) )
+        activeList = activeLists[activeListIndex]
+        if len(activeList) == 0:
+            # Only reachable through rounding errors in the cumulative areas
+            activeListAreas.set(activeListIndex, 0.0)
+            activeListAreas.rebuild()
+            areaTotal = activeListAreas.total()
+            continue
+        
+        # Randomly choose a square from the active list and remove it
+        currentSquare = activeList.popRandom(rng)
+        numSquares -= 1
+
+        # Subtract current square area from the active list area
+        squareLength = squareLengths[activeListIndex]
+        activeListAreas.set(activeListIndex, len(activeList) * squareAreas[activeListIndex])
+        areaTotal = activeListAreas.total()
          
         # Calculate the center of the square point
         sX = currentSquare[0] + (squareLength * 0.5)
         sZ = currentSquare[1] - (squareLength * 0.5)
         
-        # Calculate the row and column for the lookup grid
-        sRow = int((sZ - zMin) * radiusInvert)
-        sCol = int((sX - xMin) * radiusInvert)
-        
-        # Check 3x3 neighbourhood to see if the selected square is covered by a point
-        squareIsClear = checkNeighboursMinDistance(lookupGrid, sX, sZ, sRow, sCol, gridDims, radius, squareLength)
+        # Check the neighbourhood to see if the selected square is covered by a point
+        squareIsClear = lookupGrid.isClear(sX, sZ, squareLength)
+        if squareIsClear and constraintGrid is not None:
+            squareIsClear = constraintGrid.isClear(sX, sZ, squareLength)
         if squareIsClear == False:
+            numCovered += 1
             continue
         
         # Generate random point inside square (throw a dart)
-        rX = currentSquare[0] + random.uniform(0, 1) * squareLength
-        rZ = currentSquare[1] - random.uniform(0, 1) * squareLength
-        rRow = int((rZ - zMin) * radiusInvert)
-        rCol = int((rX - xMin) * radiusInvert)
+        numDarts += 1
+        rX = currentSquare[0] + rng.random() * squareLength
+        rZ = currentSquare[1] - rng.random() * squareLength
         
-        # Check if the new point satisfies the minimum distance requirement
-        if checkNeighboursMinDistance(lookupGrid, rX, rZ, rRow, rCol, gridDims, radius):
+        # Check if the new point is inside the footprint and satisfies the minimum distance requirement,
+        # otherwise the square is subdivided to find the parts that are still free
+        if ( (footprint is None or footprint.contains(rX, rZ)) and lookupGrid.isClear(rX, rZ) and
+             (constraintGrid is None or constraintGrid.isClear(rX, rZ)) ):
             # Add new point to both lookup grid and samples set
-            lookupIndex = gridDims * rRow + rCol
-            if lookupIndex < len(lookupGrid):
-                lookupGrid[lookupIndex].append((rX, rZ))
-                samples.append((rX, rZ))
+            lookupGrid.insert(rX, rZ)
+            samples.append((rX, rZ))
+            if len(samples) >= batchSize:
+                countHdtStats(numIterations, numDarts, numCovered, numSubdivided, len(samples))
+                numIterations = numDarts = numCovered = numSubdivided = 0
+                yield samples
+                samples = []
             
         # Subdivide the square into four child squares with half the side length 
         elif (activeListIndex + 1) < maxLevels:
-            childLength = squareLength * 0.5
-            childArea = (childLength * childLength)
+            numSubdivided += 1
+            childList = activeLists[activeListIndex + 1]
+            childLength = squareLengths[activeListIndex + 1]
             for i in range(2):
                 for j in range(2):
-                    childX = (currentSquare[0] + (childLength * i)) + (childLength * 0.5)
-                    childZ = (currentSquare[1] - (childLength * j)) - (childLength * 0.5)
-                    childRow = int((childZ - zMin) * radiusInvert)
-                    childCol = int((childX - xMin) * radiusInvert)
+                    # Child squares are stored by their corner, like the base squares
+                    childX = currentSquare[0] + (childLength * i)
+                    childZ = currentSquare[1] - (childLength * j)
+                    childCenterX = childX + (childLength * 0.5)
+                    childCenterZ = childZ - (childLength * 0.5)
                     
-                    # Check 3x3 neighbourhood if the square is clear from any point
-                    childIsClear = checkNeighboursMinDistance(lookupGrid, sX, sZ, sRow, sCol, gridDims, radius, childLength)
+                    # Check the neighbourhood if the square is clear from any point
+                    childIsClear = lookupGrid.isClear(childCenterX, childCenterZ, childLength)
+                    if childIsClear and constraintGrid is not None:
+                        childIsClear = constraintGrid.isClear(childCenterX, childCenterZ, childLength)
+                    if childIsClear and footprint is not None:
+                        childIsClear = footprint.overlaps(childX, childZ - childLength, childX + childLength, childZ)
                     if childIsClear:
                         # Add child square to active list in next level
-                        activeLists[activeListIndex + 1].append((childX, childZ))
-                        # Update active list area
-                        activeListAreas[activeListIndex + 1] += childArea
-                        # Update total area
-                        areaTotal += childArea
+                        childList.append(childX, childZ)
+                        numSquares += 1
+                        
+            # Update active list area
+            activeListAreas.set(activeListIndex + 1, len(childList) * squareAreas[activeListIndex + 1])
+            areaTotal = activeListAreas.total()
+    
+    countHdtStats(numIterations, numDarts, numCovered, numSubdivided, len(samples))
+    if len(samples) > 0:
+        yield samples
 
-    cmds.progressWindow(endProgress=1)
+def iterHdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, maxIterations = None, seed = None, batchSize = 4096,
+                               progress = None, footprint = None):
+    """ Generator version of hdtPoissonDiscSampling which yields the samples in batches as they are found.
+        Params
+        ===
+            See hdtPoissonDiscSampling
+            batchSize (optional): Number of samples per batch
+            progress (optional): Function called with the covered fraction of the area, sampling stops when it returns True
+            return: A generator of lists of sample points
+    """
+    rng = random.Random(seed)
+    length = max(xMax - xMin, zMax - zMin)
+    return iterHdtSampleSquare(xMin, zMin, length, radius, rng, maxIterations=maxIterations, batchSize=batchSize,
+                               progress=progress, footprint=footprint)
+
+def hdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, maxIterations = None, seed = None, footprint = None):
+    """ Generates a maximal point set within a given plane based on Poisson-Disc Sampling.
+        The method is called Hierarchical Dart Throwing which relies on quadtree subdivisions of the sampling domain.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the sampling domain
+            xMax: Maximum x-coordinate of the sampling domain
+            zMin: Minimum z-coordinate of the sampling domain
+            zMax: Maximum z-coordinate of the sampling domain
+            radius: Disc radius (minimal distance between sample points)
+            maxIterations (optional): Maximum number of darts to throw, None for no limit
+            seed (optional): Seed of the random generator, None for a random seed
+            footprint (optional): A FootprintMask of the area to sample, the whole domain if None
+            return: A list of sample points (the points found so far if the progress window is cancelled)
+    """
+    samples = []
+    with ProgressReporter('Generating samples..') as reporter:
+        for batch in iterHdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, maxIterations, seed,
+                                                progress=reporter.update, footprint=footprint):
+            samples.extend(batch)
     
     return samples
-        
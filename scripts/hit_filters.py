@@ -0,0 +1,228 @@
+try:
+    import maya.cmds as mayaCmds
+except ImportError:
+    # Filters run outside of Maya as well, only curves given by name need maya.cmds
+    mayaCmds = None
+
+import math
+
+import numpy as np
+
+import instrumentation
+
+class SlopeFilter(object):
+    """ Keeps the hits where the angle between the surface normal and the y-axis lies in a range, for example
+        to keep trees off cliffs.
+        Params
+        ===
+            minAngle (optional): Minimum slope in degrees, 0 is flat ground
+            maxAngle (optional): Maximum slope in degrees, 90 is a vertical wall
+    """
+    def __init__(self, minAngle = 0.0, maxAngle = 90.0):
+        self.minAngle = minAngle
+        self.maxAngle = maxAngle
+
+    def __call__(self, positions, normals, rng):
+        # Compare the y-component of the unit normals with the cosines instead of computing the angles
+        lengths = np.maximum( np.linalg.norm(normals, axis=1), 1e-12 )
+        cosines = normals[:, 1] / lengths
+        return (cosines <= math.cos(math.radians(self.minAngle)) + 1e-9) & (cosines >= math.cos(math.radians(self.maxAngle)) - 1e-9)
+
+class HeightFilter(object):
+    """ Keeps the hits with a y-coordinate in a range, for example to keep plants above the water line.
+        Params
+        ===
+            minHeight (optional): Minimum height, None for no limit
+            maxHeight (optional): Maximum height, None for no limit
+    """
+    def __init__(self, minHeight = None, maxHeight = None):
+        self.minHeight = minHeight
+        self.maxHeight = maxHeight
+
+    def __call__(self, positions, normals, rng):
+        keep = np.ones(len(positions), dtype=bool)
+        if self.minHeight is not None:
+            keep &= positions[:, 1] >= self.minHeight
+        if self.maxHeight is not None:
+            keep &= positions[:, 1] <= self.maxHeight
+        return keep
+
+class NormalConeFilter(object):
+    """ Keeps the hits whose surface normal lies within a cone around a direction, for example to keep moss
+        on the north side of rocks.
+        Params
+        ===
+            direction: (x, y, z) axis of the cone
+            maxAngle: Opening half-angle of the cone in degrees
+    """
+    def __init__(self, direction, maxAngle):
+        direction = np.asarray(direction, dtype=np.float64).reshape(3)
+        self.direction = direction / max( np.linalg.norm(direction), 1e-12 )
+        self.maxAngle = maxAngle
+
+    def __call__(self, positions, normals, rng):
+        lengths = np.maximum( np.linalg.norm(normals, axis=1), 1e-12 )
+        return normals.dot(self.direction) / lengths >= math.cos(math.radians(self.maxAngle)) - 1e-9
+
+class CurveFalloffFilter(object):
+    """ Keeps the hits with a probability which falls off with their distance to a curve in the xz-plane,
+        for example to thin out vegetation along a path or to gather it along a river.
+        The probability is 1 up to innerDistance and falls linearly to 0 at outerDistance.
+        Params
+        ===
+            points: (M, 3) array with points along the curve, connected as a polyline
+            innerDistance: Distance up to which all hits are kept
+            outerDistance: Distance from which on no hits are kept
+            invert (optional): Keep the hits away from the curve instead, with one minus the probability
+    """
+    def __init__(self, points, innerDistance, outerDistance, invert = False):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)[:, [0, 2]]
+        if len(points) == 0:
+            raise ValueError("A curve filter needs at least one curve point")
+        if len(points) == 1:
+            points = np.concatenate(( points, points ))
+        self.segmentStarts = points[:-1]
+        self.segmentVectors = points[1:] - points[:-1]
+        self.segmentLengthsSquared = np.maximum( (self.segmentVectors ** 2).sum(axis=1), 1e-12 )
+        self.innerDistance = innerDistance
+        self.outerDistance = max( outerDistance, innerDistance )
+        self.invert = invert
+
+    def distances(self, positions, chunkSize = 4096):
+        """ Returns the xz-distance of each position to the polyline, in chunks to bound the (N, M) temporaries. """
+        points = positions[:, [0, 2]]
+        result = np.empty(len(points))
+        for start in range(0, len(points), chunkSize):
+            chunk = points[start:start + chunkSize]
+            offsets = chunk[:, None, :] - self.segmentStarts[None, :, :]
+            t = np.clip( (offsets * self.segmentVectors[None, :, :]).sum(axis=2) / self.segmentLengthsSquared, 0.0, 1.0 )
+            closest = offsets - t[:, :, None] * self.segmentVectors[None, :, :]
+            result[start:start + chunkSize] = np.sqrt( (closest ** 2).sum(axis=2).min(axis=1) )
+        return result
+
+    def __call__(self, positions, normals, rng):
+        distances = self.distances(positions)
+        falloff = self.outerDistance - self.innerDistance
+        if falloff > 0:
+            probabilities = np.clip( (self.outerDistance - distances) / falloff, 0.0, 1.0 )
+        else:
+            probabilities = (distances <= self.innerDistance).astype(np.float64)
+        if self.invert:
+            probabilities = 1.0 - probabilities
+        return rng.random(len(positions)) < probabilities
+
+class MaskFilter(object):
+    """ Keeps the hits with the probability of a mask image projected from the top onto the bounding box of the
+        scatter, white keeps all hits and black none. The mask is sampled with bilinear interpolation.
+        Params
+        ===
+            mask: 2D array of values in [0, 1], rows along z and columns along x (see loadDensityImage)
+            xMin: Minimum x-coordinate of the mask
+            xMax: Maximum x-coordinate of the mask
+            zMin: Minimum z-coordinate of the mask
+            zMax: Maximum z-coordinate of the mask
+    """
+    def __init__(self, mask, xMin, xMax, zMin, zMax):
+        self.mask = np.clip( np.asarray(mask, dtype=np.float64), 0.0, 1.0 )
+        if self.mask.ndim != 2 or self.mask.size == 0:
+            raise ValueError("Mask array must be two dimensional")
+        self.xMin = xMin
+        self.zMin = zMin
+        numRows, numColumns = self.mask.shape
+        self.colScale = (numColumns - 1) / float(xMax - xMin) if xMax > xMin else 0.0
+        self.rowScale = (numRows - 1) / float(zMax - zMin) if zMax > zMin else 0.0
+
+    def sample(self, positions):
+        numRows, numColumns = self.mask.shape
+        cols = np.clip( (positions[:, 0] - self.xMin) * self.colScale, 0.0, numColumns - 1 )
+        rows = np.clip( (positions[:, 2] - self.zMin) * self.rowScale, 0.0, numRows - 1 )
+        col0 = np.minimum( cols.astype(np.int64), max(numColumns - 2, 0) )
+        row0 = np.minimum( rows.astype(np.int64), max(numRows - 2, 0) )
+        col1 = np.minimum( col0 + 1, numColumns - 1 )
+        row1 = np.minimum( row0 + 1, numRows - 1 )
+        tX = cols - col0
+        tZ = rows - row0
+        mask = self.mask
+        top = mask[row0, col0] * (1 - tX) + mask[row0, col1] * tX
+        bottom = mask[row1, col0] * (1 - tX) + mask[row1, col1] * tX
+        return top * (1 - tZ) + bottom * tZ
+
+    def __call__(self, positions, normals, rng):
+        return rng.random(len(positions)) < self.sample(positions)
+
+def sampleCurve( curveName, numPoints = 200, cmds = None ):
+    """ Samples world space points along a NURBS curve in the scene.
+        Params
+        ===
+            curveName: Name of the curve
+            numPoints (optional): Number of points, evenly spaced in the curve parameter
+            cmds (optional): Module used for scene commands, defaults to maya.cmds
+            return: (numPoints, 3) array of points
+    """
+    cmds = mayaCmds if cmds is None else cmds
+    minValue, maxValue = cmds.getAttr( '{}.minMaxValue'.format(curveName) )[0]
+    return np.array([ cmds.pointOnCurve( curveName, parameter=u, position=True )
+                      for u in np.linspace(minValue, maxValue, numPoints).tolist() ]).reshape(-1, 3)
+
+def createHitFilters( filterSettings, bbox, loadMask = None ):
+    """ Creates the filters described in the settings of a scatter.
+        Params
+        ===
+            filterSettings: A list of dictionaries with a 'type' and the parameters of a filter:
+                            { 'type': 'slope', 'minAngle': 0, 'maxAngle': 35 }
+                            { 'type': 'height', 'minHeight': 0.5, 'maxHeight': None }
+                            { 'type': 'normalCone', 'direction': [0, 0, -1], 'maxAngle': 60 }
+                            { 'type': 'curveFalloff', 'curve': 'curve1' or 'points': [[x, y, z], ...],
+                              'innerDistance': 2, 'outerDistance': 10, 'invert': False }
+                            { 'type': 'mask', 'path': 'mask.png' }
+            bbox: Bounding box [xMin, yMin, zMin, xMax, yMax, zMax] of the scatter, the area of mask images
+            loadMask (optional): Function which reads a mask image path into a 2D array, needed for mask filters
+            return: A list of filters
+    """
+    filters = []
+    for settings in filterSettings:
+        settings = dict(settings)
+        filterType = settings.pop('type', None)
+        if filterType == 'slope':
+            filters.append( SlopeFilter( **settings ) )
+        elif filterType == 'height':
+            filters.append( HeightFilter( **settings ) )
+        elif filterType == 'normalCone':
+            filters.append( NormalConeFilter( **settings ) )
+        elif filterType == 'curveFalloff':
+            points = settings.pop('points', None)
+            curveName = settings.pop('curve', None)
+            if points is None:
+                points = sampleCurve( curveName )
+            filters.append( CurveFalloffFilter( points, **settings ) )
+        elif filterType == 'mask':
+            if loadMask is None:
+                raise ValueError("A mask filter needs a function which loads the mask image")
+            filters.append( MaskFilter( loadMask( settings['path'] ), bbox[0], bbox[3], bbox[2], bbox[5] ) )
+        else:
+            raise ValueError("Unknown hit filter: {}".format(filterType))
+    return filters
+
+def filterHits( filters, hits, rng ):
+    """ Removes the hits rejected by any filter, before transforms are computed and nodes are created for them.
+        Filters only see the hits which passed the filters before them.
+        Params
+        ===
+            filters: A list of filters, functions filter(positions, normals, rng) -> (N,) boolean array of hits to keep
+            hits: A tuple of arrays (positions, normals, ...) with one row per hit, as returned by the ray casts
+            rng: A NumPy random generator for the probabilistic filters
+            return: The tuple of arrays with the kept rows
+    """
+    if len(filters) == 0:
+        return hits
+
+    numHits = len(hits[0])
+    keptIndices = np.arange(numHits)
+    for hitFilter in filters:
+        if len(keptIndices) == 0:
+            break
+        keep = hitFilter( hits[0][keptIndices], hits[1][keptIndices], rng )
+        keptIndices = keptIndices[keep]
+
+    instrumentation.count('hitsFiltered', numHits - len(keptIndices))
+    return tuple( column[keptIndices] for column in hits )
@@ -0,0 +1,123 @@
+import math
+import random
+
+import numpy as np
+
+from hdt import ConstraintGrid, iterHdtSampleSquare
+from footprint import FootprintMask
+
+def changedRegion(oldSnapshots, newSnapshots, tolerance = 1e-6):
+    """ Finds the part of the xz-plane where the meshes of a scatter were edited since the snapshots were taken.
+        Params
+        ===
+            oldSnapshots: A MeshSnapshot per mesh, taken when the scatter was generated
+            newSnapshots: A MeshSnapshot per mesh of the current meshes, with the same faces
+            tolerance (optional): Vertices which moved less than this distance are unchanged
+            return: The bounding rectangle (xMin, zMin, xMax, zMax) of all triangles with a moved vertex, at their old
+                    and new positions, or None if no vertex moved
+    """
+    if len(oldSnapshots) != len(newSnapshots):
+        raise ValueError("The number of meshes has changed")
+
+    corners = []
+    for oldSnapshot, newSnapshot in zip(oldSnapshots, newSnapshots):
+        if oldSnapshot.vertices.shape != newSnapshot.vertices.shape or not np.array_equal(oldSnapshot.triangles, newSnapshot.triangles):
+            raise ValueError("The topology of a mesh has changed")
+
+        moved = np.linalg.norm(newSnapshot.vertices - oldSnapshot.vertices, axis=1) > tolerance
+        changedTriangles = moved[newSnapshot.triangles].any(axis=1)
+        if changedTriangles.any():
+            triangles = newSnapshot.triangles[changedTriangles]
+            corners.append( oldSnapshot.vertices[triangles].reshape(-1, 3) )
+            corners.append( newSnapshot.vertices[triangles].reshape(-1, 3) )
+
+    if len(corners) == 0:
+        return None
+    corners = np.concatenate(corners)
+    return ( float(corners[:, 0].min()), float(corners[:, 2].min()), float(corners[:, 0].max()), float(corners[:, 2].max()) )
+
+def expandRegion(region, border):
+    """ Grows a rectangle (xMin, zMin, xMax, zMax) by the given border on all sides. """
+    return ( region[0] - border, region[1] - border, region[2] + border, region[3] + border )
+
+def pointsInRegion(points, region):
+    """ Checks which (x, z) points lie inside of a rectangle (xMin, zMin, xMax, zMax).
+        Params
+        ===
+            points: (N, 2) array of (x, z) coordinates
+            region: The rectangle
+            return: (N,) boolean array
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return ( (points[:, 0] >= region[0]) & (points[:, 0] <= region[2]) &
+             (points[:, 1] >= region[1]) & (points[:, 1] <= region[3]) )
+
+def iterRegionSamples(region, radii, crossDistances, points, labels, seed = None, progress = None, footprint = None):
+    """ Fills a rectangle with new Poisson-Disc samples around the samples which are kept, for example after the
+        samples of an edited part of a mesh were removed. The classes are sampled with Hierarchical Dart Throwing
+        from the largest radius to the smallest, as in multi-class sampling. Kept samples of the same class are
+        constraints in the sample grid of the dart throwing, kept samples of other classes and new samples of the
+        classes sampled before are constraints with the cross-class distances.
+        Params
+        ===
+            region: The rectangle (xMin, zMin, xMax, zMax) to sample
+            radii: Disc radius of each class, a single radius for samples without classes
+            crossDistances: Symmetric matrix of minimum distances between classes
+            points: (N, 2) array with the (x, z) coordinates of the kept samples around the region
+            labels: (N,) array with the class index of each kept sample
+            seed (optional): Seed of the random generator, None for a random seed
+            progress (optional): Function called with the covered fraction of all classes, sampling stops when it returns True
+            footprint (optional): A FootprintMask of the region, the whole rectangle if None
+            return: A generator of lists of (x, z, class index) tuples
+    """
+    rng = random.Random(seed)
+    xMin, zMin, xMax, zMax = region
+    length = max(xMax - xMin, zMax - zMin)
+    numClasses = len(radii)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    labels = np.asarray(labels, dtype=np.int64).reshape(-1)
+
+    # The square domain of the dart throwing is larger than the region along one axis and the cells of the footprint
+    # can reach over its border. The mask is clipped to the exact rectangle, so that darts outside of the region are
+    # rejected before they are accepted and block darts inside of it.
+    if footprint is None:
+        cellLength = max( min(xMax - xMin, zMax - zMin), 1e-9 )
+        footprint = FootprintMask( xMin, zMin, cellLength, np.ones(( int(math.ceil((zMax - zMin) / cellLength)),
+                                                                     int(math.ceil((xMax - xMin) / cellLength)) ), dtype=bool) )
+    footprint = footprint.clip( xMin, zMin, xMax, zMax )
+
+    newPoints = [ [] for _ in range(numClasses) ]
+    classOrder = sorted( range(numClasses), key=lambda label: -radii[label] )
+    cancelled = [False]
+
+    for classIndex, label in enumerate(classOrder):
+        # Only constraints closer to the region than the largest distance to this class matter
+        maxDistance = max( crossDistances[label] )
+        nearby = pointsInRegion( points, ( xMin - maxDistance, zMin - maxDistance, xMax + maxDistance, zMax + maxDistance ) )
+        sameClass = nearby & (labels == label)
+        constraintPoints = points[sameClass].tolist()
+
+        constraintGrid = None
+        otherClasses = nearby & (labels != label)
+        finishedClasses = classOrder[:classIndex]
+        if otherClasses.any() or len(finishedClasses) > 0:
+            constraintGrid = ConstraintGrid( maxDistance )
+            for (x, z), other in zip( points[otherClasses].tolist(), labels[otherClasses].tolist() ):
+                constraintGrid.insert(x, z, crossDistances[label][other])
+            for other in finishedClasses:
+                for x, z in newPoints[other]:
+                    constraintGrid.insert(x, z, crossDistances[label][other])
+
+        classProgress = None
+        if progress is not None:
+            def classProgress(fraction, classIndex = classIndex):
+                cancelled[0] = progress( (classIndex + fraction) / numClasses )
+                return cancelled[0]
+
+        for batch in iterHdtSampleSquare(xMin, zMin, length, radii[label], rng, constraintPoints, progress=classProgress,
+                                         constraintGrid=constraintGrid, footprint=footprint):
+            newPoints[label].extend(batch)
+            if len(batch) > 0:
+                yield [ (x, z, label) for x, z in batch ]
+        if cancelled[0]:
+            return
@@ -0,0 +1,220 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+def currentMemory():
+    """ Returns the resident memory of the Maya process in bytes, or None if it can not be read on this platform.
+        Linux reads the current resident size, macOS only reports the peak resident size of the process.
+    """
+    try:
+        with open('/proc/self/statm') as statmFile:
+            return int(statmFile.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, AttributeError):
+        pass
+    return peakProcessMemory()
+
+def peakProcessMemory():
+    """ Returns the peak resident memory of the Maya process since it started in bytes, or None on Windows. """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class ScatterStats(object):
+    """ Wall time per stage, counters and the memory high-water mark of one run of the tool (for example one
+        scatterPoints call). The memory is sampled at the start and end of the run and after every stage. Peaks
+        between the samples are caught by the peak memory of the process, once it has grown during the run.
+        Params
+        ===
+            name: Name of the run
+    """
+    def __init__(self, name):
+        self.name = name
+        self.stageTimes = OrderedDict()
+        self.stageCalls = OrderedDict()
+        self.counters = OrderedDict()
+        self.startMemory = currentMemory()
+        self.peakMemory = self.startMemory
+        self.startProcessPeak = peakProcessMemory()
+        self.startTime = time.perf_counter()
+        self.totalTime = None
+
+    def addTime(self, stageName, seconds):
+        self.stageTimes[stageName] = self.stageTimes.get(stageName, 0.0) + seconds
+        self.stageCalls[stageName] = self.stageCalls.get(stageName, 0) + 1
+
+    def count(self, counterName, amount = 1):
+        self.counters[counterName] = self.counters.get(counterName, 0) + amount
+
+    def sampleMemory(self):
+        """ Raises the memory high-water mark to the current memory of the process, or to the peak memory of the
+            process if that is higher than it was at the start of the run.
+        """
+        memory = currentMemory()
+        processPeak = peakProcessMemory()
+        if processPeak is not None and self.startProcessPeak is not None and processPeak > self.startProcessPeak:
+            memory = processPeak if memory is None else max(memory, processPeak)
+        if memory is not None and (self.peakMemory is None or memory > self.peakMemory):
+            self.peakMemory = memory
+
+    def merge(self, other):
+        """ Adds the stage times and counters of another run, for example of a worker thread, to this run. """
+        for name, seconds in other.stageTimes.items():
+            self.stageTimes[name] = self.stageTimes.get(name, 0.0) + seconds
+            self.stageCalls[name] = self.stageCalls.get(name, 0) + other.stageCalls[name]
+        for name, value in other.counters.items():
+            self.count(name, value)
+        if other.peakMemory is not None and (self.peakMemory is None or other.peakMemory > self.peakMemory):
+            self.peakMemory = other.peakMemory
+
+    def finish(self):
+        self.totalTime = time.perf_counter() - self.startTime
+        self.sampleMemory()
+
+    def toDict(self):
+        return { 'name': self.name, 'totalSeconds': self.totalTime,
+                 'stages': [ { 'name': name, 'seconds': seconds, 'calls': self.stageCalls[name] }
+                             for name, seconds in self.stageTimes.items() ],
+                 'counters': dict(self.counters),
+                 'memory': { 'startBytes': self.startMemory, 'peakBytes': self.peakMemory } }
+
+    def dumpJson(self, path):
+        """ Writes the stage times and counters to a JSON file. """
+        with open(path, 'w') as jsonFile:
+            json.dump(self.toDict(), jsonFile, indent=2)
+
+    def report(self):
+        """ Returns the stage times and counters as a table for the Script Editor. """
+        totalTime = self.totalTime if self.totalTime is not None else time.perf_counter() - self.startTime
+        lines = [ '{} ({:.3f} s)'.format(self.name, totalTime) ]
+        for name, seconds in self.stageTimes.items():
+            share = 100.0 * seconds / totalTime if totalTime > 0 else 0.0
+            lines.append( '  {:<24} {:>10.3f} s {:>6.1f}% {:>8} calls'.format(name, seconds, share, self.stageCalls[name]) )
+        for name, value in self.counters.items():
+            lines.append( '  {:<24} {:>10}'.format(name, value) )
+        if self.peakMemory is not None:
+            lines.append( '  {:<24} {:>10.1f} MB (+{:.1f} MB during the run)'.format( 'memoryHighWaterMark', self.peakMemory / 1048576.0,
+                          (self.peakMemory - self.startMemory) / 1048576.0 ) )
+        return '\n'.join(lines)
+
+class Stage(object):
+    """ Context manager which adds its wall time to a stage of the active stats, if instrumentation is enabled. """
+    def __init__(self, stageName):
+        self.stageName = stageName
+        self.stats = currentStats()
+
+    def __enter__(self):
+        if self.stats is not None:
+            self.startTime = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        if self.stats is not None:
+            self.stats.addTime( self.stageName, time.perf_counter() - self.startTime )
+            self.stats.sampleMemory()
+
+class Recording(object):
+    """ Context manager which sends the stages and counters of the calling thread to the given stats instead of
+        the active stats, so that a worker thread does not share the stats of the main thread.
+        Params
+        ===
+            stats: A ScatterStats, or None to record nothing
+    """
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.previous = getattr(threadState, 'stats', unbound)
+        threadState.stats = self.stats
+        return self.stats
+
+    def __exit__(self, *args):
+        if self.previous is unbound:
+            del threadState.stats
+        else:
+            threadState.stats = self.previous
+
+# Instrumentation is off unless enabled, then every run records a ScatterStats
+settings = { 'enabled': False, 'printReport': True, 'jsonPath': None }
+activeStats = None
+lastStats = None
+
+# Stats bound to a thread by Recording
+threadState = threading.local()
+unbound = object()
+
+def currentStats():
+    """ Returns the stats the calling thread records into: its bound stats, otherwise the active stats. """
+    stats = getattr(threadState, 'stats', unbound)
+    return activeStats if stats is unbound else stats
+
+def enableInstrumentation( printReport = True, jsonPath = None ):
+    """ Records stage times and counters for every following run of scatterPoints and instanceModels.
+        Params
+        ===
+            printReport (optional): Print the results of each run to the Script Editor
+            jsonPath (optional): Path of a JSON file the results of each run are written to
+    """
+    settings.update( enabled=True, printReport=printReport, jsonPath=jsonPath )
+
+def disableInstrumentation():
+    global activeStats
+    settings['enabled'] = False
+    activeStats = None
+
+def createStats( name ):
+    """ Creates the stats of a run which is not the active run, see Recording.
+        Params
+        ===
+            name: Name of the run
+            return: A ScatterStats, or None if instrumentation is disabled
+    """
+    return ScatterStats(name) if settings['enabled'] else None
+
+def beginRun( name ):
+    """ Starts recording a run if instrumentation is enabled.
+        Params
+        ===
+            name: Name of the run
+            return: The ScatterStats of the run, or None
+    """
+    global activeStats
+    activeStats = createStats(name)
+    return activeStats
+
+def endRun( stats = None ):
+    """ Finishes the current run, or the given run from createStats, and prints or writes its results. """
+    global activeStats, lastStats
+    if stats is None or stats is activeStats:
+        stats = activeStats
+        activeStats = None
+    if stats is None:
+        return None
+
+    stats.finish()
+    lastStats = stats
+    if settings['printReport']:
+        print(stats.report())
+    if settings['jsonPath']:
+        stats.dumpJson(settings['jsonPath'])
+    return stats
+
+def stage( stageName ):
+    return Stage(stageName)
+
+def sampleMemory():
+    """ Raises the memory high-water mark of the current run, for example after each chunk of a streamed scatter. """
+    stats = currentStats()
+    if stats is not None:
+        stats.sampleMemory()
+
+def count( counterName, amount = 1 ):
+    """ Adds to a counter of the current run, does nothing if instrumentation is disabled. """
+    stats = currentStats()
+    if stats is not None:
+        stats.count(counterName, amount)
@@ -0,0 +1,99 @@
+import maya.OpenMaya as om
+
+import numpy as np
+
+from raycast import MeshSnapshot
+
+def intArrayToNumpy( intArray ):
+    return np.array([ intArray[i] for i in range(intArray.length()) ], dtype=np.int64)
+
+def vectorArrayToNumpy( vectorArray ):
+    return np.array([ (vectorArray[i].x, vectorArray[i].y, vectorArray[i].z) for i in range(vectorArray.length()) ]).reshape(-1, 3)
+
+class MeshGeometryCache(object):
+    """ World space points, normals and topology of a mesh fetched once per scatter run.
+        Normals are looked up in constant time per hit, either as the average of the face's vertex normals
+        or as a smooth normal interpolated with the barycentric coordinates of the hit.
+        Params
+        ===
+            fnMesh: MFnMesh of the mesh
+    """
+    def __init__(self, fnMesh):
+        self.fnMesh = fnMesh
+        worldSpace = om.MSpace.kWorld
+
+        points = om.MPointArray()
+        fnMesh.getPoints( points, worldSpace )
+        self.points = np.array([ (points[i].x, points[i].y, points[i].z) for i in range(points.length()) ]).reshape(-1, 3)
+
+        normals = om.MFloatVectorArray()
+        fnMesh.getNormals( normals, worldSpace )
+        self.normals = vectorArrayToNumpy(normals)
+
+        # Vertex ids and normal ids of each face vertex, stored per face in the same order
+        vertexCounts = om.MIntArray()
+        vertexIds = om.MIntArray()
+        fnMesh.getVertices( vertexCounts, vertexIds )
+        self.faceVertexCounts = intArrayToNumpy(vertexCounts)
+        self.faceVertexOffsets = np.cumsum(self.faceVertexCounts) - self.faceVertexCounts
+        self.faceVertexIds = intArrayToNumpy(vertexIds)
+
+        normalCounts = om.MIntArray()
+        normalIds = om.MIntArray()
+        fnMesh.getNormalIds( normalCounts, normalIds )
+        self.faceNormalIds = intArrayToNumpy(normalIds)
+
+        # Sum the vertex normals of each face to approximate the face normal
+        faceNormals = np.add.reduceat( self.normals[self.faceNormalIds], self.faceVertexOffsets )
+        self.faceNormals = faceNormals / np.maximum( np.linalg.norm(faceNormals, axis=1, keepdims=True), 1e-12 )
+
+        # Triangle vertex ids, the face id of each triangle and the first triangle of each face
+        triangleCounts = om.MIntArray()
+        triangleVertices = om.MIntArray()
+        fnMesh.getTriangles( triangleCounts, triangleVertices )
+        triangleCounts = intArrayToNumpy(triangleCounts)
+        self.triangles = intArrayToNumpy(triangleVertices).reshape(-1, 3)
+        self.triangleFaceIds = np.repeat( np.arange(len(triangleCounts)), triangleCounts )
+        self.faceTriangleOffsets = np.cumsum(triangleCounts) - triangleCounts
+
+        # Normal id of each triangle corner, found by locating the corner vertex within its face
+        numVertices = max(len(self.points), 1)
+        faceVertexKeys = np.repeat( np.arange(len(self.faceVertexCounts)), self.faceVertexCounts ) * numVertices + self.faceVertexIds
+        keyOrder = np.argsort(faceVertexKeys, kind='stable')
+        cornerKeys = self.triangleFaceIds[:, None] * numVertices + self.triangles
+        cornerFaceVertex = keyOrder[ np.searchsorted(faceVertexKeys[keyOrder], cornerKeys) ]
+        self.triangleNormalIds = self.faceNormalIds[cornerFaceVertex]
+
+    def faceNormal(self, faceId):
+        """ Returns the average vertex normal of the given face as a tuple. """
+        return tuple(self.faceNormals[faceId].tolist())
+
+    def smoothNormal(self, faceId, triangleId, bary1, bary2):
+        """ Interpolates the vertex normals of a triangle in the given face.
+            Params
+            ===
+                faceId: Id of the face
+                triangleId: Index of the triangle within the face
+                bary1: Barycentric coordinate relative to the first vertex of the triangle
+                bary2: Barycentric coordinate relative to the second vertex of the triangle
+                return: The normalized normal as a tuple
+        """
+        normalIds = self.triangleNormalIds[self.faceTriangleOffsets[faceId] + triangleId]
+        normal = ( bary1 * self.normals[normalIds[0]] + bary2 * self.normals[normalIds[1]]
+                   + (1.0 - bary1 - bary2) * self.normals[normalIds[2]] )
+        normal /= max(np.linalg.norm(normal), 1e-12)
+        return tuple(normal.tolist())
+
+    def createSnapshot(self, faceIds):
+        """ Copies the world space triangles of the mesh into a MeshSnapshot for the BVH ray caster.
+            Params
+            ===
+                faceIds: A list of face ids to include, all faces are included if the list is empty
+                return: A MeshSnapshot with face normals and triangle corner normals
+        """
+        triangleIndices = np.arange(len(self.triangles))
+        if len(faceIds) > 0:
+            triangleIndices = triangleIndices[ np.isin(self.triangleFaceIds, faceIds) ]
+
+        return MeshSnapshot( self.points, self.triangles[triangleIndices], self.triangleFaceIds[triangleIndices],
+                             self.faceNormals, self.normals[self.triangleNormalIds[triangleIndices]] )
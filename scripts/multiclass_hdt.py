@@ -0,0 +1,88 @@
+import random
+
+from hdt import ConstraintGrid, iterHdtSampleSquare
+
+def createCrossDistances(radii):
+    """ Computes the default minimum distances between the classes, where every sample is a disc with half the
+        radius of its class and no two discs overlap: r_ij = (r_i + r_j) / 2 (r_ii = r_i).
+        Params
+        ===
+            radii: Disc radius of each class
+            return: A matrix (list of lists) of minimum distances
+    """
+    return [ [ (radiusI + radiusJ) * 0.5 for radiusJ in radii ] for radiusI in radii ]
+
+def multiClassHdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radii, crossDistances = None, maxIterations = None, seed = None,
+                                     footprint = None):
+    """ Generates a Poisson-Disc point set with several classes of samples in one pass, for example trees,
+        bushes and rocks. Samples of class i are at least radii[i] apart, and samples of the classes i and j
+        are at least crossDistances[i][j] apart.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the sampling domain
+            xMax: Maximum x-coordinate of the sampling domain
+            zMin: Minimum z-coordinate of the sampling domain
+            zMax: Maximum z-coordinate of the sampling domain
+            radii: Disc radius of each class
+            crossDistances (optional): Symmetric matrix of minimum distances between classes, see createCrossDistances
+            maxIterations (optional): Maximum number of darts to throw per class, None for no limit
+            seed (optional): Seed of the random generator, None for a random seed
+            footprint (optional): A FootprintMask of the area to sample, the whole domain if None
+            return: A tuple (samples, labels) with a list of (x, z) points and the class index of each point
+    """
+    samples = []
+    labels = []
+    for batch in iterMultiClassHdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radii, crossDistances, maxIterations, seed,
+                                                      footprint=footprint):
+        samples.extend( (x, z) for x, z, _ in batch )
+        labels.extend( label for _, _, label in batch )
+    return samples, labels
+
+def iterMultiClassHdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radii, crossDistances = None, maxIterations = None,
+                                         seed = None, batchSize = 4096, progress = None, footprint = None):
+    """ Generator version of multiClassHdtPoissonDiscSampling which yields batches of (x, z, label) samples.
+        The classes are sampled with Hierarchical Dart Throwing from the largest radius to the smallest, the
+        samples of earlier classes are constraints with the cross-class distances for the later classes.
+        Params
+        ===
+            See multiClassHdtPoissonDiscSampling
+            batchSize (optional): Number of samples per batch
+            progress (optional): Function called with the covered fraction of all classes, sampling stops when it returns True
+            return: A generator of lists of (x, z, label) tuples
+    """
+    rng = random.Random(seed)
+    length = max(xMax - xMin, zMax - zMin)
+    numClasses = len(radii)
+    if crossDistances is None:
+        crossDistances = createCrossDistances(radii)
+
+    # Samples of the finished classes, with the minimum distance to each class
+    finishedClasses = []
+    classOrder = sorted( range(numClasses), key=lambda label: -radii[label] )
+    cancelled = [False]
+
+    for classIndex, label in enumerate(classOrder):
+        constraintGrid = None
+        if len(finishedClasses) > 0:
+            constraintGrid = ConstraintGrid( max( crossDistances[label][other] for other, _ in finishedClasses ) )
+            for other, points in finishedClasses:
+                distance = crossDistances[label][other]
+                for x, z in points:
+                    constraintGrid.insert(x, z, distance)
+
+        classProgress = None
+        if progress is not None:
+            def classProgress(fraction, classIndex = classIndex):
+                cancelled[0] = progress( (classIndex + fraction) / numClasses )
+                return cancelled[0]
+
+        points = []
+        for batch in iterHdtSampleSquare(xMin, zMin, length, radii[label], rng, maxIterations=maxIterations,
+                                         batchSize=batchSize, progress=classProgress, constraintGrid=constraintGrid,
+                                         footprint=footprint):
+            points.extend(batch)
+            yield [ (x, z, label) for x, z in batch ]
+
+        if cancelled[0]:
+            return
+        finishedClasses.append( (label, points) )
@@ -0,0 +1,128 @@
+import numpy as np
+
+def aimYAngles(normals):
+    """ Vectorised version of scatter.aimY: the rotations around the x- and z-axis which turn the y-axis
+        towards each normal.
+        Params
+        ===
+            normals: (N, 3) array of unit normals
+            return: A tuple of (N,) arrays (x angles, z angles) in degrees
+    """
+    normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+    x = normals[:, 0]
+    y = normals[:, 1]
+    z = normals[:, 2]
+    xyLength = np.sqrt(x * x + y * y)
+
+    # Normals parallel to the z-axis have no direction in the xy-plane, aimY rotates them by 90 degrees around z
+    degenerate = xyLength < 0.00001
+    cosines = np.minimum( y / np.where(degenerate, 1.0, xyLength), 1.0 )
+    zAngles = np.where( degenerate, np.where(x < 0, -0.5 * np.pi, 0.5 * np.pi), np.arccos(np.maximum(cosines, -1.0)) )
+    zAngles = np.where( x > 0, -zAngles, zAngles )
+
+    xAngles = np.arccos( np.minimum(xyLength, 1.0) )
+    xAngles = np.where( z < 0, -xAngles, xAngles )
+    return np.degrees(xAngles), np.degrees(zAngles)
+
+def eulerToMatrices(rotations):
+    """ Converts Euler rotations in Maya's default xyz rotate order (x first, then y, then z) to matrices.
+        Params
+        ===
+            rotations: (N, 3) array of rx, ry, rz rotations in degrees
+            return: (N, 3, 3) array of rotation matrices whose columns are the rotated x-, y- and z-axis
+    """
+    angles = np.radians( np.asarray(rotations, dtype=np.float64).reshape(-1, 3) )
+    cosX, cosY, cosZ = np.cos(angles).T
+    sinX, sinY, sinZ = np.sin(angles).T
+
+    # Rz * Ry * Rx written out
+    matrices = np.empty((len(angles), 3, 3))
+    matrices[:, 0, 0] = cosY * cosZ
+    matrices[:, 0, 1] = sinX * sinY * cosZ - cosX * sinZ
+    matrices[:, 0, 2] = cosX * sinY * cosZ + sinX * sinZ
+    matrices[:, 1, 0] = cosY * sinZ
+    matrices[:, 1, 1] = sinX * sinY * sinZ + cosX * cosZ
+    matrices[:, 1, 2] = cosX * sinY * sinZ - sinX * cosZ
+    matrices[:, 2, 0] = -sinY
+    matrices[:, 2, 1] = sinX * cosY
+    matrices[:, 2, 2] = cosX * cosY
+    return matrices
+
+def matricesToEuler(matrices):
+    """ Converts rotation matrices to Euler rotations in Maya's default xyz rotate order, the inverse of eulerToMatrices.
+        Params
+        ===
+            matrices: (N, 3, 3) array of rotation matrices whose columns are the rotated x-, y- and z-axis
+            return: (N, 3) array of rx, ry, rz rotations in degrees
+    """
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 3, 3)
+    cosY = np.hypot( matrices[:, 0, 0], matrices[:, 1, 0] )
+    yAngles = np.arctan2( -matrices[:, 2, 0], cosY )
+
+    # At ry = +-90 degrees only rx - rz (or rx + rz) is defined, rz is set to 0 there
+    gimbalLock = cosY < 1e-9
+    xAngles = np.where( gimbalLock, np.arctan2(-matrices[:, 1, 2], matrices[:, 1, 1]),
+                        np.arctan2(matrices[:, 2, 1], matrices[:, 2, 2]) )
+    zAngles = np.where( gimbalLock, 0.0, np.arctan2(matrices[:, 1, 0], matrices[:, 0, 0]) )
+    return np.degrees( np.column_stack(( xAngles, yAngles, zAngles )) )
+
+def eulerToQuaternions(rotations):
+    """ Converts Euler rotations in Maya's default xyz rotate order to unit quaternions.
+        Params
+        ===
+            rotations: (N, 3) array of rx, ry, rz rotations in degrees
+            return: (N, 4) array of (x, y, z, w) quaternions, the order of MQuaternion
+    """
+    halfAngles = np.radians( np.asarray(rotations, dtype=np.float64).reshape(-1, 3) ) * 0.5
+    cosX, cosY, cosZ = np.cos(halfAngles).T
+    sinX, sinY, sinZ = np.sin(halfAngles).T
+
+    # qz * qy * qx written out
+    return np.column_stack(( sinX * cosY * cosZ - cosX * sinY * sinZ,
+                             cosX * sinY * cosZ + sinX * cosY * sinZ,
+                             cosX * cosY * sinZ - sinX * sinY * cosZ,
+                             cosX * cosY * cosZ + sinX * sinY * sinZ ))
+
+def computeOrientations(normals, rotationRange, scaleRange, rng, alignToNormal = True, output = 'euler'):
+    """ Computes the orientation and scale of all scatter points in one call: the y-axis is aimed at the
+        surface normal like aimY, and the random rotation turns the points around their aimed y-axis.
+        Params
+        ===
+            normals: (N, 3) array of unit surface normals
+            rotationRange: [min, max] random rotation around the local y-axis in degrees
+            scaleRange: [min, max] random uniform scale, min is used for all points if min >= max
+            rng: A NumPy random generator for the random rotations and scales
+            alignToNormal (optional): Aim the y-axis at the normals, otherwise only the random rotation is applied
+            output (optional): 'euler' for (N, 3) rx, ry, rz rotations in degrees (xyz rotate order),
+                               'matrix' for (N, 3, 3) rotation matrices or 'quaternion' for (N, 4) quaternions
+            return: A tuple (orientations, (N,) array of scales)
+    """
+    normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+    numPoints = len(normals)
+    rotationMin, rotationMax = rotationRange
+    minScale, maxScale = scaleRange
+
+    rotations = np.zeros((numPoints, 3))
+    if alignToNormal:
+        rotations[:, 0], rotations[:, 2] = aimYAngles(normals)
+    if (rotationMax - rotationMin) > 0:
+        yawRotations = np.zeros((numPoints, 3))
+        yawRotations[:, 1] = rng.uniform(rotationMin, rotationMax, numPoints)
+        if alignToNormal:
+            # Turn around the local y-axis first, then aim it at the normal, so the y-axis stays on the normal
+            rotations = matricesToEuler( np.matmul( eulerToMatrices(rotations), eulerToMatrices(yawRotations) ) )
+        else:
+            rotations = yawRotations
+
+    if minScale >= maxScale:
+        scales = np.full(numPoints, float(minScale))
+    else:
+        scales = rng.uniform(minScale, maxScale, numPoints)
+
+    if output == 'matrix':
+        return eulerToMatrices(rotations), scales
+    elif output == 'quaternion':
+        return eulerToQuaternions(rotations), scales
+    elif output != 'euler':
+        raise ValueError("Unknown orientation output: {}".format(output))
+    return rotations, scales
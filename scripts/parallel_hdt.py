@@ -0,0 +1,143 @@
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from hdt import hdtSampleSquare
+
+# Tiles are sampled in four phases. Tiles of the same phase are never adjacent, so they are at least one tile
+# apart and can be sampled concurrently. Later phases see the samples of earlier phases as constraints.
+tilePhases = [ (0, 0), (0, 1), (1, 0), (1, 1) ]
+
+def tileSeed(seed, row, col):
+    """ Returns the seed of the random generator of a tile, which only depends on the sampler seed
+        and the tile position (not on the number of workers or the order in which tiles finish).
+    """
+    return '{}:{}:{}'.format(seed, row, col)
+
+def sampleTile(task):
+    """ Samples a single tile. Runs in a worker process, so it only takes and returns plain data.
+        Params
+        ===
+            task: A tuple (xMin, zMin, tileLength, radius, seed, constraintPoints, maxIterations, footprint)
+            return: A list of sample points inside the tile
+    """
+    xMin, zMin, tileLength, radius, seed, constraintPoints, maxIterations, footprint = task
+    return hdtSampleSquare(xMin, zMin, tileLength, radius, random.Random(seed), constraintPoints, maxIterations,
+                           footprint=footprint)
+
+def configureMayaExecutable():
+    """ Inside a Maya session sys.executable is the Maya application, worker processes have to be
+        started with mayapy instead.
+    """
+    import multiprocessing
+    executableName = os.path.basename(sys.executable).lower()
+    if executableName in ('maya', 'maya.exe', 'maya.bin'):
+        mayapy = 'mayapy.exe' if executableName.endswith('.exe') else 'mayapy'
+        multiprocessing.set_executable( os.path.join(os.path.dirname(sys.executable), mayapy) )
+
+def parallelHdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, numWorkers = None, tilesPerSide = 16,
+                                   maxIterationsPerTile = None, seed = 0, executor = None, footprint = None):
+    """ Generates a maximal Poisson-Disc point set by splitting the sampling domain into tiles which are sampled
+        with Hierarchical Dart Throwing in a pool of worker processes.
+        The minimum distance holds across tile borders and the result does not depend on the number of workers.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the sampling domain
+            xMax: Maximum x-coordinate of the sampling domain
+            zMin: Minimum z-coordinate of the sampling domain
+            zMax: Maximum z-coordinate of the sampling domain
+            radius: Disc radius (minimal distance between sample points)
+            numWorkers (optional): Number of worker processes, None for the number of cores, 1 to sample in this process
+            tilesPerSide (optional): Number of tile rows and columns, reduced so that tiles are at least 2 * radius wide
+            maxIterationsPerTile (optional): Maximum number of darts to throw per tile, None for no limit
+            seed (optional): Seed of the sampler
+            executor (optional): An existing concurrent.futures executor to use instead of creating a process pool
+            footprint (optional): A FootprintMask of the area to sample, tiles outside of it are skipped
+            return: A list of sample points
+    """
+    samples = []
+    for batch in iterParallelHdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, numWorkers, tilesPerSide,
+                                                    maxIterationsPerTile, seed, executor, footprint=footprint):
+        samples.extend(batch)
+    return samples
+
+def iterParallelHdtPoissonDiscSampling(xMin, xMax, zMin, zMax, radius, numWorkers = None, tilesPerSide = 16,
+                                       maxIterationsPerTile = None, seed = 0, executor = None, progress = None,
+                                       footprint = None):
+    """ Generator version of parallelHdtPoissonDiscSampling which yields the samples of each tile as soon as
+        the tile is finished (tiles are yielded in a fixed order).
+        Params
+        ===
+            See parallelHdtPoissonDiscSampling
+            progress (optional): Function called with the fraction of finished tiles, sampling stops when it returns True
+            return: A generator of lists of sample points
+    """
+    length = max(xMax - xMin, zMax - zMin)
+    tilesPerSide = max(1, min(tilesPerSide, int(length / (2.0 * radius))))
+    tileLength = length / tilesPerSide
+    numTiles = tilesPerSide * tilesPerSide
+
+    if numWorkers is None:
+        numWorkers = os.cpu_count() or 1
+
+    ownExecutor = executor is None and numWorkers > 1
+    if ownExecutor:
+        configureMayaExecutable()
+        executor = ProcessPoolExecutor(max_workers=numWorkers)
+
+    # Samples of each finished tile, keyed by (row, col)
+    tileSamples = {}
+    try:
+        for phaseRow, phaseCol in tilePhases:
+            tiles = [ (row, col) for row in range(phaseRow, tilesPerSide, 2) for col in range(phaseCol, tilesPerSide, 2) ]
+            tasks = []
+            for row, col in tiles:
+                tileXMin = xMin + col * tileLength
+                tileZMin = zMin + row * tileLength
+
+                # Samples of finished neighbour tiles which are close enough to the tile to matter
+                constraintPoints = []
+                for i in range(-1, 2):
+                    for j in range(-1, 2):
+                        for point in tileSamples.get((row + i, col + j), ()):
+                            if ( tileXMin - radius <= point[0] <= tileXMin + tileLength + radius and
+                                 tileZMin - radius <= point[1] <= tileZMin + tileLength + radius ):
+                                constraintPoints.append(point)
+
+                # Only the part of the footprint inside the tile is sent to the worker, tiles outside of it are skipped
+                tileFootprint = None
+                if footprint is not None:
+                    tileFootprint = footprint.crop(tileXMin, tileZMin, tileXMin + tileLength, tileZMin + tileLength)
+                    if tileFootprint.coverage() == 0:
+                        tasks.append(None)
+                        continue
+
+                tasks.append( (tileXMin, tileZMin, tileLength, radius, tileSeed(seed, row, col),
+                               constraintPoints, maxIterationsPerTile, tileFootprint) )
+
+            if executor is None:
+                futures = None
+            else:
+                futures = [ None if task is None else executor.submit(sampleTile, task) for task in tasks ]
+
+            for i in range(len(tiles)):
+                if progress is not None and progress( len(tileSamples) / float(numTiles) ):
+                    if futures is not None:
+                        for future in futures:
+                            if future is not None:
+                                future.cancel()
+                    return
+
+                if tasks[i] is None:
+                    result = []
+                elif futures is None:
+                    result = sampleTile(tasks[i])
+                else:
+                    result = futures[i].result()
+                tileSamples[tiles[i]] = result
+                if len(result) > 0:
+                    yield result
+    finally:
+        if ownExecutor:
+            executor.shutdown()
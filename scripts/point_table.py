@@ -0,0 +1,193 @@
+import atexit
+import json
+import os
+import shutil
+
+import numpy as np
+
+class ScatterPointTable(object):
+    """ Column based table with the transforms of all points of a scatter. A table loaded from a temporary
+        scatter cache owns the cache directory (ownedDirectory), which is deleted when the table is removed or replaced.
+        Params
+        ===
+            positions: (N, 3) array of world space positions
+            rotations: (N, 3) array of rx, ry, rz rotations in degrees
+            scales: (N,) array of uniform scale factors
+            normals (optional): (N, 3) array of surface normals at the points
+            meshIds (optional): (N,) array with the index of the mesh each point lies on
+            faceIds (optional): (N,) array with the id of the face each point lies on
+            params (optional): Dictionary with the parameters used to generate the scatter
+            labels (optional): (N,) array with the class of each point from multi-class sampling, -1 for no class
+    """
+    def __init__(self, positions, rotations, scales, normals = None, meshIds = None, faceIds = None, params = None,
+                 labels = None):
+        self.positions = np.asarray(positions).reshape(-1, 3)
+        numPoints = len(self.positions)
+        self.rotations = np.asarray(rotations).reshape(-1, 3)
+        self.scales = np.asarray(scales).reshape(-1)
+        self.normals = np.tile((0.0, 1.0, 0.0), (numPoints, 1)) if normals is None else np.asarray(normals).reshape(-1, 3)
+        self.meshIds = np.full(numPoints, -1) if meshIds is None else np.asarray(meshIds).reshape(-1)
+        self.faceIds = np.full(numPoints, -1) if faceIds is None else np.asarray(faceIds).reshape(-1)
+        self.params = {} if params is None else dict(params)
+        self.labels = np.full(numPoints, -1) if labels is None else np.asarray(labels).reshape(-1)
+        self.ownedDirectory = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def slice(self, start, end):
+        """ Returns the rows [start, end) as a new table (views of memory mapped columns stay on disk). """
+        return ScatterPointTable( self.positions[start:end], self.rotations[start:end], self.scales[start:end],
+                                  self.normals[start:end], self.meshIds[start:end], self.faceIds[start:end],
+                                  self.params, self.labels[start:end] )
+
+def concatenateTables( tables, params = None ):
+    """ Joins the rows of several tables, for example the chunks of a scatter, into one table.
+        Params
+        ===
+            tables: A list of ScatterPointTable
+            params (optional): Parameters of the joined table
+            return: A ScatterPointTable
+    """
+    if len(tables) == 0:
+        return ScatterPointTable( np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0), params=params )
+    return ScatterPointTable( *[ np.concatenate([ getattr(table, name) for table in tables ])
+                                 for name in ('positions', 'rotations', 'scales', 'normals', 'meshIds', 'faceIds') ],
+                              params=params, labels=np.concatenate([ table.labels for table in tables ]) )
+
+# Tables of the scatters created in this session, keyed by the name of their scatter group
+scatterTables = {}
+
+def registerTable( groupName, table ):
+    """ Registers the table of a scatter group, the cache directory owned by a table it replaces is deleted. """
+    previous = scatterTables.get(groupName)
+    scatterTables[groupName] = table
+    if previous is not None and previous.ownedDirectory != table.ownedDirectory:
+        releaseTable(previous)
+
+def findTable( groupName ):
+    """ Returns the table registered for the given scatter group, or None. """
+    return scatterTables.get(groupName)
+
+def removeTable( groupName ):
+    table = scatterTables.pop(groupName, None)
+    if table is not None:
+        releaseTable(table)
+
+def releaseTable( table ):
+    """ Deletes the temporary scatter cache owned by a table. Memory mapped columns stay readable on Linux and
+        macOS until the table is garbage collected, on Windows the files are left until the next release.
+    """
+    if table.ownedDirectory is not None:
+        shutil.rmtree( table.ownedDirectory, ignore_errors=True )
+        if not os.path.isdir( table.ownedDirectory ):
+            table.ownedDirectory = None
+
+@atexit.register
+def releaseAllTables():
+    # The temporary caches of the scatters of this session are not needed after Maya exits
+    for table in list(scatterTables.values()):
+        releaseTable(table)
+
+#-------------------#
+# On-disk format    #
+#-------------------#
+
+# A scatter cache is a directory with a header.json file and one raw little-endian file per column.
+# Columns are stored with compact types and can be memory mapped to read only a part of the points.
+# Columns missing in older caches (labels) are filled with their defaults.
+cacheVersion = 1
+cacheColumns = [ ('positions', '<f4', (3,)), ('normals', '<f4', (3,)), ('rotations', '<f4', (3,)),
+                 ('scales', '<f4', ()), ('meshIds', '<i4', ()), ('faceIds', '<i4', ()),
+                 ('labels', '<i4', ()) ]
+
+class ScatterCacheWriter(object):
+    """ Appends scatter points to an on-disk scatter cache. The header is written on close.
+        Params
+        ===
+            path: Directory of the cache, created if it does not exist
+            params (optional): Dictionary with the parameters used to generate the scatter
+    """
+    def __init__(self, path, params = None):
+        self.path = path
+        self.params = {} if params is None else dict(params)
+        self.count = 0
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self.files = dict( (name, open(os.path.join(path, name + '.bin'), 'wb')) for name, _, _ in cacheColumns )
+
+    def append(self, table):
+        """ Appends all rows of a ScatterPointTable to the cache. """
+        for name, dtype, shape in cacheColumns:
+            column = np.ascontiguousarray( getattr(table, name), dtype=dtype ).reshape((-1,) + shape)
+            self.files[name].write( column.tobytes() )
+        self.count += len(table)
+        if len(self.params) == 0:
+            self.params = dict(table.params)
+
+    def close(self):
+        for columnFile in self.files.values():
+            columnFile.close()
+        header = { 'version': cacheVersion, 'count': self.count, 'params': self.params,
+                   'columns': [ { 'name': name, 'dtype': dtype, 'shape': list(shape) } for name, dtype, shape in cacheColumns ] }
+        with open(os.path.join(self.path, 'header.json'), 'w') as headerFile:
+            json.dump(header, headerFile, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def saveTable( table, path ):
+    """ Saves a ScatterPointTable as an on-disk scatter cache.
+        Params
+        ===
+            table: The table to save
+            path: Directory of the cache
+    """
+    with ScatterCacheWriter( path, table.params ) as writer:
+        writer.append(table)
+
+def loadTable( path, mmap = True, owned = False ):
+    """ Loads a scatter cache.
+        Params
+        ===
+            path: Directory of the cache
+            mmap (optional): Memory map the columns instead of reading them into memory
+            owned (optional): The cache is temporary, the table deletes it when it is removed or replaced
+            return: A ScatterPointTable
+    """
+    with open(os.path.join(path, 'header.json')) as headerFile:
+        header = json.load(headerFile)
+    if header['version'] != cacheVersion:
+        raise ValueError("Unsupported scatter cache version: {}".format(header['version']))
+
+    count = header['count']
+    columns = {}
+    for column in header['columns']:
+        shape = (count,) + tuple(column['shape'])
+        columnPath = os.path.join(path, column['name'] + '.bin')
+        if count == 0:
+            columns[column['name']] = np.zeros(shape, dtype=column['dtype'])
+        elif mmap:
+            columns[column['name']] = np.memmap(columnPath, dtype=column['dtype'], mode='r', shape=shape)
+        else:
+            columns[column['name']] = np.fromfile(columnPath, dtype=column['dtype']).reshape(shape)
+
+    table = ScatterPointTable( columns['positions'], columns['rotations'], columns['scales'], columns['normals'],
+                               columns['meshIds'], columns['faceIds'], header['params'], columns.get('labels') )
+    if owned:
+        table.ownedDirectory = path
+    return table
+
+def iterTableChunks( table, chunkSize = 65536 ):
+    """ Iterates over a table in chunks, only the rows of the current chunk are read from memory mapped columns.
+        Params
+        ===
+            table: A ScatterPointTable
+            chunkSize (optional): Maximum number of rows per chunk
+            return: A generator of ScatterPointTable chunks
+    """
+    for start in range(0, len(table), chunkSize):
+        yield table.slice( start, min(start + chunkSize, len(table)) )
@@ -0,0 +1,71 @@
+try:
+    import maya.cmds as mayaCmds
+except ImportError:
+    # Progress can be reported outside of Maya, where only cancel() stops the work
+    mayaCmds = None
+
+import time
+
+class ProgressReporter(object):
+    """ Interruptable progress window which is updated at most once per interval, no matter how often
+        update is called. Cancellation is checked at the same rate.
+        Params
+        ===
+            title: Title of the progress window
+            interval (optional): Minimum number of seconds between two updates of the window
+            cmds (optional): Module used for the progress window, defaults to maya.cmds (None outside of Maya)
+    """
+    def __init__(self, title, interval = 0.1, cmds = None):
+        self.title = title
+        self.interval = interval
+        self.cmds = mayaCmds if cmds is None else cmds
+        self.cancelled = False
+        self.isOpen = False
+        self.lastUpdate = 0.0
+
+    def begin(self):
+        # There is no progress window in batch mode (mayapy), where only cancel() stops the work
+        if self.cmds is not None and not self.cmds.about( batch=True ):
+            self.cmds.progressWindow( title=self.title, progress=0, status='Progress: 0%', isInterruptable=True )
+            self.isOpen = True
+        self.lastUpdate = time.perf_counter()
+        return self
+
+    def update(self, fraction, status = None):
+        """ Reports the progress if the interval has passed since the last update.
+            Params
+            ===
+                fraction: Finished fraction of the work in [0, 1]
+                status (optional): Text shown in the window, defaults to the percentage
+                return: True if the work has been cancelled and should stop
+        """
+        now = time.perf_counter()
+        if now - self.lastUpdate < self.interval:
+            return self.cancelled
+        self.lastUpdate = now
+
+        if self.isOpen:
+            amount = min(max(fraction, 0.0), 1.0) * 100.0
+            if status is None:
+                status = 'Progress: %d%%' % amount
+            self.cmds.progressWindow( edit=True, progress=amount, status=status )
+            if self.cmds.progressWindow( query=True, isCancelled=True ):
+                self.cancelled = True
+        return self.cancelled
+
+    def cancel(self):
+        self.cancelled = True
+
+    def isCancelled(self):
+        return self.cancelled
+
+    def end(self):
+        if self.isOpen:
+            self.cmds.progressWindow( endProgress=1 )
+            self.isOpen = False
+
+    def __enter__(self):
+        return self.begin()
+
+    def __exit__(self, *args):
+        self.end()
@@ -0,0 +1,312 @@
+import numpy as np
+
+class MeshSnapshot(object):
+    """ A static copy of a triangulated mesh used for ray casting outside of Maya.
+        Params
+        ===
+            vertices: (V, 3) array of world space vertex positions
+            triangles: (T, 3) array of vertex indices for each triangle
+            faceIds (optional): (T,) array with the polygon id of each triangle, defaults to the triangle index
+            faceNormals (optional): (F, 3) array of normals indexed by polygon id
+            cornerNormals (optional): (T, 3, 3) array with the vertex normals of each triangle corner
+    """
+    def __init__(self, vertices, triangles, faceIds = None, faceNormals = None, cornerNormals = None):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.triangles = np.ascontiguousarray(triangles, dtype=np.int64).reshape(-1, 3)
+        if faceIds is None:
+            faceIds = np.arange(len(self.triangles))
+        self.faceIds = np.ascontiguousarray(faceIds, dtype=np.int64)
+        self.faceNormals = None if faceNormals is None else np.asarray(faceNormals, dtype=np.float64).reshape(-1, 3)
+        self.cornerNormals = None if cornerNormals is None else np.asarray(cornerNormals, dtype=np.float64).reshape(-1, 3, 3)
+
+        corners = self.vertices[self.triangles]
+        self.v0 = corners[:, 0]
+        self.edge1 = corners[:, 1] - self.v0
+        self.edge2 = corners[:, 2] - self.v0
+
+        if len(self.triangles) > 0:
+            self.bboxMin = corners.reshape(-1, 3).min(axis=0)
+            self.bboxMax = corners.reshape(-1, 3).max(axis=0)
+        else:
+            self.bboxMin = np.full(3, np.inf)
+            self.bboxMax = np.full(3, -np.inf)
+
+    def triangleNormals(self, triangleIds):
+        """ Computes the normalized geometric normals of the given triangles.
+            Params
+            ===
+                triangleIds: Array of triangle indices
+                return: (N, 3) array of normals
+        """
+        normals = np.cross(self.edge1[triangleIds], self.edge2[triangleIds])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        return normals / np.maximum(lengths, 1e-12)
+
+    def interpolateNormals(self, triangleIds, barycentrics):
+        """ Interpolates the corner normals of the given triangles, falls back to the geometric normals
+            if the snapshot has no corner normals.
+            Params
+            ===
+                triangleIds: (N,) array of triangle indices
+                barycentrics: (N, 2) array of barycentric coordinates relative to the second and third vertex
+                return: (N, 3) array of normalized normals
+        """
+        if self.cornerNormals is None:
+            return self.triangleNormals(triangleIds)
+
+        corners = self.cornerNormals[triangleIds]
+        weights = np.column_stack(( 1.0 - barycentrics[:, 0] - barycentrics[:, 1], barycentrics[:, 0], barycentrics[:, 1] ))
+        normals = np.einsum('ij,ijk->ik', weights, corners)
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        return normals / np.maximum(lengths, 1e-12)
+
+class TriangleBVH(object):
+    """ Bounding volume hierarchy over the triangles of a MeshSnapshot stored in flat arrays.
+        Nodes are split at the median centroid along the largest axis until they hold at most leafSize triangles.
+        Params
+        ===
+            snapshot: The MeshSnapshot to build the hierarchy for
+            leafSize (optional): Maximum number of triangles in a leaf node
+    """
+    def __init__(self, snapshot, leafSize = 8):
+        self.snapshot = snapshot
+        numTriangles = len(snapshot.triangles)
+
+        corners = snapshot.vertices[snapshot.triangles]
+        triangleMin = corners.min(axis=1)
+        triangleMax = corners.max(axis=1)
+        centroids = corners.mean(axis=1)
+
+        order = np.arange(numTriangles)
+        nodeMin = []
+        nodeMax = []
+        nodeLeft = []
+        nodeRight = []
+        nodeStart = []
+        nodeCount = []
+
+        def addNode(start, end):
+            indices = order[start:end]
+            nodeMin.append(triangleMin[indices].min(axis=0) if end > start else np.zeros(3))
+            nodeMax.append(triangleMax[indices].max(axis=0) if end > start else np.zeros(3))
+            nodeLeft.append(-1)
+            nodeRight.append(-1)
+            nodeStart.append(start)
+            nodeCount.append(end - start)
+            return len(nodeMin) - 1
+
+        stack = [ (addNode(0, numTriangles), 0, numTriangles) ]
+        while len(stack) > 0:
+            node, start, end = stack.pop()
+            if end - start <= leafSize:
+                continue
+
+            # Split at the median centroid along the largest axis
+            indices = order[start:end]
+            extent = centroids[indices].max(axis=0) - centroids[indices].min(axis=0)
+            axis = int(np.argmax(extent))
+            middle = (end - start) // 2
+            partition = np.argpartition(centroids[indices, axis], middle)
+            order[start:end] = indices[partition]
+
+            left = addNode(start, start + middle)
+            right = addNode(start + middle, end)
+            nodeLeft[node] = left
+            nodeRight[node] = right
+            nodeCount[node] = 0
+            stack.append((left, start, start + middle))
+            stack.append((right, start + middle, end))
+
+        self.order = order
+        self.nodeMin = np.array(nodeMin).reshape(-1, 3)
+        self.nodeMax = np.array(nodeMax).reshape(-1, 3)
+        self.nodeLeft = np.array(nodeLeft, dtype=np.int64)
+        self.nodeRight = np.array(nodeRight, dtype=np.int64)
+        self.nodeStart = np.array(nodeStart, dtype=np.int64)
+        self.nodeCount = np.array(nodeCount, dtype=np.int64)
+
+class RayHits(object):
+    """ Closest intersections of a batch of rays. Rays without a hit have an infinite distance and -1 as ids.
+        Params
+        ===
+            hit: (N,) boolean array, True where the ray hit a mesh
+            points: (N, 3) array of hit points
+            distances: (N,) array of ray parameters of the hits
+            meshIndices: (N,) array with the index of the hit mesh
+            triangleIds: (N,) array with the index of the hit triangle within its mesh snapshot
+            faceIds: (N,) array with the polygon id of the hit triangle
+            barycentrics: (N, 2) array with the barycentric coordinates (u, v) of the hit relative to the
+                          second and third triangle vertex
+    """
+    def __init__(self, numRays):
+        self.hit = np.zeros(numRays, dtype=bool)
+        self.points = np.zeros((numRays, 3))
+        self.distances = np.full(numRays, np.inf)
+        self.meshIndices = np.full(numRays, -1, dtype=np.int64)
+        self.triangleIds = np.full(numRays, -1, dtype=np.int64)
+        self.faceIds = np.full(numRays, -1, dtype=np.int64)
+        self.barycentrics = np.zeros((numRays, 2))
+
+    def __len__(self):
+        return len(self.hit)
+
+def intersectRaysBoxes(origins, inverseDirections, boxMin, boxMax, maxDistance):
+    """ Slab test between rays and axis aligned boxes (one box per ray).
+        Params
+        ===
+            origins: (N, 3) array of ray origins
+            inverseDirections: (N, 3) array of reciprocal ray directions
+            boxMin: (N, 3) array of minimum box corners
+            boxMax: (N, 3) array of maximum box corners
+            maxDistance: (N,) array with the maximum ray parameter to accept
+            return: A tuple (hit, tNear) of (N,) arrays
+    """
+    with np.errstate(invalid='ignore'):
+        t1 = (boxMin - origins) * inverseDirections
+        t2 = (boxMax - origins) * inverseDirections
+    # NaN appears when a ray lies exactly in a slab plane, treat it as inside that slab
+    inSlabPlane = np.isnan(t1) | np.isnan(t2)
+    tNear = np.where(inSlabPlane, -np.inf, np.minimum(t1, t2)).max(axis=1)
+    tFar = np.where(inSlabPlane, np.inf, np.maximum(t1, t2)).min(axis=1)
+    tNear = np.maximum(tNear, 0.0)
+    return (tNear <= tFar) & (tNear <= maxDistance), tNear
+
+def intersectRaysTriangles(origins, directions, v0, edge1, edge2, tolerance = 0.0001):
+    """ Double sided Moller-Trumbore intersection between rays and triangles (one triangle per ray).
+        Params
+        ===
+            origins: (N, 3) array of ray origins
+            directions: (N, 3) array of ray directions
+            v0: (N, 3) array of first triangle vertices
+            edge1: (N, 3) array of edges from the first to the second vertex
+            edge2: (N, 3) array of edges from the first to the third vertex
+            tolerance (optional): Tolerance of the barycentric coordinates at the triangle edges
+            return: A tuple (hit, t, u, v) of (N,) arrays
+    """
+    p = np.cross(directions, edge2)
+    determinant = np.einsum('ij,ij->i', edge1, p)
+    valid = np.abs(determinant) > 1e-12
+    inverseDeterminant = np.where(valid, 1.0 / np.where(valid, determinant, 1.0), 0.0)
+
+    s = origins - v0
+    u = np.einsum('ij,ij->i', s, p) * inverseDeterminant
+    q = np.cross(s, edge1)
+    v = np.einsum('ij,ij->i', directions, q) * inverseDeterminant
+    t = np.einsum('ij,ij->i', edge2, q) * inverseDeterminant
+
+    hit = valid & (u >= -tolerance) & (v >= -tolerance) & (u + v <= 1.0 + tolerance) & (t >= 0.0)
+    return hit, t, u, v
+
+class RayCaster(object):
+    """ Casts batches of rays against a set of mesh snapshots and returns the closest hits.
+        Each mesh gets its own TriangleBVH and rays are first culled against the bounding box of each mesh.
+        Params
+        ===
+            snapshots: A list of MeshSnapshot
+            leafSize (optional): Maximum number of triangles in a BVH leaf
+            batchSize (optional): Maximum number of rays traversed together, bounds the temporary memory
+    """
+    def __init__(self, snapshots, leafSize = 8, batchSize = 65536):
+        self.snapshots = list(snapshots)
+        self.bvhs = [ TriangleBVH(snapshot, leafSize) for snapshot in self.snapshots ]
+        self.batchSize = batchSize
+
+    def intersect(self, origins, directions, maxDistance = np.inf, tolerance = 0.0001):
+        """ Finds the closest intersection of each ray with any of the meshes.
+            Params
+            ===
+                origins: (N, 3) array of ray origins
+                directions: (N, 3) array of ray directions (a single direction is broadcast to all rays)
+                maxDistance (optional): Maximum ray parameter of a hit
+                tolerance (optional): Tolerance of the barycentric coordinates at the triangle edges
+                return: A RayHits object
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.broadcast_to(np.asarray(directions, dtype=np.float64), origins.shape)
+        hits = RayHits(len(origins))
+        hits.distances[:] = maxDistance
+
+        for start in range(0, len(origins), self.batchSize):
+            end = min(start + self.batchSize, len(origins))
+            self._intersectBatch(origins[start:end], directions[start:end], hits, start, tolerance)
+
+        hits.distances[~hits.hit] = np.inf
+        hitIndices = np.nonzero(hits.hit)[0]
+        hits.points[hitIndices] = origins[hitIndices] + directions[hitIndices] * hits.distances[hitIndices, None]
+        for meshIndex, snapshot in enumerate(self.snapshots):
+            selection = hitIndices[hits.meshIndices[hitIndices] == meshIndex]
+            hits.faceIds[selection] = snapshot.faceIds[hits.triangleIds[selection]]
+        return hits
+
+    def _intersectBatch(self, origins, directions, hits, offset, tolerance):
+        with np.errstate(divide='ignore'):
+            inverseDirections = 1.0 / directions
+        rayIndices = np.arange(len(origins))
+
+        for meshIndex, bvh in enumerate(self.bvhs):
+            if len(bvh.snapshot.triangles) == 0:
+                continue
+
+            # Cull rays against the bounding box of the whole mesh
+            best = hits.distances[offset:offset + len(origins)]
+            boxHit, _ = intersectRaysBoxes(origins, inverseDirections, bvh.nodeMin[[0]], bvh.nodeMax[[0]], best)
+            pairRays = rayIndices[boxHit]
+            pairNodes = np.zeros(len(pairRays), dtype=np.int64)
+
+            # Traverse the hierarchy breadth first with one (ray, node) pair per entry
+            while len(pairRays) > 0:
+                isLeaf = bvh.nodeLeft[pairNodes] < 0
+
+                leafRays = pairRays[isLeaf]
+                if len(leafRays) > 0:
+                    self._intersectLeaves(origins, directions, hits, offset, meshIndex, bvh,
+                                          leafRays, pairNodes[isLeaf], tolerance)
+
+                innerRays = pairRays[~isLeaf]
+                innerNodes = pairNodes[~isLeaf]
+                pairRays = np.concatenate((innerRays, innerRays))
+                pairNodes = np.concatenate((bvh.nodeLeft[innerNodes], bvh.nodeRight[innerNodes]))
+                if len(pairRays) == 0:
+                    break
+
+                boxHit, _ = intersectRaysBoxes(origins[pairRays], inverseDirections[pairRays],
+                                               bvh.nodeMin[pairNodes], bvh.nodeMax[pairNodes],
+                                               hits.distances[offset + pairRays])
+                pairRays = pairRays[boxHit]
+                pairNodes = pairNodes[boxHit]
+
+    def _intersectLeaves(self, origins, directions, hits, offset, meshIndex, bvh, rays, nodes, tolerance):
+        # Expand each (ray, leaf) pair into one (ray, triangle) pair per triangle in the leaf
+        counts = bvh.nodeCount[nodes]
+        rays = np.repeat(rays, counts)
+        firstOfPair = np.repeat(np.cumsum(counts) - counts, counts)
+        triangles = bvh.order[np.repeat(bvh.nodeStart[nodes], counts) + np.arange(len(rays)) - firstOfPair]
+
+        snapshot = bvh.snapshot
+        hit, t, u, v = intersectRaysTriangles(origins[rays], directions[rays], snapshot.v0[triangles],
+                                              snapshot.edge1[triangles], snapshot.edge2[triangles], tolerance)
+        hit &= t < hits.distances[offset + rays]
+        if not np.any(hit):
+            return
+
+        rays = rays[hit]
+        t = t[hit]
+        triangles = triangles[hit]
+        u = u[hit]
+        v = v[hit]
+
+        # Keep the closest hit for each ray
+        order = np.lexsort((t, rays))
+        rays = rays[order]
+        first = np.ones(len(rays), dtype=bool)
+        first[1:] = rays[1:] != rays[:-1]
+        closest = order[first]
+        rays = rays[first]
+
+        target = offset + rays
+        hits.hit[target] = True
+        hits.distances[target] = t[closest]
+        hits.meshIndices[target] = meshIndex
+        hits.triangleIds[target] = triangles[closest]
+        hits.barycentrics[target, 0] = u[closest]
+        hits.barycentrics[target, 1] = v[closest]
@@ -0,0 +1,83 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+def hashMeshSnapshots( hasher, snapshots ):
+    """ Feeds the world space points, the triangles and the face subset of each snapshot to a hash object.
+        Params
+        ===
+            hasher: A hashlib hash object
+            snapshots: A list of MeshSnapshot
+    """
+    for snapshot in snapshots:
+        for array in (snapshot.vertices, snapshot.triangles, snapshot.faceIds):
+            hasher.update( str(array.shape).encode('ascii') )
+            hasher.update( np.ascontiguousarray(array).tobytes() )
+
+def createResultKey( snapshots, sampler, samplerParams, seed ):
+    """ Creates a content based key for the sampling and ray casting result of a scatter.
+        Params
+        ===
+            snapshots: A list of MeshSnapshot of the selected meshes (faces outside the selection excluded)
+            sampler: Name of the sampling method
+            samplerParams: Dictionary with the parameters of the sampler and the ray casting
+            seed: Seed of the sampler
+            return: A hex digest string
+    """
+    hasher = hashlib.sha1()
+    hashMeshSnapshots( hasher, snapshots )
+    hasher.update( json.dumps([ sampler, samplerParams, seed ], sort_keys=True).encode('utf-8') )
+    return hasher.hexdigest()
+
+class ScatterResultCache(object):
+    """ Least recently used cache of scatter results (tuples of NumPy arrays), bounded by their total size.
+        Params
+        ===
+            maxBytes (optional): Maximum total size of the cached arrays
+    """
+    def __init__(self, maxBytes = 512 * 1024 * 1024):
+        self.maxBytes = maxBytes
+        self.numBytes = 0
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """ Returns the cached arrays for the given key and marks them as recently used, or None. """
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def put(self, key, arrays):
+        """ Stores a tuple of arrays, evicting the least recently used entries when the cache is full.
+            Results larger than the whole cache are not stored.
+            Params
+            ===
+                key: Key from createResultKey
+                arrays: A tuple of NumPy arrays
+        """
+        arrays = tuple( np.array(array, copy=True) for array in arrays )
+        for array in arrays:
+            array.setflags(write=False)
+        size = sum( array.nbytes for array in arrays )
+        if size > self.maxBytes:
+            return
+
+        if key in self.entries:
+            self.numBytes -= self.entries.pop(key)[1]
+        while self.numBytes + size > self.maxBytes and len(self.entries) > 0:
+            self.numBytes -= self.entries.popitem(last=False)[1][1]
+
+        self.entries[key] = (arrays, size)
+        self.numBytes += size
+
+    def clear(self):
+        self.entries.clear()
+        self.numBytes = 0
@@ -1,11 +1,50 @@
 import maya.cmds as cmds
 import maya.OpenMaya as om
 
+import hashlib
 import math
 import random
+import shutil
+import tempfile
+import zlib
+import numpy as np
 
-from basic_sampler import basicRandomSampling
-from hdt import hdtPoissonDiscSampling
+from basic_sampler import iterBasicRandomSampling
+from hdt import iterHdtPoissonDiscSampling
+from parallel_hdt import iterParallelHdtPoissonDiscSampling
+from bridson import iterBridsonPoissonDiscSampling
+from multiclass_hdt import iterMultiClassHdtPoissonDiscSampling
+from variable_radius import iterVariableRadiusPoissonDiscSampling, loadDensityImage
+from progress import ProgressReporter
+from footprint import rasterizeFootprint, filterSamples
+from hit_filters import createHitFilters, filterHits
+from orientation import computeOrientations
+from incremental import changedRegion, expandRegion, pointsInRegion, iterRegionSamples
+from multiclass_hdt import createCrossDistances
+from scatter_settings import ScatterSettings, parseClassRadii
+import instrumentation
+from raycast import RayCaster
+from mesh_cache import MeshGeometryCache
+from selection import compileSelection, compileMeshNames, CompiledMesh
+from scene_output import createOutputBackend, readScatterTable, ModelInstancer
+from point_table import ScatterPointTable, registerTable, findTable, removeTable
+from point_table import saveTable, loadTable, iterTableChunks, ScatterCacheWriter, concatenateTables
+from result_cache import ScatterResultCache, createResultKey
+
+# Ray hits of recent scatters, keyed by the meshes and sampler settings
+resultCache = ScatterResultCache()
+
+# Mesh snapshots of the scatters created in this session, keyed by the name of their scatter group, to find
+# the regions where the meshes were edited since the scatter
+groupSnapshots = {}
+
+# Density function density(x, z) -> [0, 1] used by the variable radius sampler instead of the density map image
+densityFunction = None
+
+def setDensityFunction( function ):
+    """ Sets a procedural density for the variable radius sampler, None to use the density map image again. """
+    global densityFunction
+    densityFunction = function
 
 def mergeBoundingBoxes(bboxes):
     bbox = bboxes[0]
@@ -53,7 +92,32 @@ def getFnMesh( meshName ):
 
     return om.MFnMesh(item)
 
-def checkIntersections( fnMeshes, rayOrigin, rayDirection ):   
+def checkIntersections( fnMeshes, rayOrigin, rayDirection, geometryCaches, smoothNormals=False ):
+    """ Casts a ray against the given meshes and returns the closest intersection.
+        Params
+        ===
+            fnMeshes: A list of CompiledMesh, see compileSelection
+            rayOrigin: MFloatPoint origin of the ray
+            rayDirection: MFloatVector direction of the ray
+            geometryCaches: A MeshGeometryCache per mesh
+            smoothNormals (optional): Interpolate the vertex normals at the hit instead of averaging the face
+            return: A tuple (intersection found, intersection point, normal)
+    """
+    return findClosestIntersection( fnMeshes, rayOrigin, rayDirection, geometryCaches, smoothNormals )[:3]
+
+def findClosestIntersection( fnMeshes, rayOrigin, rayDirection, geometryCaches, smoothNormals=False ):
+    """ Same as checkIntersections but also returns which mesh and face were hit.
+        Params
+        ===
+            See checkIntersections
+            return: A tuple (intersection found, intersection point, normal, mesh index, face id)
+    """
+    # The meshes are compiled once per scatter, compiling them per ray would rebuild their acceleration grids
+    for mesh in fnMeshes:
+        if not isinstance(mesh, CompiledMesh):
+            raise TypeError("Expected a CompiledMesh, got {}".format(type(mesh).__name__))
+    meshes = fnMeshes
+        
     # No specified triangle IDs
     triangleIds = None
     # IDs are not sorted
@@ -68,9 +132,6 @@ def checkIntersections( fnMeshes, rayOrigin, rayDirection ):
     # Do not test in negative direction
     biDirectionalTest = False
 
-    # No intersection acceleration
-    accelParams = None
-    
     # References and pointers for saving intersection info
     hitPoint = om.MFloatPoint()
     
@@ -81,34 +142,31 @@ def checkIntersections( fnMeshes, rayOrigin, rayDirection ):
     hitFace.createFromInt(0)
     hitFacePtr = hitFace.asIntPtr()
     
-    hitTriangle = None
-    hitBarycentric1= None
-    hitBarycentric2 = None
+    hitTriangle = om.MScriptUtil()
+    hitTriangle.createFromInt(0)
+    hitTrianglePtr = hitTriangle.asIntPtr()
+    
+    hitBarycentric1 = om.MScriptUtil(0.0)
+    hitBarycentric1Ptr = hitBarycentric1.asFloatPtr()
+    hitBarycentric2 = om.MScriptUtil(0.0)
+    hitBarycentric2Ptr = hitBarycentric2.asFloatPtr()
 
     # Tolerance value of the intersection
     hitTolerance = 0.0001
 
     # Arrays for storing multiple intersections
-    closestFace = om.MScriptUtil()
-    closestFace.createFromInt(0)
+    closestFace = -1
     minDistance = 9999999999
     intersectionPoint = (0,0,0)
     intersectionFound = False
     meshIndex = -1
     
-    for i in range(len(fnMeshes)):
-        # Select face ids
-        faceIds = None
-        if len(fnMeshes[i][1]) > 0:
-            faceIds = om.MIntArray()
-            for id in fnMeshes[i][1]:
-                faceIds.append(id)
-        
-        # Check for intersection
-        if fnMeshes[i][0].closestIntersection( rayOrigin, rayDirection, faceIds, triangleIds, sortedIds,
-                                      worldSpace, maxParam, biDirectionalTest, accelParams, 
-                                      hitPoint, hitRayParamsPtr, hitFacePtr, hitTriangle, 
-                                      hitBarycentric1, hitBarycentric2, hitTolerance ):
+    for i in range(len(meshes)):
+        # Check for intersection with the selected faces, using the uniform grid acceleration of the mesh
+        if meshes[i].fnMesh.closestIntersection( rayOrigin, rayDirection, meshes[i].faceIdArray, triangleIds, sortedIds,
+                                      worldSpace, maxParam, biDirectionalTest, meshes[i].accelParams, 
+                                      hitPoint, hitRayParamsPtr, hitFacePtr, hitTrianglePtr, 
+                                      hitBarycentric1Ptr, hitBarycentric2Ptr, hitTolerance ):
                                           
             intersectionFound = True 
             hitDistance = hitRayParams.getFloat(hitRayParamsPtr)
@@ -116,39 +174,262 @@ def checkIntersections( fnMeshes, rayOrigin, rayDirection ):
                 minDistance = hitDistance
                 intersectionPoint = (hitPoint.x, hitPoint.y, hitPoint.z)
                 closestFace = om.MScriptUtil(hitFacePtr).asInt()
+                closestTriangle = om.MScriptUtil(hitTrianglePtr).asInt()
+                closestBarycentric1 = hitBarycentric1.getFloat(hitBarycentric1Ptr)
+                closestBarycentric2 = hitBarycentric2.getFloat(hitBarycentric2Ptr)
                 meshIndex = i
        
     faceNormal = (0,1,0)
         
     if intersectionFound:
-        # Get the indices of the vertex normals of the intersection face
-        normalIds = om.MIntArray()
-        fnMeshes[meshIndex][0].getFaceNormalIds( closestFace, normalIds )
-
-        # Get all normals of the mesh
-        normals = om.MFloatVectorArray()
-        fnMeshes[meshIndex][0].getNormals( normals, worldSpace )
-        
-        # Sum the vertex normals to approximate the face normal
-        n = normalIds.length()
-        sum = om.MFloatVector()
-        for i in range(n):
-            sum += normals[normalIds[i]]
-            
-        sum /= n
-        sum.normalize()
-        faceNormal = (sum.x, sum.y, sum.z)
-        
-        """
-        # Get all points
-        points = om.MPointArray()
-        fnMesh.getPoints( points, worldSpace )
+        # Look up the normal in the cached normals of the hit mesh
+        if smoothNormals:
+            faceNormal = geometryCaches[meshIndex].smoothNormal( closestFace, closestTriangle,
+                                                                 closestBarycentric1, closestBarycentric2 )
+        else:
+            faceNormal = geometryCaches[meshIndex].faceNormal( closestFace )
+    
+    return intersectionFound, intersectionPoint, faceNormal, meshIndex, closestFace
+    
+def castRaysMayaApi( fnMeshes, geometryCaches, samples, rayHeight, smoothNormals=False ):
+    """ Casts one ray per sample in negative y-direction with MFnMesh.closestIntersection.
+        Params
+        ===
+            fnMeshes: A list of CompiledMesh
+            geometryCaches: A MeshGeometryCache per mesh
+            samples: A list of (x, z) coordinates
+            rayHeight: The y-coordinate of the ray origins
+            smoothNormals (optional): Interpolate the vertex normals at the hits
+            return: A tuple (positions, normals, mesh indices, face ids) of arrays for the rays that hit a mesh
+    """
+    hits = []
+    for coordinates in samples:
+        rayOrigin = om.MFloatPoint(coordinates[0], rayHeight, coordinates[1], 1.0)
         
-        # Compute normal based on cross product
-        faceNormal = computeNormal( points[normalIds[0]], points[normalIds[1]], points[normalIds[2]] )
-        """
+        # Cast ray in negative y-direction
+        rayDirection = om.MFloatVector(0, -1, 0)
+
+        # Cast ray and check for intersection with given mesh
+        intersectionFound, intersectionPoint, faceNormal, meshIndex, faceId = findClosestIntersection(
+            fnMeshes, rayOrigin, rayDirection, geometryCaches, smoothNormals )
+        if intersectionFound:
+            hits.append((intersectionPoint, faceNormal, meshIndex, faceId))
+    
+    instrumentation.count('raysCast', len(samples))
+    instrumentation.count('meshIntersectionTests', len(samples) * len(fnMeshes))
+    instrumentation.count('hits', len(hits))
+    instrumentation.count('misses', len(samples) - len(hits))
+    
+    positions = np.array([ hit[0] for hit in hits ]).reshape(-1, 3)
+    normals = np.array([ hit[1] for hit in hits ]).reshape(-1, 3)
+    meshIndices = np.array([ hit[2] for hit in hits ], dtype=np.int64)
+    faceIds = np.array([ hit[3] for hit in hits ], dtype=np.int64)
+    return positions, normals, meshIndices, faceIds
+
+def castRaysBvh( snapshots, samples, rayHeight, smoothNormals=False, rayCaster=None ):
+    """ Casts all rays in negative y-direction at once with the NumPy BVH ray caster.
+        Params
+        ===
+            snapshots: A MeshSnapshot per mesh
+            samples: A list or (N, 2) array of (x, z) coordinates
+            rayHeight: The y-coordinate of the ray origins
+            smoothNormals (optional): Interpolate the vertex normals at the hits
+            rayCaster (optional): A RayCaster built from the snapshots, to reuse its BVHs across batches of samples
+            return: A tuple (positions, normals, mesh indices, face ids) of arrays for the rays that hit a mesh
+    """
+    samples = np.asarray(samples, dtype=np.float64).reshape(-1, 2)
+    
+    if rayCaster is None:
+        rayCaster = RayCaster( snapshots )
+    
+    origins = np.column_stack(( samples[:, 0], np.full(len(samples), rayHeight), samples[:, 1] ))
+    with instrumentation.stage('raycast'):
+        rayHits = rayCaster.intersect( origins, (0.0, -1.0, 0.0) )
+    
+    hitIndices = np.nonzero(rayHits.hit)[0]
+    instrumentation.count('raysCast', len(samples))
+    instrumentation.count('hits', len(hitIndices))
+    instrumentation.count('misses', len(samples) - len(hitIndices))
+    
+    with instrumentation.stage('normals'):
+        normals = np.zeros((len(hitIndices), 3))
+        for meshIndex, snapshot in enumerate(snapshots):
+            isMesh = rayHits.meshIndices[hitIndices] == meshIndex
+            meshHits = hitIndices[isMesh]
+            if smoothNormals:
+                normals[isMesh] = snapshot.interpolateNormals( rayHits.triangleIds[meshHits], rayHits.barycentrics[meshHits] )
+            else:
+                normals[isMesh] = snapshot.faceNormals[ rayHits.faceIds[meshHits] ]
+    
+    return rayHits.points[hitIndices], normals, rayHits.meshIndices[hitIndices], rayHits.faceIds[hitIndices]
+    
+def concatenateHits( hitBatches ):
+    """ Concatenates the (positions, normals, mesh indices, face ids, labels) tuples of several batches of rays. """
+    if len(hitBatches) == 0:
+        return ( np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                 np.zeros(0, dtype=np.int64) )
+    return tuple( np.concatenate([ hits[i] for hits in hitBatches ]) for i in range(5) )
+
+def createRayCast( raycastMethod, fnMeshes, geometryCaches, snapshots, rayHeight, smoothNormals=False, rayCaster=None ):
+    """ Creates the function which casts the rays of a batch of samples with the selected ray casting method.
+        Params
+        ===
+            raycastMethod: Name of the ray casting method, 'Maya API' or 'BVH (NumPy)'
+            fnMeshes: A list of CompiledMesh, for the Maya API
+            geometryCaches: A MeshGeometryCache per mesh, for the Maya API
+            snapshots: A MeshSnapshot per mesh, for the BVH ray caster
+            rayHeight: The y-coordinate of the ray origins
+            smoothNormals (optional): Interpolate the vertex normals at the hits
+            rayCaster (optional): A RayCaster built from the snapshots
+            return: A function of an (N, 2) array of samples which returns the hits as castRaysBvh does
+    """
+    if raycastMethod == 'Maya API':
+        def castRays( samples ):
+            with instrumentation.stage('raycast'):
+                return castRaysMayaApi( fnMeshes, geometryCaches, samples, rayHeight, smoothNormals )
+        return castRays
+    return lambda samples: castRaysBvh( snapshots, samples, rayHeight, smoothNormals, rayCaster )
+
+def processSampleChunk( samples, castRays, hitFilters, settings, rng, scatterParameters=None, keepLabels=True,
+                        unfilteredHits=None ):
+    """ Runs one chunk of samples through the scatter pipeline: casts the rays of each class, drops the hits
+        rejected by the hit filters and computes the transforms of the remaining points.
+        Params
+        ===
+            samples: A list or array of (x, z) or (x, z, label) samples
+            castRays: Function which casts the rays of an (N, 2) array of samples, see createRayCast
+            hitFilters: A list of hit filters from createHitFilters
+            settings: A ScatterSettings with the orientation, rotation and scale settings
+            rng: The NumPy random generator of the scatter, for the filter decisions and the random transforms
+            scatterParameters (optional): Parameters of the returned table
+            keepLabels (optional): Keep the class of multi-class samples, otherwise the points get the label -1
+            unfilteredHits (optional): List to which the hits are appended before they are filtered
+            return: A ScatterPointTable with the points of the chunk
+    """
+    # Cast the rays of each class separately to keep the class label of every hit
+    hitBatches = []
+    for label, classSamples in splitSampleClasses( samples ):
+        hits = castRays( classSamples )
+        hitBatches.append( hits + (np.full(len(hits[0]), label if keepLabels else -1, dtype=np.int64),) )
+    hits = concatenateHits( hitBatches )
+    if unfilteredHits is not None:
+        unfilteredHits.append( hits )
+    return processHits( hits, hitFilters, settings, rng, scatterParameters )
+
+def processHits( hits, hitFilters, settings, rng, scatterParameters=None ):
+    """ The part of processSampleChunk after the ray casts, for hits from the result cache.
+        Params
+        ===
+            hits: A tuple (positions, normals, mesh indices, face ids, labels) of arrays
+            See processSampleChunk for the other parameters
+    """
+    # Drop the hits on slopes, outside of the height band and so on before any transforms and nodes are created
+    with instrumentation.stage('filters'):
+        positions, normals, meshIndices, faceIds, labels = filterHits( hitFilters, hits, rng )
+    with instrumentation.stage('transforms'):
+        rotations, scales = computeTransforms( normals, settings, rng )
+    instrumentation.count('scatterPoints', len(positions))
+    return ScatterPointTable( positions, rotations, scales, normals, meshIndices, faceIds, scatterParameters, labels )
+
+def iterSampleChunks( sampleBatches, chunkSize ):
+    """ Regroups the batches of a sampler into chunks of a fixed number of samples: large batches are split and
+        small batches are merged, so that the work and memory per chunk do not depend on the sampler.
+        Params
+        ===
+            sampleBatches: A generator of lists or arrays of (x, z) or (x, z, label) samples
+            chunkSize: Number of samples per chunk, the last chunk can be smaller
+            return: A generator of (M, 2) or (M, 3) arrays
+    """
+    pending = []
+    numPending = 0
+    for batch in sampleBatches:
+        batch = np.asarray(batch, dtype=np.float64)
+        if len(batch) == 0:
+            continue
+        batch = batch.reshape(len(batch), -1)
+        while numPending + len(batch) >= chunkSize:
+            numTaken = chunkSize - numPending
+            pending.append( batch[:numTaken] )
+            yield np.concatenate(pending)
+            batch = batch[numTaken:]
+            pending = []
+            numPending = 0
+        if len(batch) > 0:
+            pending.append(batch)
+            numPending += len(batch)
+    if numPending > 0:
+        yield np.concatenate(pending)
+
+def splitSampleClasses( samples ):
+    """ Splits a batch of samples into the samples of each class.
+        Params
+        ===
+            samples: A list of (x, z) or (x, z, label) tuples, or an array with 2 or 3 columns
+            return: A list of (label, (N, 2) array) tuples, the label is -1 for samples without a class
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.ndim != 2 or samples.shape[1] != 3:
+        return [ (-1, samples.reshape(-1, 2)) ]
+    
+    labels = samples[:, 2].astype(np.int64)
+    return [ (label, samples[labels == label, :2]) for label in np.unique(labels).tolist() ]
+
+def iterSamples( samplingMethod, bbox, discRadius, resolution, probability, seed, progress=None,
+                 maxDiscRadius=None, density=None, classRadii=None, footprint=None ):
+    """ Yields batches of xz-samples over the given bounding box from the selected sampling method.
+        Params
+        ===
+            samplingMethod: Name of the sampling method in the UI
+            bbox: Bounding box [xMin, yMin, zMin, xMax, yMax, zMax] of the selected meshes
+            discRadius: Disc radius of the Poisson-Disc samplers
+            resolution: Grid resolution of the simple randomizer
+            probability: Probability of keeping a grid cell in the simple randomizer
+            seed: Seed of the sampler
+            progress (optional): Progress function, sampling stops when it returns True
+            maxDiscRadius (optional): Disc radius of the variable radius sampler where the density is 0
+            density (optional): Density function or 2D density array of the variable radius sampler
+            classRadii (optional): Disc radius of each class of the multi-class sampler
+            footprint (optional): A FootprintMask, no samples are generated outside of it
+            return: A generator of lists or arrays of (x, z) coordinates, (x, z, label) for the multi-class sampler
+    """
+    if samplingMethod == 'Poisson-Disc':
+        #Top/bottom
+        return iterHdtPoissonDiscSampling( bbox[0], bbox[3], bbox[2], bbox[5], discRadius, seed=seed, progress=progress,
+                                           footprint=footprint )
+
+        #Right/Left
+        #return iterHdtPoissonDiscSampling( bbox[0], bbox[3], bbox[1], bbox[4], discRadius, seed=seed, progress=progress )
+
+        #Front/Back
+        #return iterHdtPoissonDiscSampling( bbox[1], bbox[4], bbox[3], bbox[5], discRadius, seed=seed, progress=progress )
+    elif samplingMethod == 'Parallel Poisson-Disc':
+        return iterParallelHdtPoissonDiscSampling( bbox[0], bbox[3], bbox[2], bbox[5], discRadius, seed=seed, progress=progress,
+                                                   footprint=footprint )
+    elif samplingMethod == 'Multi-Class Poisson-Disc':
+        return iterMultiClassHdtPoissonDiscSampling( bbox[0], bbox[3], bbox[2], bbox[5], classRadii, seed=seed, progress=progress,
+                                                     footprint=footprint )
     
-    return intersectionFound, intersectionPoint, faceNormal
+    # The other samplers grow or jitter their samples over the whole domain, the samples outside of the
+    # footprint are removed before any rays are cast for them
+    if samplingMethod == 'Bridson Poisson-Disc':
+        sampleBatches = iterBridsonPoissonDiscSampling( bbox[0], bbox[3], bbox[2], bbox[5], discRadius, seed=seed, progress=progress )
+    elif samplingMethod == 'Variable Poisson-Disc':
+        sampleBatches = iterVariableRadiusPoissonDiscSampling( bbox[0], bbox[3], bbox[2], bbox[5], discRadius, maxDiscRadius,
+                                                               density, seed=seed, progress=progress )
+    else:
+        sampleBatches = iterBasicRandomSampling( bbox[0], bbox[2], bbox[3], bbox[5], resolution, probability, seed )
+    
+    if footprint is None:
+        return sampleBatches
+    return filterSamples( sampleBatches, footprint )
+
+def samplingCellLength( samplingMethod, bbox, discRadius, resolution, classRadii ):
+    """ Returns the cell length of the footprint mask, a quarter of the smallest distance between samples. """
+    if samplingMethod == 'Multi-Class Poisson-Disc':
+        return min(classRadii) * 0.25
+    elif samplingMethod == 'Simple Randomizer':
+        return max( bbox[3] - bbox[0], bbox[5] - bbox[2] ) / float(max(resolution, 1)) * 0.25
+    return discRadius * 0.25
     
 def aimY(vec):
     # Convert to OpenMaya vector
@@ -180,10 +461,26 @@ def aimY(vec):
 
     return xAngleDeg, zAngleDeg
 
+def computeTransforms( normals, settings, rng = None ):
+    """ Computes the rotation and scale of all scatter points in one vectorised call, see computeOrientations.
+        Params
+        ===
+            normals: (N, 3) array of surface normals at the points
+            settings: A ScatterSettings with the orientation, rotation and scale settings
+            rng (optional): A NumPy random generator for the random rotations and scales, seeded with the
+                            seed of the settings if None
+            return: A tuple ((N, 3) array of rotations in degrees, (N,) array of scales)
+    """
+    if rng is None:
+        rng = np.random.default_rng( settings.seed )
+    return computeOrientations( normals, settings.rotationRange, settings.scaleRange, rng, settings.surfaceOrientation )
+
 def generateScatterPoints( resolutionField, probabilityField, surfaceOrientationCheckBox, 
                            locatorColorFieldGrp, randomRotMaxSliderGrp, randomRotMinSliderGrp, 
                            minScaleFieldGrp, maxScaleFieldGrp, locatorGroupNameFieldGrp,
-                           samplerOptionMenu, discRadiusField, *pArgs ):
+                           samplerOptionMenu, discRadiusField, raycastOptionMenu, outputOptionMenu,
+                           seedFieldGrp, maxDiscRadiusField, densityMapFieldGrp, classRadiiFieldGrp,
+                           slopeRangeFieldGrp, heightRangeFieldGrp, heightFilterCheckBox, chunkSizeFieldGrp, *pArgs ):
            
     # Check if a mesh is selected
     selected = cmds.ls( sl=True )
@@ -191,157 +488,471 @@ def generateScatterPoints( resolutionField, probabilityField, surfaceOrientation
         print("No mesh selected")
         return
     
+    settings = readScatterSettings( resolutionField, probabilityField, surfaceOrientationCheckBox, locatorColorFieldGrp,
+                                    randomRotMaxSliderGrp, randomRotMinSliderGrp, minScaleFieldGrp, maxScaleFieldGrp,
+                                    locatorGroupNameFieldGrp, samplerOptionMenu, discRadiusField, raycastOptionMenu,
+                                    outputOptionMenu, seedFieldGrp, maxDiscRadiusField, densityMapFieldGrp, classRadiiFieldGrp,
+                                    slopeRangeFieldGrp, heightRangeFieldGrp, heightFilterCheckBox, chunkSizeFieldGrp )
+    if settings is None:
+        return
+    
+    scatterPoints( selected, settings )
+    
+    # Clear selection
+    cmds.select( cl=True )
+
+def readScatterSettings( resolutionField, probabilityField, surfaceOrientationCheckBox, 
+                         locatorColorFieldGrp, randomRotMaxSliderGrp, randomRotMinSliderGrp, 
+                         minScaleFieldGrp, maxScaleFieldGrp, locatorGroupNameFieldGrp,
+                         samplerOptionMenu, discRadiusField, raycastOptionMenu, outputOptionMenu,
+                         seedFieldGrp, maxDiscRadiusField, densityMapFieldGrp, classRadiiFieldGrp,
+                         slopeRangeFieldGrp, heightRangeFieldGrp, heightFilterCheckBox, chunkSizeFieldGrp ):
+    """ Reads the scatter settings from the fields of the tool window.
+        Params
+        ===
+            The fields of the tool window
+            return: A ScatterSettings, or None if a field is not valid
+    """
+    # Hit filters of the UI, a slope range of 0 to 90 degrees keeps all hits
+    filters = []
+    minSlope, maxSlope = cmds.floatFieldGrp( slopeRangeFieldGrp, query=True, value=True )
+    if minSlope > 0 or maxSlope < 90:
+        filters.append( { 'type': 'slope', 'minAngle': minSlope, 'maxAngle': maxSlope } )
+    if cmds.checkBoxGrp( heightFilterCheckBox, query=True, value1=True ):
+        minHeight, maxHeight = cmds.floatFieldGrp( heightRangeFieldGrp, query=True, value=True )
+        filters.append( { 'type': 'height', 'minHeight': minHeight, 'maxHeight': maxHeight } )
+    
     # Get input field values from UI
-    resolution = cmds.intFieldGrp( resolutionField, query=True, value1=True )
-    probability = cmds.floatSliderGrp( probabilityField, query=True, value=True )
-    useSurfaceOrientation = cmds.checkBoxGrp( surfaceOrientationCheckBox, query=True, value1=True )
-    locatorColor = cmds.intFieldGrp( locatorColorFieldGrp, query=True, value=True )
-    rotationMin = -cmds.intSliderGrp( randomRotMinSliderGrp, query=True, value=True )
-    rotationMax = cmds.intSliderGrp( randomRotMaxSliderGrp, query=True, value=True )
-    minScale = cmds.floatFieldGrp( minScaleFieldGrp, query=True, value1=True )
-    maxScale = cmds.floatFieldGrp( maxScaleFieldGrp, query=True, value1=True )
-    scatterGroupName = cmds.textFieldGrp( locatorGroupNameFieldGrp, query=True, text=True )
-    samplingMethod = cmds.optionMenu( samplerOptionMenu, query=True, value=True )
-    discRadius = cmds.floatFieldGrp( discRadiusField, query=True, value1=True )
-    
-    # Extract selected meshes and face ids
-    meshDict = {}
-    for s in selected:
-        meshInfo = s.split(".")
-        faceIds = []
-        if len(meshInfo) == 2:
-            faceIdsStr = meshInfo[1][2:len(meshInfo[1])-1]
-            numbers = [int(word) for word in faceIdsStr.split(":")]
-            
-            if len(numbers) > 1:
-                for i in range(numbers[0], numbers[1] + 1):
-                    faceIds.append(i)
-            else:
-                faceIds.append(numbers[0])
-        
-        # If mesh name is no already in dictionary, add it with an empty list of face ids
-        if meshInfo[0] not in meshDict:
-            meshDict[meshInfo[0]] = []
-            for id in faceIds:
-                meshDict[meshInfo[0]].append(id)
-                    
-        else:
-            for id in faceIds:
-                meshDict[meshInfo[0]].append(id)
-   
-    # Get FnMesh of selected object to check ray imtersection
-    fnMeshes = []
-    for key in meshDict:
-        fnMeshes.append((getFnMesh(key), meshDict[key]))
+    try:
+        settings = ScatterSettings(
+            resolution = cmds.intFieldGrp( resolutionField, query=True, value1=True ),
+            probability = cmds.floatSliderGrp( probabilityField, query=True, value=True ),
+            surfaceOrientation = cmds.checkBoxGrp( surfaceOrientationCheckBox, query=True, value1=True ),
+            smoothNormals = cmds.checkBoxGrp( surfaceOrientationCheckBox, query=True, value2=True ),
+            color = cmds.intFieldGrp( locatorColorFieldGrp, query=True, value=True ),
+            rotationRange = [ -cmds.intSliderGrp( randomRotMinSliderGrp, query=True, value=True ),
+                              cmds.intSliderGrp( randomRotMaxSliderGrp, query=True, value=True ) ],
+            scaleRange = [ cmds.floatFieldGrp( minScaleFieldGrp, query=True, value1=True ),
+                           cmds.floatFieldGrp( maxScaleFieldGrp, query=True, value1=True ) ],
+            groupName = cmds.textFieldGrp( locatorGroupNameFieldGrp, query=True, text=True ),
+            sampler = cmds.optionMenu( samplerOptionMenu, query=True, value=True ),
+            discRadius = cmds.floatFieldGrp( discRadiusField, query=True, value1=True ),
+            maxDiscRadius = cmds.floatFieldGrp( maxDiscRadiusField, query=True, value1=True ),
+            densityMap = cmds.textFieldButtonGrp( densityMapFieldGrp, query=True, text=True ),
+            classRadii = parseClassRadii( cmds.textFieldGrp( classRadiiFieldGrp, query=True, text=True ) ),
+            raycast = cmds.optionMenu( raycastOptionMenu, query=True, value=True ),
+            output = cmds.optionMenu( outputOptionMenu, query=True, value=True ),
+            seed = cmds.intFieldGrp( seedFieldGrp, query=True, value1=True ),
+            filters = filters,
+            chunkSize = cmds.intFieldGrp( chunkSizeFieldGrp, query=True, value1=True ) )
+    except ValueError as error:
+        print(error)
+        return None
+    return settings
+
+def loadScatterDensity( settings ):
+    """ Returns the density of the variable radius sampler from the procedural density function, the density map or
+        a constant density, and a key of the density for the result cache.
+        Params
+        ===
+            settings: A ScatterSettings
+            return: A tuple (density function or 2D array, key), (None, None) for the other samplers. The key of a
+                    procedural density is None as well: its result depends on the code and the state the function
+                    refers to, which its name does not capture.
+    """
+    if settings.sampler != 'Variable Poisson-Disc':
+        return None, None
+    if densityFunction is not None:
+        return densityFunction, None
+    elif len(settings.densityMap) > 0:
+        density = loadDensityImage( settings.densityMap )
+        return density, hashlib.sha1( density.tobytes() ).hexdigest()
+    return np.ones((1, 1)), 'constant'
+
+def createScatterParameters( settings, fnMeshes, bbox ):
+    """ Returns the parameters stored with the point table of a scatter, for updates and for the scatter cache.
+        Params
+        ===
+            settings: A ScatterSettings
+            fnMeshes: A list of CompiledMesh of the scattered meshes
+            bbox: Merged bounding box of the meshes
+            return: A dictionary
+    """
+    return { 'meshes': [ mesh.name for mesh in fnMeshes ], 'faceIds': [ mesh.faceIds.tolist() for mesh in fnMeshes ],
+             'sampler': settings.sampler, 'discRadius': settings.discRadius, 'maxDiscRadius': settings.maxDiscRadius,
+             'densityMap': settings.densityMap, 'classRadii': settings.classRadii, 'resolution': settings.resolution,
+             'probability': settings.probability, 'seed': settings.seed, 'raycast': settings.raycast,
+             'surfaceOrientation': settings.surfaceOrientation, 'smoothNormals': settings.smoothNormals,
+             'rotationRange': list(settings.rotationRange), 'scaleRange': list(settings.scaleRange),
+             'footprint': settings.footprint, 'output': settings.output, 'color': list(settings.color),
+             'filters': settings.filters, 'bbox': list(bbox) }
+
+def scatterPoints( selected, settings, reporter=None ):
+    """ Scatters points over the given meshes and writes them to the scene. This is the scatter of the
+        "Generate Scatter" button without the tool window, for scripts and batch jobs.
+        Params
+        ===
+            selected: Names of the meshes or mesh faces to scatter on
+            settings: A ScatterSettings
+            reporter (optional): A ProgressReporter, a new progress window by default
+            return: The name of the created scatter group, or None if the scatter was cancelled
+    """
+    resolution = settings.resolution
+    probability = settings.probability
+    useSmoothNormals = settings.smoothNormals
+    locatorColor = settings.color
+    scatterGroupName = settings.groupName
+    samplingMethod = settings.sampler
+    discRadius = settings.discRadius
+    maxDiscRadius = settings.maxDiscRadius
+    classRadii = settings.classRadii
+    raycastMethod = settings.raycast
+    outputMethod = settings.output
+    seed = settings.seed
+    if reporter is None:
+        reporter = ProgressReporter( 'Generating scatter points..' )
+    
+    # Record the stage times and counters of this scatter if instrumentation is enabled
+    instrumentation.beginRun( 'scatterPoints' )
+    
+    # Parse the selected meshes and face ids once, and prepare them for ray casting
+    with instrumentation.stage('selection'):
+        fnMeshes = compileSelection( selected )
         
     # Get bounding boxes for all selected meshes
-    bboxes = []
-    for i in range(len(selected)):
-        bboxes.append( cmds.exactWorldBoundingBox( selected[i] ) )
+    with instrumentation.stage('boundingBox'):
+        bboxes = []
+        for i in range(len(selected)):
+            bboxes.append( cmds.exactWorldBoundingBox( selected[i] ) )
 
-    # Merge bounding boxes into one box
-    bbox = mergeBoundingBoxes(bboxes)
+        # Merge bounding boxes into one box
+        bbox = mergeBoundingBoxes(bboxes)
     
-    # Select sampling method and generate scatter points
-    samples = []
-    if samplingMethod == 'Poisson-Disc':
-        #Top/bottom
-        samples = hdtPoissonDiscSampling( bbox[0], bbox[3], bbox[2], bbox[5], discRadius )
-
-        #Right/Left
-        #samples = hdtPoissonDiscSampling( bbox[0], bbox[3], bbox[1], bbox[4], discRadius )
+    # Copy the geometry of the selected meshes once, for ray casting and for the result cache key
+    with instrumentation.stage('meshCache'):
+        geometryCaches = [ MeshGeometryCache(mesh.fnMesh) for mesh in fnMeshes ]
+        snapshots = [ geometryCaches[i].createSnapshot(fnMeshes[i].faceIds) for i in range(len(fnMeshes)) ]
     
-        #Front/Back
-        #samples = hdtPoissonDiscSampling( bbox[1], bbox[4], bbox[3], bbox[5], discRadius )
-    else:
-        samples = basicRandomSampling( bbox[0], bbox[2], bbox[3], bbox[5], resolution, probability )
-   
-    # Create a group for the samples
-    sampleGroup = cmds.group( em=True, name=scatterGroupName )
-
-    for coordinates in samples:
+    # Rasterise the selected faces from above so that no samples are generated where there is no mesh
+    footprint = None
+    if settings.footprint:
+        with instrumentation.stage('footprint'):
+            footprint = rasterizeFootprint( snapshots, bbox[0], bbox[2], bbox[3], bbox[5],
+                                            samplingCellLength( samplingMethod, bbox, discRadius, resolution, classRadii ) )
+    
+    density, densityKey = loadScatterDensity( settings )
+    scatterParameters = createScatterParameters( settings, fnMeshes, bbox )
+    
+    # Stream large scatters chunk by chunk: only the current chunk of samples, hits and transforms is in memory, the
+    # point table goes to an on-disk scatter cache and the scene nodes of each chunk are created right away
+    if settings.chunkSize > 0:
+        rayHeight = bbox[4] + 10.0
+        rayCaster = None
+        if raycastMethod != 'Maya API':
+            with instrumentation.stage('bvhBuild'):
+                rayCaster = RayCaster( snapshots )
         
-        """
-        #Top
-        rayOrigin = om.MFloatPoint(coordinates[0], bbox[4] + 10.0, coordinates[1], 1.0)
-        #Bottom
-        #rayOrigin = om.MFloatPoint(coordinates[0], bbox[1] - 10.0, coordinates[1], 1.0)
-
-        #Left
-        #rayOrigin = om.MFloatPoint(coordinates[0], coordinates[1], bbox[5] + 10.0 , 1.0)
-        #Right
-        #rayOrigin = om.MFloatPoint(coordinates[0], coordinates[1], bbox[2] - 10.0 , 1.0)
-
-        #Front
-        #rayOrigin = om.MFloatPoint(bbox[3] + 10.0 ,coordinates[0], coordinates[1], 1.0)
-        #Back
-        #rayOrigin = om.MFloatPoint(bbox[0] - 10.0 ,coordinates[0], coordinates[1], 1.0)
-
-        # Cast ray in negative y-direction
-        #Top
-        rayDirection = om.MFloatVector(0, -1, 0)
-        #Bottom
-        #rayDirection = om.MFloatVector(0, 1, 0)
-        #Right
-        #rayDirection = om.MFloatVector(0, 0, -1)
-        #Left
-        #rayDirection = om.MFloatVector(0, 0, 1)
-        #Front
-        #rayDirection = om.MFloatVector(-1, 0, 0)
-        #Back
-        #rayDirection = om.MFloatVector(1, 0, 0)
-        """
+        castRays = createRayCast( raycastMethod, fnMeshes, geometryCaches, snapshots, rayHeight, useSmoothNormals, rayCaster )
+        cachePath = settings.cachePath if len(settings.cachePath) > 0 else tempfile.mkdtemp( prefix='scatter_cache_' )
+        hitFilters = createHitFilters( settings.filters, bbox, loadDensityImage )
+        rng = np.random.default_rng(seed)
+        outputBackend = createOutputBackend( outputMethod )
+        sampleGroup = None
+        with reporter, ScatterCacheWriter( cachePath, scatterParameters ) as cacheWriter:
+            sampleChunks = iterSampleChunks( iterSamples( samplingMethod, bbox, discRadius, resolution, probability, seed,
+                                                          reporter.update, maxDiscRadius, density, classRadii, footprint ),
+                                             settings.chunkSize )
+            while True:
+                with instrumentation.stage('sampling'):
+                    samples = next( sampleChunks, None )
+                if samples is None:
+                    break
+                instrumentation.count('samples', len(samples))
+                instrumentation.count('chunks')
+                
+                chunk = processSampleChunk( samples, castRays, hitFilters, settings, rng, scatterParameters )
+                with instrumentation.stage('sceneOutput'):
+                    if sampleGroup is None:
+                        sampleGroup = outputBackend.write( scatterGroupName, chunk.positions, chunk.rotations, chunk.scales,
+                                                           locatorColor )
+                    else:
+                        outputBackend.append( sampleGroup, chunk.positions, chunk.rotations, chunk.scales, locatorColor )
+                with instrumentation.stage('cacheWrite'):
+                    cacheWriter.append( chunk )
+                instrumentation.sampleMemory()
+                if reporter.isCancelled():
+                    break
         
-        rayOrigin = om.MFloatPoint(coordinates[0], bbox[4] + 10.0, coordinates[1], 1.0)
+        if raycastMethod == 'Maya API':
+            for mesh in fnMeshes:
+                mesh.release()
         
-        # Cast ray in negative y-direction
-        rayDirection = om.MFloatVector(0, -1, 0)
-
-        # Cast ray and check for intersection with given mesh
-        intersectionFound, intersectionPoint, faceNormal = checkIntersections(fnMeshes, rayOrigin, rayDirection)
+        # Remove the chunks written so far, the scatter is either complete or not in the scene
+        if reporter.isCancelled():
+            if sampleGroup is not None:
+                cmds.delete( sampleGroup )
+            if len(settings.cachePath) == 0:
+                shutil.rmtree( cachePath, ignore_errors=True )
+            print("Scatter cancelled")
+            instrumentation.endRun()
+            return None
         
-        # Move locator to a random position
-        if intersectionFound:
-            # Instantiate a space locator
-            spaceLoc = cmds.spaceLocator()
-            
-            # Set color of the locator
-            shapeName = spaceLoc[0][0:7] + "Shape" + spaceLoc[0][7:]
-            cmds.setAttr( "{}.overrideEnabled".format(shapeName), True )
-            cmds.setAttr( "{}.overrideRGBColors".format(shapeName), True )
-            cmds.setAttr( "{}.overrideColorR".format(shapeName), locatorColor[0] )
-            cmds.setAttr( "{}.overrideColorG".format(shapeName), locatorColor[1] )
-            cmds.setAttr( "{}.overrideColorB".format(shapeName), locatorColor[2] )
-            
-            # Set position
-            cmds.move( intersectionPoint[0], intersectionPoint[1], intersectionPoint[2], spaceLoc )
-            
-            # Adjust orientation based on the face normal
-            if useSurfaceOrientation:
-                xAngleDeg, zAngleDeg = aimY( faceNormal )
-                cmds.setAttr( "{}.rx".format(spaceLoc[0]), xAngleDeg )
-                cmds.setAttr( "{}.rz".format(spaceLoc[0]), zAngleDeg )
+        if sampleGroup is None:
+            with instrumentation.stage('sceneOutput'):
+                sampleGroup = outputBackend.write( scatterGroupName, np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0), locatorColor )
+        
+        # The table of the scatter reads the points from the memory mapped cache
+        registerTable( sampleGroup, loadTable( cachePath, owned=len(settings.cachePath) == 0 ) )
+        groupSnapshots[sampleGroup] = snapshots
+        
+        instrumentation.endRun()
+        return sampleGroup
+    
+    # Reuse the hits of an identical earlier request
+    samplerParams = { 'bbox': list(bbox), 'discRadius': discRadius, 'resolution': resolution, 'probability': probability,
+                      'maxDiscRadius': maxDiscRadius, 'density': densityKey, 'classRadii': classRadii,
+                      'raycast': raycastMethod, 'smoothNormals': useSmoothNormals, 'footprint': settings.footprint }
+    # Scatters with a procedural density are never cached, their density has no key
+    resultKey = None
+    cachedResult = None
+    if samplingMethod != 'Variable Poisson-Disc' or densityKey is not None:
+        with instrumentation.stage('resultCache'):
+            resultKey = createResultKey( snapshots, samplingMethod, samplerParams, seed )
+            cachedResult = resultCache.get( resultKey )
+    
+    # One seeded generator draws the filter decisions and then the random rotations and scales of each batch
+    rng = np.random.default_rng(seed)
+    hitFilters = createHitFilters( settings.filters, bbox, loadDensityImage )
+    chunks = []
+    if cachedResult is not None:
+        # The cache keeps the unfiltered hits and the end of each batch of samples, so changing a filter does not cast
+        # the rays again and the batches get the same random draws as without the cache
+        instrumentation.count('resultCacheHits')
+        cachedHits, batchEnds = cachedResult[:5], cachedResult[5]
+        for start, end in zip( [0] + batchEnds[:-1].tolist(), batchEnds.tolist() ):
+            chunks.append( processHits( tuple( column[start:end] for column in cachedHits ), hitFilters, settings, rng,
+                                        scatterParameters ) )
+    else:
+        # Cast rays from above the bounding box and check for intersections with the selected meshes.
+        # Rays are cast for each batch of samples as soon as the sampler yields it, so that the samples
+        # are never kept in memory all at once.
+        rayHeight = bbox[4] + 10.0
+        rayCaster = None
+        if raycastMethod != 'Maya API':
+            with instrumentation.stage('bvhBuild'):
+                rayCaster = RayCaster( snapshots )
+        castRays = createRayCast( raycastMethod, fnMeshes, geometryCaches, snapshots, rayHeight, useSmoothNormals, rayCaster )
+        
+        hitBatches = []
+        with reporter:
+            sampleBatches = iterSamples( samplingMethod, bbox, discRadius, resolution, probability, seed, reporter.update,
+                                         maxDiscRadius, density, classRadii, footprint )
+            while True:
+                # Time the sampler separately from the ray casts of each batch
+                with instrumentation.stage('sampling'):
+                    samples = next( sampleBatches, None )
+                if samples is None:
+                    break
+                instrumentation.count('samples', len(samples))
                 
-            if (rotationMax - rotationMin) > 0:
-                cmds.setAttr( "{}.ry".format(spaceLoc[0]), random.uniform( rotationMax, rotationMin ) )
-            
-            
-            scaling = 1.0
-            if (minScale >= maxScale):
-                scaling = minScale
-            else:
-                scaling = random.uniform( maxScale, minScale )
-            
-            cmds.setAttr( "{}.sx".format(spaceLoc[0]), scaling )
-            cmds.setAttr( "{}.sy".format(spaceLoc[0]), scaling )
-            cmds.setAttr( "{}.sz".format(spaceLoc[0]), scaling )
+                chunks.append( processSampleChunk( samples, castRays, hitFilters, settings, rng, scatterParameters,
+                                                   unfilteredHits=hitBatches ) )
+                if reporter.isCancelled():
+                    break
+        
+        # Free the intersection acceleration grids built by the Maya API ray casts
+        if raycastMethod == 'Maya API':
+            for mesh in fnMeshes:
+                mesh.release()
+        
+        if reporter.isCancelled():
+            print("Scatter cancelled")
+            instrumentation.endRun()
+            return None
+        
+        if resultKey is not None:
+            batchEnds = np.cumsum([ len(hits[0]) for hits in hitBatches ], dtype=np.int64)
+            resultCache.put( resultKey, concatenateHits( hitBatches ) + (batchEnds,) )
+    table = concatenateTables( chunks, scatterParameters )
+    
+    # Write all scatter points to the scene with the selected output backend
+    with instrumentation.stage('sceneOutput'):
+        outputBackend = createOutputBackend( outputMethod )
+        sampleGroup = outputBackend.write( scatterGroupName, table.positions, table.rotations, table.scales, locatorColor )
+    
+    # Keep the transforms in memory so that createModels does not have to read them back from the scene
+    registerTable( sampleGroup, table )
+    groupSnapshots[sampleGroup] = snapshots
+    
+    instrumentation.endRun()
+    return sampleGroup
+        
+def updateScatterRegion( locatorGroupNameFieldGrp, *pArgs ):
+    groupName = cmds.textFieldGrp( locatorGroupNameFieldGrp, query=True, text=True )
+    if not cmds.objExists( groupName ):
+        print("Group not found")
+        return
+    
+    rescatterRegion( groupName )
+
+def rescatterRegion( groupName, region=None, reporter=None ):
+    """ Updates a scatter after local edits of its meshes without scattering it again: the points in the edited
+        region and in a border of one disc radius around it are removed, the region is sampled again around the
+        remaining points with the same minimum distances, and rays are cast for the new samples only.
+        Only the scene nodes of the removed and new points are changed.
+        Params
+        ===
+            groupName: Name of a scatter group created in this session
+            region (optional): Rectangle (xMin, zMin, xMax, zMax) of the edits in the xz-plane, found by comparing the
+                               meshes with their snapshots from the scatter if None
+            reporter (optional): A ProgressReporter, a new progress window by default
+            return: A tuple (number of removed points, number of new points), or None if nothing was updated
+    """
+    table = findTable( groupName )
+    if table is None or 'meshes' not in table.params:
+        print("No scatter of this session found for {}".format(groupName))
+        return None
+    
+    settings = ScatterSettings( **dict( (name, value) for name, value in table.params.items() if name in ScatterSettings.defaults ) )
+    if settings.sampler not in ('Poisson-Disc', 'Parallel Poisson-Disc', 'Bridson Poisson-Disc', 'Multi-Class Poisson-Disc'):
+        print("Regions of a {} scatter can not be updated, generate the scatter again".format(settings.sampler))
+        return None
+    
+    instrumentation.beginRun( 'rescatterRegion' )
+    
+    # Copy the current geometry of the scattered meshes
+    with instrumentation.stage('meshCache'):
+        fnMeshes = compileMeshNames( table.params['meshes'], table.params['faceIds'] )
+        geometryCaches = [ MeshGeometryCache(mesh.fnMesh) for mesh in fnMeshes ]
+        snapshots = [ geometryCaches[i].createSnapshot(fnMeshes[i].faceIds) for i in range(len(fnMeshes)) ]
+    
+    # Compare the meshes with the snapshots taken when they were scattered
+    if region is None:
+        try:
+            region = changedRegion( groupSnapshots.get(groupName, ()), snapshots )
+        except ValueError as error:
+            print("{}, generate the scatter again".format(error))
+            instrumentation.endRun()
+            return None
+        if region is None:
+            print("No mesh changes found")
+            instrumentation.endRun()
+            return None
+    
+    # Multi-class scatters keep the class of each point, other scatters have a single class
+    if settings.sampler == 'Multi-Class Poisson-Disc':
+        radii = settings.classRadii
+        classLabels = np.maximum( table.labels, 0 )
+    else:
+        radii = [ settings.discRadius ]
+        classLabels = np.zeros( len(table), dtype=np.int64 )
+    crossDistances = createCrossDistances( radii )
+    
+    # Remove the points of the region and its border, the remaining points constrain the new samples
+    region = expandRegion( region, max(radii) )
+    removed = pointsInRegion( table.positions[:, [0, 2]], region )
+    removedIndices = np.nonzero(removed)[0]
+    kept = ~removed
+    instrumentation.count('pointsRemoved', len(removedIndices))
+    
+    bbox = mergeBoundingBoxes( [ cmds.exactWorldBoundingBox( name ) for name in table.params['meshes'] ] )
+    with instrumentation.stage('footprint'):
+        footprint = None
+        if settings.footprint:
+            footprint = rasterizeFootprint( snapshots, region[0], region[1], region[2], region[3],
+                                            samplingCellLength( settings.sampler, bbox, settings.discRadius,
+                                                                settings.resolution, radii ) )
+    
+    if reporter is None:
+        reporter = ProgressReporter( 'Updating scatter points..' )
+    
+    rayHeight = bbox[4] + 10.0
+    rayCaster = None
+    if settings.raycast != 'Maya API':
+        with instrumentation.stage('bvhBuild'):
+            rayCaster = RayCaster( snapshots )
+    
+    castRays = createRayCast( settings.raycast, fnMeshes, geometryCaches, snapshots, rayHeight, settings.smoothNormals, rayCaster )
+    hitFilters = createHitFilters( settings.filters, table.params.get('bbox', bbox), loadDensityImage )
+    
+    # Sample the region with its own seed, so that updating the same region again gives the same points
+    regionSeed = '{}:{}'.format(settings.seed, region)
+    rng = np.random.default_rng( zlib.crc32(regionSeed.encode()) )
+    chunks = []
+    with reporter:
+        sampleBatches = iterRegionSamples( region, radii, crossDistances, table.positions[kept][:, [0, 2]], classLabels[kept],
+                                           regionSeed, reporter.update, footprint )
+        while True:
+            with instrumentation.stage('sampling'):
+                samples = next( sampleBatches, None )
+            if samples is None:
+                break
+            instrumentation.count('samples', len(samples))
             
-            cmds.parent( spaceLoc, sampleGroup )
+            chunks.append( processSampleChunk( samples, castRays, hitFilters, settings, rng,
+                                               keepLabels=settings.sampler == 'Multi-Class Poisson-Disc' ) )
+            if reporter.isCancelled():
+                break
     
-    # Clear selection
-    cmds.select( cl=True )
+    if settings.raycast == 'Maya API':
+        for mesh in fnMeshes:
+            mesh.release()
+    
+    if reporter.isCancelled():
+        print("Update cancelled")
+        instrumentation.endRun()
+        return None
+    
+    # The kept points stay in their order, followed by the new points
+    newPoints = concatenateTables( chunks )
+    keptPoints = ScatterPointTable( table.positions[kept], table.rotations[kept], table.scales[kept], table.normals[kept],
+                                    table.meshIds[kept], table.faceIds[kept], labels=table.labels[kept] )
+    updatedTable = concatenateTables( [ keptPoints, newPoints ], table.params )
+    
+    # Change only the nodes of the removed and new points
+    with instrumentation.stage('sceneOutput'):
+        outputBackend = createOutputBackend( settings.output )
+        outputBackend.update( groupName, removedIndices.tolist(), updatedTable, len(newPoints), settings.color )
+    
+    registerTable( groupName, updatedTable )
+    groupSnapshots[groupName] = snapshots
+    print("Updated {}: removed {} and added {} scatter points".format(groupName, len(removedIndices), len(newPoints)))
+    
+    instrumentation.endRun()
+    return len(removedIndices), len(newPoints)
         
-def createModels( scatterGroupNameFieldGrp, *pArgs ):
+def saveScatterCache( locatorGroupNameFieldGrp, cachePathFieldGrp, *pArgs ):
+    groupName = cmds.textFieldGrp( locatorGroupNameFieldGrp, query=True, text=True )
+    cachePath = cmds.textFieldButtonGrp( cachePathFieldGrp, query=True, text=True )
+    if len(cachePath) == 0:
+        print("No cache directory given")
+        return
+    
+    table = None
+    if cmds.objExists( groupName ):
+        table = findTable( groupName )
+        if table is None:
+            table = readScatterTable( groupName )
+    
+    if table is None:
+        print("Group not found")
+        return
+    
+    saveTable( table, cachePath )
+    print("Saved {} scatter points to {}".format(len(table), cachePath))
+
+def loadScatterCache( cachePathFieldGrp, locatorGroupNameFieldGrp, outputOptionMenu, locatorColorFieldGrp, *pArgs ):
+    cachePath = cmds.textFieldButtonGrp( cachePathFieldGrp, query=True, text=True )
+    scatterGroupName = cmds.textFieldGrp( locatorGroupNameFieldGrp, query=True, text=True )
+    outputMethod = cmds.optionMenu( outputOptionMenu, query=True, value=True )
+    locatorColor = cmds.intFieldGrp( locatorColorFieldGrp, query=True, value=True )
+    
+    table = loadTable( cachePath )
+    outputBackend = createOutputBackend( outputMethod )
+    sampleGroup = outputBackend.write( scatterGroupName, table.positions, table.rotations, table.scales, locatorColor )
+    registerTable( sampleGroup, table )
+
+def createModels( scatterGroupNameFieldGrp, cachePathFieldGrp, *pArgs ):
     # Check if a mesh is selected
     selected = cmds.ls( sl=True )
     numModels = len(selected)
@@ -354,39 +965,69 @@ def createModels( scatterGroupNameFieldGrp, *pArgs ):
     if len(groupName) == 0:
         print("Group name not found")
         return
+    
+    cachePath = cmds.textFieldButtonGrp( cachePathFieldGrp, query=True, text=True )
+    instanceModels( selected, groupName, cachePath )
+    
+    # Clear selection
+    cmds.select( cl=True )
+
+def instanceModels( selected, groupName, cachePath='' ):
+    """ Replaces the points of a scatter group with instances of the given models, this is the
+        "Add Models" button without the tool window. The instances are drawn by particle instancers in a
+        group named after the scatter group with an "Instances" suffix.
+        Params
+        ===
+            selected: Names of the models
+            groupName: Name of the scatter group
+            cachePath (optional): Scatter cache to read the points from if the group is not in the scene
+            return: The number of created instances, or None if the scatter group was not found
+    """
+    numModels = len(selected)
+    instrumentation.beginRun( 'instanceModels' )
 
-    # Get all space locators from the given group name 
-    locators = cmds.ls( groupName, dag=1, type="transform" )
+    # Get the scatter point transforms from memory or read them from the scene
+    with instrumentation.stage('read'):
+        table = None
+        groupExists = cmds.objExists( groupName )
+        if groupExists:
+            table = findTable( groupName )
+            if table is None:
+                table = readScatterTable( groupName )
+        
+        # Otherwise stream them from the memory mapped scatter cache
+        if table is None and len(cachePath) > 0:
+            table = loadTable( cachePath )
     
-    if len(locators) < 2:
+    if table is None:
         print("Group not found")
-        return
+        instrumentation.endRun()
+        return None
     
-    for i in range( 1, len(locators) - 1 ):
-        # Create new object
-        if numModels == 1:
-            newObject = cmds.instance( selected )
-        else:
-            # Randomly select model    
-            index = random.randint(0, numModels-1)
-            newObject = cmds.instance( selected[index] )
-
-        # Get position and rotation of current locator
-        position = cmds.xform( locators[i], q=True, ws=True, t=True )
-        rotation = cmds.xform( locators[i], q=True, ws=True, ro=True )
-        scaling = cmds.xform( locators[i], q=True, ws=True, s=True )
-        orignalScaling = cmds.xform( newObject, q=True, ws=True, s=True )
-        
-        cmds.move( position[0], position[1], position[2], newObject, a=True )
-        cmds.rotate( rotation[0], rotation[1], rotation[2], newObject )
-        cmds.scale( orignalScaling[0] * scaling[0], orignalScaling[1] * scaling[0], orignalScaling[2] * scaling[0], newObject)
-
-        # Remove locator
-        cmds.delete( locators[i] )
+    # Read the original scaling once per model
+    originalScalings = np.array([ cmds.xform( model, q=True, ws=True, s=True ) for model in selected ], dtype=np.float64)
     
-    # Remove group   
-    cmds.delete( locators[0] ) 
+    # The instances of each chunk are created by one particle instancer, fed with the columns of the table
+    instancer = ModelInstancer( selected, cmds )
+    instancer.create( groupName + "Instances" )
+    for chunk in iterTableChunks( table ):
+        with instrumentation.stage('instances'):
+            # Points from multi-class sampling use the model at the position of their class in the selection,
+            # other points use a randomly selected model
+            labels = np.asarray(chunk.labels, dtype=np.int64)
+            modelIndices = labels % numModels
+            unlabeled = np.nonzero( labels < 0 )[0]
+            modelIndices[unlabeled] = [ random.randint(0, numModels-1) for _ in range(len(unlabeled)) ]
+            
+            scalings = originalScalings[modelIndices] * np.asarray(chunk.scales, dtype=np.float64)[:, None]
+            instancer.addInstances( chunk.positions, chunk.rotations, scalings, modelIndices )
+        instrumentation.count('instances', len(chunk))
     
-    # Clear selection
-    cmds.select( cl=True )
-	
\ No newline at end of file
+    # Remove scatter group
+    if groupExists:
+        cmds.delete( groupName )
+        removeTable( groupName )
+        groupSnapshots.pop( groupName, None )
+    
+    instrumentation.endRun()
+    return len(table)
@@ -0,0 +1,385 @@
+import maya.cmds as cmds
+try:
+    import maya.OpenMayaUI as omui
+except ImportError:
+    # The brush can be driven without a viewport, only the cursor picking needs OpenMayaUI
+    omui = None
+import maya.OpenMaya as om
+
+import math
+import random
+import time
+from array import array
+
+import numpy as np
+
+from footprint import FootprintMask
+from hdt import iterHdtSampleSquare
+from raycast import RayCaster
+from mesh_cache import MeshGeometryCache
+from selection import compileMeshNames
+from scatter_settings import ScatterSettings
+from scene_output import createOutputBackend
+from hit_filters import createHitFilters, filterHits
+from variable_radius import loadDensityImage
+from point_table import ScatterPointTable, registerTable, findTable
+from scatter import castRaysBvh, computeTransforms, mergeBoundingBoxes
+import instrumentation
+
+class PointIndex(object):
+    """ Spatial index of the scatter points of a brush session, which supports inserting and removing points and
+        finding the points around a location. Points keep their id while others are removed.
+        The points of the scatter are sorted by grid cell once, so that a session on a large scatter starts
+        quickly, points inserted later go into a sparse grid.
+        Params
+        ===
+            points: (N, 2) array with the (x, z) coordinates of the existing points, their ids are 0 to N-1
+            cellLength: Side length of the grid cells, the disc radius of the scatter
+    """
+    def __init__(self, points, cellLength):
+        self.cellLength = cellLength
+        self.cellLengthInvert = 1.0 / cellLength
+
+        # Existing points sorted by the key col * 2^32 + row of their cell
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.numSorted = len(points)
+        self.xSorted = np.ascontiguousarray(points[:, 0])
+        self.zSorted = np.ascontiguousarray(points[:, 1])
+        keys = self.cellKeys(points)
+        self.sortedIds = np.argsort(keys, kind='stable')
+        self.sortedKeys = keys[self.sortedIds]
+        self.removed = np.zeros(self.numSorted, dtype=bool)
+
+        # Inserted points
+        self.cells = {}
+        self.xValues = array('d')
+        self.zValues = array('d')
+
+    def __len__(self):
+        return self.numSorted + len(self.xValues)
+
+    def cellKeys(self, points):
+        cells = np.floor(points * self.cellLengthInvert).astype(np.int64)
+        return cells[:, 0] * 4294967296 + cells[:, 1]
+
+    def insert(self, x, z):
+        """ Adds a point and returns its id. """
+        pointId = self.numSorted + len(self.xValues)
+        self.xValues.append(x)
+        self.zValues.append(z)
+        key = ( int(math.floor(x * self.cellLengthInvert)), int(math.floor(z * self.cellLengthInvert)) )
+        if key in self.cells:
+            self.cells[key].append(pointId)
+        else:
+            self.cells[key] = [pointId]
+        return pointId
+
+    def remove(self, pointId):
+        if pointId < self.numSorted:
+            self.removed[pointId] = True
+            return
+        x = self.xValues[pointId - self.numSorted]
+        z = self.zValues[pointId - self.numSorted]
+        key = ( int(math.floor(x * self.cellLengthInvert)), int(math.floor(z * self.cellLengthInvert)) )
+        cell = self.cells[key]
+        cell.remove(pointId)
+        if len(cell) == 0:
+            del self.cells[key]
+
+    def point(self, pointId):
+        if pointId < self.numSorted:
+            return float(self.xSorted[pointId]), float(self.zSorted[pointId])
+        return self.xValues[pointId - self.numSorted], self.zValues[pointId - self.numSorted]
+
+    def query(self, x, z, radius):
+        """ Returns the ids of all points within the given distance of a location. """
+        col = int(math.floor(x * self.cellLengthInvert))
+        row = int(math.floor(z * self.cellLengthInvert))
+        span = int(math.ceil(radius * self.cellLengthInvert))
+        radiusSquared = radius * radius
+
+        # One key range per column of cells around the location
+        columnKeys = np.arange(col - span, col + span + 1, dtype=np.int64) * 4294967296
+        starts = np.searchsorted( self.sortedKeys, columnKeys + (row - span), 'left' )
+        ends = np.searchsorted( self.sortedKeys, columnKeys + (row + span), 'right' )
+        counts = ends - starts
+        positions = np.arange(counts.sum()) - np.repeat( np.cumsum(counts) - counts - starts, counts )
+        candidates = self.sortedIds[positions]
+        candidates = candidates[ ~self.removed[candidates] ]
+        distancesSquared = (self.xSorted[candidates] - x) ** 2 + (self.zSorted[candidates] - z) ** 2
+        result = candidates[ distancesSquared <= radiusSquared ].tolist()
+
+        xValues = self.xValues
+        zValues = self.zValues
+        cells = self.cells
+        offset = self.numSorted
+        for i in range(col - span, col + span + 1):
+            for j in range(row - span, row + span + 1):
+                cell = cells.get((i, j))
+                if cell is None:
+                    continue
+                for pointId in cell:
+                    dX = xValues[pointId - offset] - x
+                    dZ = zValues[pointId - offset] - z
+                    if dX * dX + dZ * dZ <= radiusSquared:
+                        result.append(pointId)
+        return result
+
+def createDiscMask(radius, cellLength):
+    """ Rasterises a disc around the origin into a (N, N) boolean array of cells with the given side length. """
+    numCells = max( int(math.ceil(2.0 * radius / cellLength)), 1 )
+    centers = (np.arange(numCells) + 0.5) * cellLength - radius
+    return centers[None, :] ** 2 + centers[:, None] ** 2 <= radius * radius
+
+class ScatterBrush(object):
+    """ Adds and removes the points of an existing scatter group under a brush, fast enough to be called for
+        every drag event of the mouse. The points are kept in a PointIndex for the whole session, new points
+        are found with Hierarchical Dart Throwing inside the brush around the existing points, so the disc
+        radius of the scatter holds, and rays are cast against BVHs which are built once.
+        The points painted during a stroke are shown by one preview particle node, which is replaced at most once
+        per event (flush), and the removed locators are deleted with one call per event. The nodes of the painted
+        points and the point table of the group are created at the end of each stroke (endStroke).
+        Params
+        ===
+            groupName: Name of a scatter group created in this session
+            brushRadius (optional): Radius of the brush in world units
+            frameBudget (optional): Seconds of dart throwing per paint call, to keep the viewport interactive
+            seed (optional): Seed of the random generator of the darts
+    """
+    def __init__(self, groupName, brushRadius = 10.0, frameBudget = 0.008, seed = None):
+        table = findTable( groupName )
+        if table is None or 'meshes' not in table.params:
+            raise ValueError("No scatter of this session found for {}".format(groupName))
+
+        self.groupName = groupName
+        self.brushRadius = brushRadius
+        self.frameBudget = frameBudget
+        self.settings = ScatterSettings( **dict( (name, value) for name, value in table.params.items()
+                                                 if name in ScatterSettings.defaults ) )
+        if self.settings.sampler == 'Multi-Class Poisson-Disc':
+            raise ValueError("The brush only paints scatters with a single disc radius")
+        self.discRadius = self.settings.discRadius
+        self.params = table.params
+        self.rng = random.Random(seed)
+
+        # Geometry of the scattered meshes for the ray casts
+        fnMeshes = compileMeshNames( table.params['meshes'], table.params['faceIds'] )
+        self.snapshots = [ MeshGeometryCache(mesh.fnMesh).createSnapshot(mesh.faceIds) for mesh in fnMeshes ]
+        self.rayCaster = RayCaster( self.snapshots )
+        bbox = mergeBoundingBoxes( [ cmds.exactWorldBoundingBox( name ) for name in table.params['meshes'] ] )
+        self.rayHeight = bbox[4] + 10.0
+        self.hitFilters = createHitFilters( self.settings.filters, table.params.get('bbox', bbox), loadDensityImage )
+        self.filterRng = np.random.default_rng(seed)
+
+        # Columns of all points of the session, removed points stay in them and are masked out by alive
+        self.columns = [ (table.positions, table.rotations, table.scales, table.normals, table.meshIds, table.faceIds,
+                          table.labels) ]
+        self.alive = np.ones( len(table), dtype=bool )
+        self.aliveAdded = []
+        self.index = PointIndex( table.positions[:, [0, 2]], self.discRadius )
+
+        # Names of the locators of the points by point id, None for points erased in the stroke they were painted in
+        self.outputBackend = createOutputBackend( self.settings.output )
+        self.nodeNames = None
+        if self.settings.output == 'Locators':
+            self.nodeNames = cmds.listRelatives( groupName, children=True, type='transform', fullPath=True ) or []
+        self.previewBackend = createOutputBackend( 'Particles' )
+        self.previewGroup = None
+        self.previewChanged = False
+        self.pendingRemoved = []
+        self.strokeChanged = False
+        self.setBrushRadius( brushRadius )
+
+    def setBrushRadius(self, brushRadius):
+        self.brushRadius = brushRadius
+        self.maskCellLength = self.discRadius * 0.25
+        self.discMask = createDiscMask( brushRadius, self.maskCellLength )
+
+    def paint(self, x, z):
+        """ Fills the brush at the given location with new points.
+            Params
+            ===
+                x: X-coordinate of the brush center
+                z: Z-coordinate of the brush center
+                return: The number of new points
+        """
+        # Samples can lie up to a mask cell diagonal outside of the brush, points within the disc radius of them are constraints
+        radius = self.brushRadius
+        constraintRadius = radius + self.discRadius + 2.0 * self.maskCellLength
+        constraintPoints = [ self.index.point(pointId) for pointId in self.index.query(x, z, constraintRadius) ]
+
+        # Throw darts until the brush is covered or the frame budget is spent, the next event continues the fill
+        deadline = time.perf_counter() + self.frameBudget
+        footprint = FootprintMask( x - radius, z - radius, self.maskCellLength, self.discMask )
+        samples = []
+        for batch in iterHdtSampleSquare( x - radius, z - radius, 2.0 * radius, self.discRadius, self.rng, constraintPoints,
+                                          progress=lambda fraction: time.perf_counter() > deadline, footprint=footprint,
+                                          progressInterval=16 ):
+            samples.extend(batch)
+        instrumentation.count('brushSamples', len(samples))
+        if len(samples) == 0:
+            return 0
+
+        positions, normals, meshIndices, faceIds = filterHits( self.hitFilters,
+                                                               castRaysBvh( self.snapshots, samples, self.rayHeight,
+                                                                            self.settings.smoothNormals, self.rayCaster ),
+                                                               self.filterRng )
+        rotations, scales = computeTransforms( normals, self.settings, self.filterRng )
+        for hitX, hitZ in positions[:, [0, 2]].tolist():
+            self.index.insert(hitX, hitZ)
+        self.columns.append( (positions, rotations, scales, normals, meshIndices, faceIds,
+                              np.full(len(positions), -1, dtype=np.int64)) )
+        self.aliveAdded.extend( [True] * len(positions) )
+        self.previewChanged = True
+        self.strokeChanged = True
+        return len(positions)
+
+    def erase(self, x, z):
+        """ Removes the points under the brush at the given location and returns their number. """
+        pointIds = self.index.query(x, z, self.brushRadius)
+        numOriginal = len(self.alive)
+        for pointId in pointIds:
+            self.index.remove(pointId)
+            if pointId < numOriginal:
+                self.alive[pointId] = False
+                self.pendingRemoved.append(pointId)
+            else:
+                self.aliveAdded[pointId - numOriginal] = False
+                self.previewChanged = True
+        self.strokeChanged = self.strokeChanged or len(pointIds) > 0
+        return len(pointIds)
+
+    def flush(self):
+        """ Writes the changes since the last flush to the scene: one delete call for the locators of the removed
+            points and one rebuild of the preview of the painted points. The number of scene calls does not depend
+            on the number of points. The particle node of a particle scatter is rebuilt at the end of the stroke.
+        """
+        if self.nodeNames is not None:
+            self.outputBackend.deleteLocators( [ self.nodeNames[pointId] for pointId in self.pendingRemoved ] )
+        self.pendingRemoved = []
+        if self.previewChanged:
+            self.updatePreview()
+            self.previewChanged = False
+
+    def strokePoints(self):
+        """ Returns the columns of the points painted in this stroke which have not been erased again. """
+        if len(self.columns) == 1:
+            return [ column[:0] for column in self.columns[0] ]
+        kept = np.array(self.aliveAdded, dtype=bool)
+        return [ np.concatenate([ chunk[i] for chunk in self.columns[1:] ])[kept] for i in range(7) ]
+
+    def updatePreview(self):
+        # The preview group lies outside of the scatter group, so that it is never read back as scatter points
+        if self.previewGroup is not None:
+            cmds.delete( self.previewGroup )
+            self.previewGroup = None
+        positions, rotations, scales = self.strokePoints()[:3]
+        if len(positions) > 0:
+            self.previewGroup = self.previewBackend.write( self.groupName.split('|')[-1] + 'BrushPreview', positions,
+                                                           rotations, scales, self.settings.color )
+
+    def endStroke(self):
+        """ Writes the remaining scene changes, creates the nodes of the points painted in the stroke and registers
+            the updated point table of the group.
+            return: The updated ScatterPointTable
+        """
+        self.flush()
+        strokePoints = self.strokePoints()
+        if self.previewGroup is not None:
+            cmds.delete( self.previewGroup )
+            self.previewGroup = None
+
+        # The locators of the painted points are created together, in the order of the table
+        if self.nodeNames is not None:
+            names = self.outputBackend.addLocators( self.groupName, strokePoints[0], strokePoints[1], strokePoints[2],
+                                                    self.settings.color )
+            newNames = [None] * len(self.aliveAdded)
+            for index, name in zip( np.nonzero(self.aliveAdded)[0].tolist(), names ):
+                newNames[index] = name
+            self.nodeNames.extend(newNames)
+
+        # Merge the columns of the stroke so the next stroke starts from one array per column
+        columns = [ np.concatenate([ chunk[i] for chunk in self.columns ]) for i in range(7) ]
+        self.columns = [ tuple(columns) ]
+        self.alive = np.concatenate(( self.alive, np.array(self.aliveAdded, dtype=bool) ))
+        self.aliveAdded = []
+
+        kept = self.alive
+        table = ScatterPointTable( columns[0][kept], columns[1][kept], columns[2][kept], columns[3][kept],
+                                   columns[4][kept], columns[5][kept], self.params, columns[6][kept] )
+        if self.nodeNames is None and self.strokeChanged:
+            self.outputBackend.update( self.groupName, [], table, 0, self.settings.color )
+        self.pendingRemoved = []
+        self.strokeChanged = False
+        registerTable( self.groupName, table )
+        return table
+
+    def pickSurface(self, screenX, screenY):
+        """ Finds the point of the scattered meshes under the cursor in the active viewport.
+            Params
+            ===
+                screenX: X-coordinate of the cursor in the viewport
+                screenY: Y-coordinate of the cursor in the viewport
+                return: The (x, y, z) hit point, or None if the cursor is not over a mesh
+        """
+        nearPoint = om.MPoint()
+        farPoint = om.MPoint()
+        omui.M3dView.active3dView().viewToWorld( int(screenX), int(screenY), nearPoint, farPoint )
+        origin = np.array([[ nearPoint.x, nearPoint.y, nearPoint.z ]])
+        direction = np.array([[ farPoint.x - nearPoint.x, farPoint.y - nearPoint.y, farPoint.z - nearPoint.z ]])
+        direction /= max( np.linalg.norm(direction), 1e-12 )
+        rayHits = self.rayCaster.intersect( origin, direction )
+        if not rayHits.hit[0]:
+            return None
+        return tuple( rayHits.points[0].tolist() )
+
+#-------------------#
+# Brush tool        #
+#-------------------#
+
+brushContext = 'scatterBrushContext'
+activeBrush = None
+
+def brushEvent( pointQuery ):
+    """ Paints at the cursor, or erases with shift held. """
+    screenX, screenY = cmds.draggerContext( brushContext, query=True, **{ pointQuery: True } )[:2]
+    hit = activeBrush.pickSurface( screenX, screenY )
+    if hit is None:
+        return
+    if cmds.draggerContext( brushContext, query=True, modifier=True ) == 'shift':
+        activeBrush.erase( hit[0], hit[2] )
+    else:
+        activeBrush.paint( hit[0], hit[2] )
+    activeBrush.flush()
+    cmds.refresh( currentView=True )
+
+def startScatterBrush( groupName, brushRadius = 10.0 ):
+    """ Activates a brush tool in the viewport which paints scatter points into the given scatter group,
+        shift + drag removes points.
+        Params
+        ===
+            groupName: Name of a scatter group created in this session
+            brushRadius (optional): Radius of the brush in world units
+    """
+    global activeBrush
+    try:
+        activeBrush = ScatterBrush( groupName, brushRadius )
+    except ValueError as error:
+        print(error)
+        return
+
+    if cmds.draggerContext( brushContext, exists=True ):
+        cmds.deleteUI( brushContext )
+    cmds.draggerContext( brushContext, cursor='crossHair', space='screen', undoMode='step',
+                         pressCommand=lambda: brushEvent('anchorPoint'),
+                         dragCommand=lambda: brushEvent('dragPoint'),
+                         releaseCommand=lambda: activeBrush.endStroke() )
+    cmds.setToolTo( brushContext )
+
+def paintScatterPoints( locatorGroupNameFieldGrp, brushRadiusFieldGrp, *pArgs ):
+    groupName = cmds.textFieldGrp( locatorGroupNameFieldGrp, query=True, text=True )
+    if not cmds.objExists( groupName ):
+        print("Group not found")
+        return
+
+    startScatterBrush( groupName, cmds.floatFieldGrp( brushRadiusFieldGrp, query=True, value1=True ) )
@@ -0,0 +1,99 @@
+samplingMethods = ( 'Poisson-Disc', 'Parallel Poisson-Disc', 'Bridson Poisson-Disc', 'Variable Poisson-Disc',
+                    'Multi-Class Poisson-Disc', 'Simple Randomizer' )
+raycastMethods = ( 'BVH (NumPy)', 'Maya API' )
+outputMethods = ( 'Locators', 'Particles' )
+hitFilterTypes = ( 'slope', 'height', 'normalCone', 'curveFalloff', 'mask' )
+
+def parseClassRadii( text ):
+    """ Parses a comma separated list of class radii such as '4, 2, 0.5'.
+        Params
+        ===
+            text: Text of the class radii field
+            return: A list of positive radii, or None if the text is not valid
+    """
+    try:
+        radii = [ float(word) for word in text.replace(';', ',').split(',') if len(word.strip()) > 0 ]
+    except ValueError:
+        return None
+    if len(radii) == 0 or min(radii) <= 0:
+        return None
+    return radii
+
+class ScatterSettings(object):
+    """ All parameters of a scatter, so that it can be run without the tool window.
+        The defaults are the defaults of the tool window, every setting can be overridden as keyword argument.
+        Params
+        ===
+            sampler: Name of the sampling method, one of samplingMethods
+            discRadius: Disc radius of the Poisson-Disc samplers (minimum radius of the variable radius sampler)
+            maxDiscRadius: Disc radius of the variable radius sampler where the density is 0
+            densityMap: Path of the density map image of the variable radius sampler, '' for a constant density
+            classRadii: Disc radius of each class of the multi-class sampler
+            resolution: Grid resolution of the simple randomizer
+            probability: Probability of keeping a grid cell in the simple randomizer
+            seed: Seed of the sampler
+            raycast: Name of the ray casting method, one of raycastMethods
+            surfaceOrientation: Align the y-axis of the scatter points with the surface normal
+            smoothNormals: Interpolate the vertex normals at the hits instead of using the face normals
+            rotationRange: [min, max] random rotation around the local y-axis in degrees
+            scaleRange: [min, max] random uniform scale
+            groupName: Name of the scatter group
+            output: Name of the output backend, one of outputMethods
+            color: RGB color of the scatter points
+            footprint: Only sample where the selected faces are seen from above, instead of the whole bounding box
+            filters: Filters of the ray hits before any scatter points are created, see hit_filters.createHitFilters
+            chunkSize: Stream the samples through ray casting, filters and scene output in chunks of this many samples,
+                       so that memory does not grow with the number of points, 0 keeps all points in memory
+            cachePath: Directory of the on-disk point table of a streamed scatter, '' for a temporary directory
+    """
+    defaults = { 'sampler': 'Poisson-Disc', 'discRadius': 2.0, 'maxDiscRadius': 8.0, 'densityMap': '',
+                 'classRadii': [4.0, 2.0, 1.0], 'resolution': 20, 'probability': 0.5, 'seed': 0,
+                 'raycast': 'BVH (NumPy)', 'surfaceOrientation': True, 'smoothNormals': False,
+                 'rotationRange': [0, 0], 'scaleRange': [1.0, 1.0], 'groupName': 'ScatterGroup',
+                 'output': 'Locators', 'color': [255, 0, 0], 'footprint': True,
+                 'filters': [], 'chunkSize': 0, 'cachePath': '' }
+
+    def __init__(self, **settings):
+        for name, value in self.defaults.items():
+            setattr(self, name, list(value) if isinstance(value, list) else value)
+        self.update(settings)
+
+    def update(self, settings):
+        """ Overrides settings from a dictionary, for example one entry of a batch job file.
+            Params
+            ===
+                settings: A dictionary of setting names and values
+                return: This ScatterSettings
+        """
+        for name, value in settings.items():
+            if name not in self.defaults:
+                raise ValueError("Unknown scatter setting: {}".format(name))
+            if name == 'classRadii' and isinstance(value, str):
+                value = parseClassRadii(value)
+            setattr(self, name, value)
+        self.validate()
+        return self
+
+    def validate(self):
+        if self.sampler not in samplingMethods:
+            raise ValueError("Unknown sampler: {}".format(self.sampler))
+        if self.raycast not in raycastMethods:
+            raise ValueError("Unknown ray casting method: {}".format(self.raycast))
+        if self.output not in outputMethods:
+            raise ValueError("Unknown output: {}".format(self.output))
+        if self.sampler == 'Multi-Class Poisson-Disc' and (self.classRadii is None or len(self.classRadii) == 0):
+            raise ValueError("Class radii must be a comma separated list of positive numbers")
+        if self.sampler != 'Simple Randomizer' and self.discRadius <= 0:
+            raise ValueError("Disc radius must be positive")
+        if self.chunkSize < 0:
+            raise ValueError("Chunk size must not be negative")
+        for hitFilter in self.filters:
+            if hitFilter.get('type') not in hitFilterTypes:
+                raise ValueError("Unknown hit filter: {}".format(hitFilter.get('type')))
+
+    def toDict(self):
+        return dict( (name, getattr(self, name)) for name in self.defaults )
+
+    @classmethod
+    def fromDict(cls, settings):
+        return cls(**settings)
@@ -0,0 +1,304 @@
+try:
+    import maya.cmds as mayaCmds
+except ImportError:
+    # Backends can be used outside of Maya with a stand-in for maya.cmds
+    mayaCmds = None
+
+import numpy as np
+
+from point_table import ScatterPointTable
+import instrumentation
+
+class LocatorBackend(object):
+    """ Writes one space locator per scatter point, parented under a group.
+        Params
+        ===
+            cmds (optional): Module used for scene commands, defaults to maya.cmds
+    """
+    name = 'Locators'
+
+    def __init__(self, cmds = None):
+        self.cmds = mayaCmds if cmds is None else cmds
+
+    def write(self, groupName, positions, rotations, scales, color):
+        """ Creates the scatter points in the scene.
+            Params
+            ===
+                groupName: Name of the group to create for the points
+                positions: (N, 3) array of world space positions
+                rotations: (N, 3) array of rx, ry, rz rotations in degrees
+                scales: (N,) array of uniform scale factors
+                color: RGB color of the points
+                return: The name of the created group
+        """
+        cmds = self.cmds
+        group = cmds.group( em=True, name=groupName )
+        self.addLocators( group, positions, rotations, scales, color )
+        instrumentation.count('nodesCreated', 1)
+        return group
+
+    def append(self, group, positions, rotations, scales, color):
+        """ Adds the next chunk of points of a streamed scatter to a group created by write. """
+        self.addLocators( group, positions, rotations, scales, color )
+
+    def addLocators(self, group, positions, rotations, scales, color):
+        """ Creates one locator per point and parents them under the group, after its existing locators.
+            Params
+            ===
+                See write
+                return: The names of the created locators
+        """
+        cmds = self.cmds
+        locators = []
+        for position, rotation, scale in zip( np.asarray(positions).tolist(), np.asarray(rotations).tolist(),
+                                              np.asarray(scales).tolist() ):
+            spaceLoc = cmds.spaceLocator()
+
+            # Set color of the locator
+            shapeName = spaceLoc[0][0:7] + "Shape" + spaceLoc[0][7:]
+            cmds.setAttr( "{}.overrideEnabled".format(shapeName), True )
+            cmds.setAttr( "{}.overrideRGBColors".format(shapeName), True )
+            cmds.setAttr( "{}.overrideColorR".format(shapeName), color[0] )
+            cmds.setAttr( "{}.overrideColorG".format(shapeName), color[1] )
+            cmds.setAttr( "{}.overrideColorB".format(shapeName), color[2] )
+
+            # Set position, orientation and scale in one call
+            cmds.xform( spaceLoc[0], translation=position, rotation=rotation, scale=(scale, scale, scale) )
+            locators.append(spaceLoc[0])
+
+        if len(locators) > 0:
+            cmds.parent( locators, group )
+        instrumentation.count('nodesCreated', len(locators))
+        return locators
+
+    def deleteLocators(self, locators):
+        """ Deletes the given locators of a scatter group in one call. """
+        if len(locators) > 0:
+            self.cmds.delete( locators )
+        instrumentation.count('nodesDeleted', len(locators))
+
+    def update(self, groupName, removedIndices, table, numAdded, color):
+        """ Updates the points of an existing scatter group in place: deletes the locators of the removed points
+            and creates locators for the points added at the end of the table. Other locators are not touched.
+            Params
+            ===
+                groupName: Name of the scatter group
+                removedIndices: Indices of the removed points in the previous table (the child order of the group)
+                table: The updated ScatterPointTable, the remaining points in their previous order and then the new points
+                numAdded: Number of new points at the end of the table
+                color: RGB color of the new points
+        """
+        cmds = self.cmds
+        if len(removedIndices) > 0:
+            locators = cmds.listRelatives( groupName, children=True, type='transform', fullPath=True ) or []
+            self.deleteLocators( [ locators[i] for i in removedIndices ] )
+
+        start = len(table) - numAdded
+        self.addLocators( groupName, table.positions[start:], table.rotations[start:], table.scales[start:], color )
+
+    def read(self, groupName):
+        """ Reads the transforms of the locators in a scatter group.
+            Params
+            ===
+                groupName: Name of the scatter group
+                return: A ScatterPointTable, or None if the group has no locators
+        """
+        cmds = self.cmds
+        locators = cmds.listRelatives( groupName, children=True, type='transform', fullPath=True ) or []
+        if len(locators) == 0:
+            return None
+
+        positions = [ cmds.xform( locator, q=True, ws=True, t=True ) for locator in locators ]
+        rotations = [ cmds.xform( locator, q=True, ws=True, ro=True ) for locator in locators ]
+        scales = [ cmds.xform( locator, q=True, ws=True, s=True )[0] for locator in locators ]
+        return ScatterPointTable( positions, rotations, scales )
+
+class ParticleBackend(object):
+    """ Writes all scatter points into a single particle node with per-particle rotationPP and scalePP
+        attributes, which can drive a particle instancer. Streamed scatters get one particle node per chunk.
+        Params
+        ===
+            cmds (optional): Module used for scene commands, defaults to maya.cmds
+    """
+    name = 'Particles'
+
+    def __init__(self, cmds = None):
+        self.cmds = mayaCmds if cmds is None else cmds
+
+    def write(self, groupName, positions, rotations, scales, color):
+        """ Creates the scatter points in the scene.
+            Params
+            ===
+                See LocatorBackend.write
+                return: The name of the created group
+        """
+        cmds = self.cmds
+        group = cmds.group( em=True, name=groupName )
+        self.addParticles( group, positions, rotations, scales, color )
+        instrumentation.count('nodesCreated', 1)
+        return group
+
+    def append(self, group, positions, rotations, scales, color):
+        """ Adds the next chunk of points of a streamed scatter to a group created by write, as a new particle node. """
+        if len(positions) > 0:
+            self.addParticles( group, positions, rotations, scales, color )
+
+    def addParticles(self, group, positions, rotations, scales, color):
+        """ Creates the particle node of a scatter group. """
+        cmds = self.cmds
+        groupName = group.split('|')[-1]
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        rotations = np.asarray(rotations, dtype=np.float64).reshape(-1, 3)
+        scales = np.asarray(scales, dtype=np.float64).reshape(-1)
+
+        particle, shape = cmds.particle( position=[ tuple(p) for p in positions.tolist() ],
+                                         name=groupName + "Particles" )
+
+        # Per particle attributes and their initial state
+        for attribute, dataType in (('rotationPP', 'vectorArray'), ('scalePP', 'doubleArray')):
+            for suffix in ('', '0'):
+                cmds.addAttr( shape, longName=attribute + suffix, dataType=dataType )
+
+        numPoints = len(positions)
+        cmds.setAttr( "{}.rotationPP".format(shape), numPoints, *[ tuple(r) for r in rotations.tolist() ],
+                      type='vectorArray' )
+        cmds.setAttr( "{}.scalePP".format(shape), scales.tolist(), type='doubleArray' )
+        cmds.saveInitialState( shape )
+
+        cmds.setAttr( "{}.overrideEnabled".format(shape), True )
+        cmds.setAttr( "{}.overrideRGBColors".format(shape), True )
+        cmds.setAttr( "{}.overrideColorR".format(shape), color[0] )
+        cmds.setAttr( "{}.overrideColorG".format(shape), color[1] )
+        cmds.setAttr( "{}.overrideColorB".format(shape), color[2] )
+
+        cmds.parent( particle, group )
+        instrumentation.count('nodesCreated', 1)
+
+    def update(self, groupName, removedIndices, table, numAdded, color):
+        """ Updates the points of an existing scatter group. All points live in one particle node, which is
+            replaced by a node with the updated points.
+            Params
+            ===
+                See LocatorBackend.update
+        """
+        cmds = self.cmds
+        children = cmds.listRelatives( groupName, children=True, fullPath=True ) or []
+        if len(children) > 0:
+            cmds.delete( children )
+        instrumentation.count('nodesDeleted', len(children))
+        self.addParticles( groupName, table.positions, table.rotations, table.scales, color )
+
+    def read(self, groupName):
+        """ Reads the per particle transforms of the particle nodes in a scatter group with bulk queries.
+            Params
+            ===
+                groupName: Name of the scatter group
+                return: A ScatterPointTable, or None if the group has no particle node
+        """
+        cmds = self.cmds
+        shapes = cmds.listRelatives( groupName, allDescendents=True, type='particle', fullPath=True ) or []
+        if len(shapes) == 0:
+            return None
+
+        positions = []
+        rotations = []
+        scales = []
+        for shape in shapes:
+            positions.extend( cmds.getAttr( "{}.position".format(shape) ) or [] )
+            rotations.extend( cmds.getAttr( "{}.rotationPP".format(shape) ) or [] )
+            scales.extend( cmds.getAttr( "{}.scalePP".format(shape) ) or [] )
+        return ScatterPointTable( positions, rotations, scales )
+
+class ModelInstancer(object):
+    """ Instances models at scatter points with particle instancers, so the number of scene commands depends
+        on the number of chunks and not on the number of points. Each chunk gets a particle node with the
+        per-instance rotation, scale and model index, and an instancer that reads them.
+        Params
+        ===
+            models: Names of the instanced models
+            cmds (optional): Module used for scene commands, defaults to maya.cmds
+    """
+
+    def __init__(self, models, cmds = None):
+        self.models = list(models)
+        self.cmds = mayaCmds if cmds is None else cmds
+        self.group = None
+
+    def create(self, groupName):
+        """ Creates the group of the particle nodes and instancers.
+            Params
+            ===
+                groupName: Name of the group to create
+                return: The name of the created group
+        """
+        self.group = self.cmds.group( em=True, name=groupName )
+        instrumentation.count('nodesCreated', 1)
+        return self.group
+
+    def addInstances(self, positions, rotations, scalings, modelIndices):
+        """ Instances the models at the next chunk of points.
+            Params
+            ===
+                positions: (N, 3) array of world space positions
+                rotations: (N, 3) array of rx, ry, rz rotations in degrees
+                scalings: (N, 3) array of the final x, y, z scale of each instance
+                modelIndices: (N,) array with the index in models of the model of each instance
+                return: The name of the created instancer, or None if there are no points
+        """
+        cmds = self.cmds
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        numPoints = len(positions)
+        if numPoints == 0:
+            return None
+        groupName = self.group.split('|')[-1]
+        particle, shape = cmds.particle( position=[ tuple(p) for p in positions.tolist() ], name=groupName + "Points" )
+
+        # Per particle attributes read by the instancer, with their initial state
+        for attribute, dataType in (('rotationPP', 'vectorArray'), ('scalePP', 'vectorArray'), ('indexPP', 'doubleArray')):
+            for suffix in ('', '0'):
+                cmds.addAttr( shape, longName=attribute + suffix, dataType=dataType )
+
+        cmds.setAttr( "{}.rotationPP".format(shape), numPoints,
+                      *[ tuple(r) for r in np.asarray(rotations, dtype=np.float64).reshape(-1, 3).tolist() ],
+                      type='vectorArray' )
+        cmds.setAttr( "{}.scalePP".format(shape), numPoints,
+                      *[ tuple(s) for s in np.asarray(scalings, dtype=np.float64).reshape(-1, 3).tolist() ],
+                      type='vectorArray' )
+        cmds.setAttr( "{}.indexPP".format(shape), np.asarray(modelIndices, dtype=np.float64).tolist(), type='doubleArray' )
+        cmds.saveInitialState( shape )
+
+        instancer = cmds.particleInstancer( shape, addObject=True, object=self.models, cycle='None',
+                                            position='worldPosition', rotation='rotationPP', scale='scalePP',
+                                            objectIndex='indexPP', name=groupName + "Instancer" )
+
+        # Only the instances are visible
+        cmds.setAttr( "{}.visibility".format(shape), False )
+        cmds.parent( [particle, instancer], self.group )
+        instrumentation.count('nodesCreated', 2)
+        return instancer
+
+outputBackends = { LocatorBackend.name: LocatorBackend, ParticleBackend.name: ParticleBackend }
+
+def readScatterTable( groupName, cmds = None ):
+    """ Reads the point table of a scatter group from the scene, trying each output backend.
+        Params
+        ===
+            groupName: Name of the scatter group
+            cmds (optional): Module used for scene commands, defaults to maya.cmds
+            return: A ScatterPointTable, or None if the group contains no scatter points
+    """
+    for backend in (ParticleBackend(cmds), LocatorBackend(cmds)):
+        table = backend.read(groupName)
+        if table is not None:
+            return table
+    return None
+
+def createOutputBackend( name, cmds = None ):
+    """ Creates the scene output backend with the given name ('Locators' or 'Particles').
+        Params
+        ===
+            name: Name of the backend
+            cmds (optional): Module used for scene commands, defaults to maya.cmds
+            return: A backend object with a write method
+    """
+    return outputBackends[name](cmds)
@@ -0,0 +1,123 @@
+import maya.cmds as cmds
+import maya.OpenMaya as om
+
+import re
+
+import numpy as np
+
+# Matches face components such as 'pPlane1.f[12]', '|group1|pPlane1.f[3:40]' or 'ns:pPlaneShape1.f[*]'
+faceComponentPattern = re.compile( r'^(?P<node>[^\[\]]+)\.f\[(?P<start>\d+|\*)(?::(?P<end>\d+))?\]$' )
+
+def parseFaceComponent( component ):
+    """ Splits a selected face component into its node name and face ids.
+        Params
+        ===
+            component: A component string as returned by cmds.ls(sl=True)
+            return: A tuple (node name, list of face ids), the list is None for 'f[*]',
+                    or None if the string is not a face component
+    """
+    match = faceComponentPattern.match( component )
+    if match is None:
+        return None
+
+    if match.group('start') == '*':
+        return match.group('node'), None
+
+    start = int(match.group('start'))
+    end = start if match.group('end') is None else int(match.group('end'))
+    return match.group('node'), list(range(min(start, end), max(start, end) + 1))
+
+def getMeshDagPath( nodeName ):
+    """ Returns the MDagPath of the mesh shape of a transform or shape node without changing the selection. """
+    selectionList = om.MSelectionList()
+    selectionList.add( nodeName )
+    dagPath = om.MDagPath()
+    selectionList.getDagPath( 0, dagPath )
+    dagPath.extendToShape()
+    return dagPath
+
+class CompiledMesh(object):
+    """ A selected mesh prepared once per scatter for repeated ray queries: the face ids are stored both as
+        a sorted NumPy array and as a MIntArray, and the uniform grid intersection acceleration is created.
+        Params
+        ===
+            name: Name of the selected node (transform) of the mesh
+            fnMesh: MFnMesh of the mesh
+            faceIds: Sequence of face ids to intersect, all faces if empty
+    """
+    def __init__(self, name, fnMesh, faceIds = ()):
+        self.name = name
+        self.fnMesh = fnMesh
+        self.faceIds = np.unique( np.asarray(faceIds, dtype=np.int64) )
+
+        # None tells closestIntersection to test all faces
+        self.faceIdArray = None
+        if len(self.faceIds) > 0:
+            self.faceIdArray = om.MIntArray( len(self.faceIds) )
+            for i, faceId in enumerate(self.faceIds.tolist()):
+                self.faceIdArray.set( faceId, i )
+
+        self.accelParams = fnMesh.autoUniformGridParams()
+
+    def release(self):
+        """ Frees the intersection acceleration grid Maya keeps for the mesh. """
+        self.fnMesh.freeCachedIntersectionAccelerator()
+
+def compileMeshNames( meshNames, faceIdLists ):
+    """ Compiles meshes from the node names and face ids stored with a scatter, see compileSelection.
+        Params
+        ===
+            meshNames: Names of the mesh nodes
+            faceIdLists: A list of face ids per mesh, an empty list for all faces
+            return: A list of CompiledMesh
+    """
+    return [ CompiledMesh( name, om.MFnMesh(getMeshDagPath(name)), faceIds ) for name, faceIds in zip(meshNames, faceIdLists) ]
+
+def compileSelection( selected ):
+    """ Parses the selected objects and components into one CompiledMesh per mesh shape.
+        Faces are collected from every selected face component ('f[3]', 'f[2:9]', 'f[*]'), vertex, edge
+        and other components are converted to faces. A mesh selected as a whole object uses all its faces.
+        Params
+        ===
+            selected: A list of names as returned by cmds.ls(sl=True)
+            return: A list of CompiledMesh in the order the meshes were first selected
+    """
+    meshNames = []
+    meshFaces = {}
+    meshNodes = {}
+
+    for item in selected:
+        parsed = parseFaceComponent( item )
+        if parsed is None and '.' in item:
+            # Convert other component types to face components
+            converted = cmds.polyListComponentConversion( item, toFace=True ) or []
+            parsedFaces = [ parseFaceComponent(face) for face in cmds.ls( converted ) ]
+            parsedFaces = [ face for face in parsedFaces if face is not None ]
+        elif parsed is None:
+            parsedFaces = [ (item, None) ]
+        else:
+            parsedFaces = [ parsed ]
+
+        for nodeName, faceIds in parsedFaces:
+            # Transforms and shapes of the same mesh share one entry
+            shapePath = getMeshDagPath( nodeName ).fullPathName()
+            if shapePath not in meshFaces:
+                meshNames.append( shapePath )
+                meshNodes[shapePath] = nodeName
+                meshFaces[shapePath] = []
+
+            # An entry of None means all faces of the mesh
+            if faceIds is None or meshFaces[shapePath] is None:
+                meshFaces[shapePath] = None
+            else:
+                meshFaces[shapePath].extend( faceIds )
+
+    compiledMeshes = []
+    for shapePath in meshNames:
+        fnMesh = om.MFnMesh( getMeshDagPath(shapePath) )
+        faceIds = meshFaces[shapePath]
+        if faceIds is not None and len(set(faceIds)) == fnMesh.numPolygons():
+            faceIds = None
+        compiledMeshes.append( CompiledMesh( meshNodes[shapePath], fnMesh, () if faceIds is None else faceIds ) )
+
+    return compiledMeshes
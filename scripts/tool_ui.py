@@ -1,7 +1,9 @@
 import maya.cmds as cmds
 import functools
 
-from scatter import generateScatterPoints, createModels
+from scatter import generateScatterPoints, updateScatterRegion, createModels, saveScatterCache, loadScatterCache
+from scatter_brush import paintScatterPoints
+from background import generateScatterInBackground, cancelBackgroundScatter
 
 
 #----------------#
@@ -11,14 +13,35 @@ from scatter import generateScatterPoints, createModels
 def setSamplingMethod(samplerOptionMenu):
     option = cmds.optionMenu( samplerOptionMenu, query=True, value=True )
     
-    if option == 'Poisson-Disc':
+    if option in ('Poisson-Disc', 'Parallel Poisson-Disc', 'Bridson Poisson-Disc', 'Variable Poisson-Disc'):
         cmds.floatFieldGrp( discRadiusField, edit=1, visible=True )
         cmds.intFieldGrp( resolutionField, edit=1, visible=False )
         cmds.floatSliderGrp( probabilityField, edit=1, visible=False )
+    elif option == 'Multi-Class Poisson-Disc':
+        cmds.floatFieldGrp( discRadiusField, edit=1, visible=False )
+        cmds.intFieldGrp( resolutionField, edit=1, visible=False )
+        cmds.floatSliderGrp( probabilityField, edit=1, visible=False )
     else:
         cmds.floatFieldGrp( discRadiusField, edit=1, visible=False )
         cmds.intFieldGrp( resolutionField, edit=1, visible=True )
         cmds.floatSliderGrp( probabilityField, edit=1, visible=True )
+    
+    isVariable = option == 'Variable Poisson-Disc'
+    cmds.floatFieldGrp( maxDiscRadiusField, edit=1, visible=isVariable )
+    cmds.textFieldButtonGrp( densityMapFieldGrp, edit=1, visible=isVariable )
+    cmds.textFieldGrp( classRadiiFieldGrp, edit=1, visible=option == 'Multi-Class Poisson-Disc' )
+
+
+def browseDensityMap(densityMapFieldGrp):
+    imageFile = cmds.fileDialog2( fileMode=1, dialogStyle=2, caption="Density Map" )
+    if imageFile:
+        cmds.textFieldButtonGrp( densityMapFieldGrp, edit=1, text=imageFile[0] )
+
+
+def browseCacheDirectory(cachePathFieldGrp):
+    directory = cmds.fileDialog2( fileMode=3, dialogStyle=2, caption="Scatter Cache Directory" )
+    if directory:
+        cmds.textFieldButtonGrp( cachePathFieldGrp, edit=1, text=directory[0] )
 
 
 # Check if window exists
@@ -38,12 +61,24 @@ samplerOptionMenu = cmds.optionMenu( label='Sampler' )
 cmds.optionMenu( samplerOptionMenu, edit=1, changeCommand='setSamplingMethod(samplerOptionMenu)')
 
 cmds.menuItem( label='Poisson-Disc' )
+cmds.menuItem( label='Parallel Poisson-Disc' )
+cmds.menuItem( label='Bridson Poisson-Disc' )
+cmds.menuItem( label='Variable Poisson-Disc' )
+cmds.menuItem( label='Multi-Class Poisson-Disc' )
 cmds.menuItem( label='Simple Randomizer' )
 
 cmds.separator( h=6, style="none" )
 
 discRadiusField = cmds.floatFieldGrp( numberOfFields=1, label="Disc Radius", value1=2 )
 
+maxDiscRadiusField = cmds.floatFieldGrp( numberOfFields=1, label="Max Disc Radius", value1=8, visible=False )
+
+densityMapFieldGrp = cmds.textFieldButtonGrp( label="Density Map", text="", buttonLabel="Browse", visible=False )
+cmds.textFieldButtonGrp( densityMapFieldGrp, edit=1, buttonCommand=functools.partial( browseDensityMap, densityMapFieldGrp ) )
+
+# One radius per class, the classes map to the models in the order they are selected in Create Models
+classRadiiFieldGrp = cmds.textFieldGrp( label="Class Radii", text="4, 2, 1", visible=False )
+
 resolutionField = cmds.intFieldGrp( numberOfFields=1, label="Sample Resolution", value1=20, visible=False )
 
 cmds.separator( h=6, style="none" )
@@ -53,7 +88,18 @@ probabilityField = cmds.floatSliderGrp( label="Probability Distribution", min=0.
                                         
 cmds.separator( h=6, style="none" )
 
-surfaceOrientationCheckBox = cmds.checkBoxGrp( numberOfCheckBoxes=1, label="Adjust to Surface", value1=True )
+seedFieldGrp = cmds.intFieldGrp( numberOfFields=1, label="Seed", value1=0 )
+
+cmds.separator( h=6, style="none" )
+
+raycastOptionMenu = cmds.optionMenu( label='Ray Casting' )
+cmds.menuItem( label='BVH (NumPy)' )
+cmds.menuItem( label='Maya API' )
+
+cmds.separator( h=6, style="none" )
+
+surfaceOrientationCheckBox = cmds.checkBoxGrp( numberOfCheckBoxes=2, label="Adjust to Surface", 
+                                               labelArray2=["Enabled", "Smooth Normals"], value1=True, value2=False )
 
 cmds.separator( h=12, style="none" )
 
@@ -83,6 +129,19 @@ maxScaleFieldGrp = cmds.floatFieldGrp( numberOfFields=1, label="Maximum Scale",
                                          
 cmds.separator( h=12, style="none" )
 
+cmds.text( label="Filter Ray Hits" )
+
+cmds.separator( h=6, style="none" )
+
+slopeRangeFieldGrp = cmds.floatFieldGrp( numberOfFields=2, label="Slope Range (Degrees)", value1=0, value2=90 )
+
+cmds.separator( h=6, style="none" )
+
+heightRangeFieldGrp = cmds.floatFieldGrp( numberOfFields=2, label="Height Range", value1=0, value2=100 )
+heightFilterCheckBox = cmds.checkBoxGrp( numberOfCheckBoxes=1, label="", label1="Filter by Height", value1=False )
+
+cmds.separator( h=12, style="none" )
+
 cmds.text( label="Scatter Group" )
 
 cmds.separator( h=6, style="none" )
@@ -91,25 +150,86 @@ locatorGroupNameFieldGrp = cmds.textFieldGrp( label="Group Name", text="ScatterG
 
 cmds.separator( h=6, style="none" )
 
+outputOptionMenu = cmds.optionMenu( label='Output' )
+cmds.menuItem( label='Locators' )
+cmds.menuItem( label='Particles' )
+
+cmds.separator( h=6, style="none" )
+
 locatorColorFieldGrp = cmds.intFieldGrp( numberOfFields=3, label="Scatter Point Color", 
                                          value1=255, value2=0, value3=0 )
 
+cmds.separator( h=6, style="none" )
+
+# Chunk size 0 keeps all points in memory, larger scatters are streamed through the scene output in chunks
+chunkSizeFieldGrp = cmds.intFieldGrp( numberOfFields=1, label="Stream Chunk Size", value1=0 )
+
 cmds.separator( h=12, style="none" )
 
-cmds.button( "Generate Scatter", command=functools.partial( generateScatterPoints,
-                                                    resolutionField,
-                                                    probabilityField,
-                                                    surfaceOrientationCheckBox,
-                                                    locatorColorFieldGrp,
-                                                    randomRotMaxSliderGrp,
-                                                    randomRotMinSliderGrp,
-                                                    minScaleFieldGrp,
-                                                    maxScaleFieldGrp,
-                                                    locatorGroupNameFieldGrp,
-                                                    samplerOptionMenu,
-                                                    discRadiusField ) ) 
+# Fields read by both scatter buttons
+scatterFields = ( resolutionField,
+                  probabilityField,
+                  surfaceOrientationCheckBox,
+                  locatorColorFieldGrp,
+                  randomRotMaxSliderGrp,
+                  randomRotMinSliderGrp,
+                  minScaleFieldGrp,
+                  maxScaleFieldGrp,
+                  locatorGroupNameFieldGrp,
+                  samplerOptionMenu,
+                  discRadiusField,
+                  raycastOptionMenu,
+                  outputOptionMenu,
+                  seedFieldGrp,
+                  maxDiscRadiusField,
+                  densityMapFieldGrp,
+                  classRadiiFieldGrp,
+                  slopeRangeFieldGrp,
+                  heightRangeFieldGrp,
+                  heightFilterCheckBox,
+                  chunkSizeFieldGrp )
+
+cmds.button( "Generate Scatter", command=functools.partial( generateScatterPoints, *scatterFields ) )
+
+cmds.separator( h=6, style="none" )
+
+# Scatters in the background keep Maya responsive, the progress bar shows their sampling progress
+scatterProgressBar = cmds.progressBar( maxValue=100 )
+cmds.button( "Generate in Background", command=functools.partial( generateScatterInBackground, scatterProgressBar, scatterFields ) )
+cmds.button( "Cancel Background Scatter", command=cancelBackgroundScatter )
+
+cmds.separator( h=6, style="none" )
+
+cmds.button( "Update Edited Region", command=functools.partial( updateScatterRegion, locatorGroupNameFieldGrp ) )
+
+cmds.separator( h=20 )
+
+cmds.text( label="Scatter Brush (Shift + Drag to Erase)" )
+
+cmds.separator( h=6, style="none" )
+
+brushRadiusFieldGrp = cmds.floatFieldGrp( numberOfFields=1, label="Brush Radius", value1=10.0 )
+
+cmds.separator( h=6, style="none" )
+
+cmds.button( "Paint Scatter Points", command=functools.partial( paintScatterPoints, locatorGroupNameFieldGrp, brushRadiusFieldGrp ) )
                                                     
 
+cmds.separator( h=20 )
+
+cmds.text( label="Scatter Cache" )
+
+cmds.separator( h=6, style="none" )
+
+cachePathFieldGrp = cmds.textFieldButtonGrp( label="Cache Directory", text="", buttonLabel="Browse" )
+cmds.textFieldButtonGrp( cachePathFieldGrp, edit=1, buttonCommand=functools.partial( browseCacheDirectory, cachePathFieldGrp ) )
+
+cmds.separator( h=6, style="none" )
+
+cmds.button( "Save Scatter Cache", command=functools.partial( saveScatterCache, locatorGroupNameFieldGrp, cachePathFieldGrp ) )
+cmds.button( "Load Scatter Cache", command=functools.partial( loadScatterCache, cachePathFieldGrp, locatorGroupNameFieldGrp,
+                                                              outputOptionMenu, locatorColorFieldGrp ) )
+
 cmds.separator( h=20 )
 
 cmds.text( label="Replace Scatter Points With Selected Models" )
@@ -120,7 +240,7 @@ scatterGroupNameFieldGrp = cmds.textFieldGrp( label="Scatter Group Name", text="
 
 cmds.separator( h=6, style="none" )
 
-cmds.button( "Add Models", command=functools.partial( createModels, scatterGroupNameFieldGrp ) )
+cmds.button( "Add Models", command=functools.partial( createModels, scatterGroupNameFieldGrp, cachePathFieldGrp ) )
 
 cmds.separator( h=12, style="none" )
 
@@ -0,0 +1,275 @@
+try:
+    import maya.OpenMaya as om
+except ImportError:
+    # Density images can only be loaded inside Maya, the sampler itself runs anywhere
+    om = None
+
+import ctypes
+import math
+import random
+
+import numpy as np
+
+class DensityMap(object):
+    """ Density in [0, 1] over the sampling domain, given as a function of (x, z) or as a 2D array which
+        covers the bounding box (rows along z from zMin to zMax, columns along x from xMin to xMax).
+        Arrays are sampled with bilinear interpolation.
+        Params
+        ===
+            density: A function density(x, z) or a 2D array of densities
+            xMin: Minimum x-coordinate of the sampling domain
+            xMax: Maximum x-coordinate of the sampling domain
+            zMin: Minimum z-coordinate of the sampling domain
+            zMax: Maximum z-coordinate of the sampling domain
+    """
+    def __init__(self, density, xMin, xMax, zMin, zMax):
+        self.function = None
+        self.values = None
+        if callable(density):
+            self.function = density
+        else:
+            values = np.clip( np.asarray(density, dtype=np.float64), 0.0, 1.0 )
+            if values.ndim != 2 or values.size == 0:
+                raise ValueError("Density array must be two dimensional")
+            # Nested lists are faster than NumPy for single element lookups
+            self.values = values.tolist()
+            self.numRows, self.numColumns = values.shape
+            self.xMin = xMin
+            self.zMin = zMin
+            self.colScale = (self.numColumns - 1) / float(xMax - xMin) if xMax > xMin else 0.0
+            self.rowScale = (self.numRows - 1) / float(zMax - zMin) if zMax > zMin else 0.0
+
+    def __call__(self, x, z):
+        if self.function is not None:
+            return min(max(self.function(x, z), 0.0), 1.0)
+
+        col = min(max((x - self.xMin) * self.colScale, 0.0), self.numColumns - 1)
+        row = min(max((z - self.zMin) * self.rowScale, 0.0), self.numRows - 1)
+        col0 = min(int(col), self.numColumns - 2) if self.numColumns > 1 else 0
+        row0 = min(int(row), self.numRows - 2) if self.numRows > 1 else 0
+        col1 = min(col0 + 1, self.numColumns - 1)
+        row1 = min(row0 + 1, self.numRows - 1)
+        tX = col - col0
+        tZ = row - row0
+        top = self.values[row0][col0] * (1 - tX) + self.values[row0][col1] * tX
+        bottom = self.values[row1][col0] * (1 - tX) + self.values[row1][col1] * tX
+        return top * (1 - tZ) + bottom * tZ
+
+def loadDensityImage( path ):
+    """ Reads an image file with Maya into a density array (luminance of the pixels in [0, 1]).
+        The image is mapped like a planar projection from the top: u along x and v along negative z.
+        Params
+        ===
+            path: Path of the image file
+            return: A 2D float array with rows along z and columns along x
+    """
+    image = om.MImage()
+    image.readFromFile( path )
+
+    widthUtil = om.MScriptUtil()
+    widthUtil.createFromInt(0)
+    widthPtr = widthUtil.asUintPtr()
+    heightUtil = om.MScriptUtil()
+    heightUtil.createFromInt(0)
+    heightPtr = heightUtil.asUintPtr()
+    image.getSize( widthPtr, heightPtr )
+    width = om.MScriptUtil.getUint(widthPtr)
+    height = om.MScriptUtil.getUint(heightPtr)
+
+    # Copy the RGBA bytes in one go instead of reading them one by one through MScriptUtil
+    pixelBuffer = (ctypes.c_ubyte * (width * height * 4)).from_address( int(image.pixels()) )
+    pixels = np.frombuffer( pixelBuffer, dtype=np.uint8 ).reshape(height, width, 4).astype(np.float64) / 255.0
+
+    # MImage rows start at the bottom of the image (v = 0), which lies at the maximum z
+    luminance = pixels[:, :, 0] * 0.299 + pixels[:, :, 1] * 0.587 + pixels[:, :, 2] * 0.114
+    return luminance[::-1].copy()
+
+def radiusFromDensity( density, minRadius, maxRadius ):
+    """ Maps a density in [0, 1] to a disc radius, full density gives minRadius and zero density gives maxRadius. """
+    return maxRadius + (minRadius - maxRadius) * density
+
+class MultiLevelGrid(object):
+    """ Sparse lookup grids for points with individual radii. Level k has the cell size minRadius * 2^k and
+        holds the points whose radius fits into one cell. Each point is also bucketed on all coarser levels,
+        so a query with any radius only visits a 3x3 block of cells per level, and memory grows with the number
+        of points (times the number of levels) instead of the area divided by minRadius^2.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the domain
+            zMin: Minimum z-coordinate of the domain
+            minRadius: Smallest radius of the points
+            maxRadius: Largest radius of the points
+    """
+    def __init__(self, xMin, zMin, minRadius, maxRadius):
+        self.xMin = xMin
+        self.zMin = zMin
+        self.cellSizes = [ minRadius ]
+        while self.cellSizes[-1] < maxRadius:
+            self.cellSizes.append( self.cellSizes[-1] * 2.0 )
+        self.numLevels = len(self.cellSizes)
+        self.cellSizesInvert = [ 1.0 / cellSize for cellSize in self.cellSizes ]
+
+        # buckets[k][j] holds the points of level k in cells of level j (only used for j >= k)
+        self.buckets = [ [ {} for _ in range(self.numLevels) ] for _ in range(self.numLevels) ]
+        self.levelCounts = [0] * self.numLevels
+
+    def level(self, radius):
+        """ Returns the finest level with a cell size of at least the given radius. """
+        level = 0
+        while level + 1 < self.numLevels and self.cellSizes[level] < radius:
+            level += 1
+        return level
+
+    def insert(self, x, z, radius):
+        pointLevel = self.level(radius)
+        self.levelCounts[pointLevel] += 1
+        point = (x, z, radius)
+        for j in range(pointLevel, self.numLevels):
+            key = ( int((x - self.xMin) * self.cellSizesInvert[j]), int((z - self.zMin) * self.cellSizesInvert[j]) )
+            cells = self.buckets[pointLevel][j]
+            if key in cells:
+                cells[key].append(point)
+            else:
+                cells[key] = [point]
+
+    def isClear(self, x, z, radius):
+        """ Checks that no point lies closer than max(radius, radius of the point) to the given location.
+            Params
+            ===
+                x: X-coordinate of the location
+                z: Z-coordinate of the location
+                radius: Radius of the location
+                return: True if there is no conflicting point
+        """
+        queryLevel = self.level(radius)
+        for pointLevel in range(self.numLevels):
+            if self.levelCounts[pointLevel] == 0:
+                continue
+
+            # Conflicting points are closer than both cell sizes, so they lie in the 3x3 neighbourhood
+            j = max(pointLevel, queryLevel)
+            cells = self.buckets[pointLevel][j]
+            col = int((x - self.xMin) * self.cellSizesInvert[j])
+            row = int((z - self.zMin) * self.cellSizesInvert[j])
+            for i in range(col - 1, col + 2):
+                for k in range(row - 1, row + 2):
+                    for pX, pZ, pRadius in cells.get((i, k), ()):
+                        dX = pX - x
+                        dZ = pZ - z
+                        minDistance = pRadius if pRadius > radius else radius
+                        if dX * dX + dZ * dZ < minDistance * minDistance:
+                            return False
+        return True
+
+def variableRadiusPoissonDiscSampling(xMin, xMax, zMin, zMax, minRadius, maxRadius, density, numCandidates = 30,
+                                      seed = None):
+    """ Generates a Poisson-Disc point set where the disc radius varies over the domain with a density map.
+        Two points are never closer than the larger of their radii.
+        Params
+        ===
+            xMin: Minimum x-coordinate of the sampling domain
+            xMax: Maximum x-coordinate of the sampling domain
+            zMin: Minimum z-coordinate of the sampling domain
+            zMax: Maximum z-coordinate of the sampling domain
+            minRadius: Disc radius where the density is 1
+            maxRadius: Disc radius where the density is 0
+            density: A function density(x, z), a 2D array over the domain (see DensityMap) or a DensityMap
+            numCandidates (optional): Number of candidates to try around an active point before it is retired
+            seed (optional): Seed of the random generator, None for a random seed
+            return: A list of sample points
+    """
+    samples = []
+    for batch in iterVariableRadiusPoissonDiscSampling(xMin, xMax, zMin, zMax, minRadius, maxRadius, density,
+                                                       numCandidates, seed):
+        samples.extend(batch)
+    return samples
+
+def iterVariableRadiusPoissonDiscSampling(xMin, xMax, zMin, zMax, minRadius, maxRadius, density, numCandidates = 30,
+                                          seed = None, batchSize = 4096, progress = None):
+    """ Generator version of variableRadiusPoissonDiscSampling which yields the samples in batches.
+        Points grow out from active points like in Bridson's algorithm, with candidates in the annulus between
+        the radius and twice the radius of the active point.
+        Params
+        ===
+            See variableRadiusPoissonDiscSampling
+            batchSize (optional): Number of samples per batch
+            progress (optional): Function called with an estimate of the covered fraction of the domain,
+                                 sampling stops when it returns True
+            return: A generator of lists of sample points
+    """
+    rng = random.Random(seed)
+
+    sizeX = xMax - xMin
+    sizeZ = zMax - zMin
+    if sizeX <= 0 or sizeZ <= 0:
+        return
+
+    minRadius, maxRadius = min(minRadius, maxRadius), max(minRadius, maxRadius)
+    if not isinstance(density, DensityMap):
+        density = DensityMap(density, xMin, xMax, zMin, zMax)
+
+    grid = MultiLevelGrid(xMin, zMin, minRadius, maxRadius)
+    sampleX = []
+    sampleZ = []
+    sampleRadii = []
+    activeList = []
+
+    def addSample(x, z, radius):
+        grid.insert(x, z, radius)
+        activeList.append(len(sampleX))
+        sampleX.append(x)
+        sampleZ.append(z)
+        sampleRadii.append(radius)
+
+    # Start from a random point in the domain
+    x = xMin + rng.random() * sizeX
+    z = zMin + rng.random() * sizeZ
+    addSample(x, z, radiusFromDensity(density(x, z), minRadius, maxRadius))
+
+    # A maximal set has roughly 0.65 samples per radius^2, used to estimate the progress
+    coveredArea = sampleRadii[0] * sampleRadii[0] / 0.65
+    areaInvert = 1.0 / (sizeX * sizeZ)
+    batchStart = 0
+    numIterations = 0
+
+    while len(activeList) > 0:
+        numIterations += 1
+        if progress is not None and (numIterations & 255) == 0:
+            if progress( min(coveredArea * areaInvert, 1.0) ):
+                break
+
+        if len(sampleX) - batchStart >= batchSize:
+            yield list(zip(sampleX[batchStart:], sampleZ[batchStart:]))
+            batchStart = len(sampleX)
+
+        # Choose a random active point
+        activeIndex = int(rng.random() * len(activeList))
+        pointIndex = activeList[activeIndex]
+        pX = sampleX[pointIndex]
+        pZ = sampleZ[pointIndex]
+        pRadius = sampleRadii[pointIndex]
+
+        found = False
+        for _ in range(numCandidates):
+            # Uniformly distributed candidate in the annulus between radius and 2 * radius of the active point
+            angle = rng.random() * 2 * math.pi
+            distance = pRadius * math.sqrt(1 + 3 * rng.random())
+            x = pX + distance * math.cos(angle)
+            z = pZ + distance * math.sin(angle)
+            if x < xMin or x >= xMax or z < zMin or z >= zMax:
+                continue
+
+            radius = radiusFromDensity(density(x, z), minRadius, maxRadius)
+            if grid.isClear(x, z, radius):
+                addSample(x, z, radius)
+                coveredArea += radius * radius / 0.65
+                found = True
+                break
+
+        # Retire the point if no candidate was accepted (swap and pop to keep removal O(1))
+        if not found:
+            activeList[activeIndex] = activeList[-1]
+            activeList.pop()
+
+    if len(sampleX) > batchStart:
+        yield list(zip(sampleX[batchStart:], sampleZ[batchStart:]))
@@ -0,0 +1,32 @@
+""" The tests run headless: the scripts are imported from scripts/ and maya from the stand-in package in
+    benchmarks/fake_maya, the same setup as the benchmarks.
+"""
+import os
+import sys
+
+testsDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(testsDir, '..', 'scripts'))
+sys.path.insert(0, os.path.join(testsDir, '..', 'benchmarks', 'fake_maya'))
+
+import numpy as np
+import pytest
+
+import maya.cmds as cmds
+import maya.OpenMaya as om
+
+def terrainHeight(x, z):
+    return 2.0 * np.sin(x * 0.1) * np.cos(z * 0.13)
+
+@pytest.fixture
+def terrain(request):
+    """ Empty scene with a grid mesh 'terrain'. The size and resolution of the grid default to (60.0, 30) and are
+        changed by parametrising the fixture indirectly:
+        @pytest.mark.parametrize('terrain', [ (40.0, 20) ], indirect=True)
+    """
+    size, resolution = getattr(request, 'param', (60.0, 30))
+    cmds.resetScene()
+    om.meshes.clear()
+    om.createGridMesh('terrain', size=size, resolution=resolution, height=terrainHeight)
+    yield
+    cmds.resetScene()
+    om.meshes.clear()
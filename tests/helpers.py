@@ -0,0 +1,60 @@
+import numpy as np
+
+from hdt import iterHdtPoissonDiscSampling
+
+def sampleSquare(length, radius, seed, **kwargs):
+    """ HDT samples of the square [0, length]^2 as an (N, 2) array. """
+    samples = []
+    for batch in iterHdtPoissonDiscSampling(0.0, length, 0.0, length, radius, seed=seed, **kwargs):
+        samples.extend(batch)
+    return np.array(samples).reshape(-1, 2)
+
+def nearestDistances(probes, points, chunkSize = 2048):
+    """ Distance of each (x, z) probe to its nearest point, by brute force in chunks. """
+    probes = np.asarray(probes, dtype=np.float64).reshape(-1, 2)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    result = np.empty(len(probes))
+    for start in range(0, len(probes), chunkSize):
+        offsets = probes[start:start + chunkSize, None, :] - points[None, :, :]
+        result[start:start + chunkSize] = np.sqrt( (offsets ** 2).sum(axis=2).min(axis=1) )
+    return result
+
+def uncoveredProbes(probes, points, radius, tileLength = None):
+    """ Probes farther than radius from every point. The probes are brute forced against the points
+        of their tile grown by radius, so large domains stay cheap.
+    """
+    probes = np.asarray(probes, dtype=np.float64).reshape(-1, 2)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    tileLength = tileLength or radius * 8.0
+    tiles = np.floor( (probes - probes.min(axis=0)) / tileLength ).astype(np.int64)
+    keys = tiles[:, 0] * (tiles[:, 1].max() + 1) + tiles[:, 1]
+    uncovered = []
+    for key in np.unique(keys):
+        tileProbes = probes[keys == key]
+        low, high = tileProbes.min(axis=0) - radius, tileProbes.max(axis=0) + radius
+        near = points[ np.all((points >= low) & (points <= high), axis=1) ]
+        if not len(near):
+            uncovered.append(tileProbes)
+            continue
+        distances = nearestDistances(tileProbes, near)
+        uncovered.append(tileProbes[distances >= radius])
+    return np.concatenate(uncovered) if uncovered else np.empty((0, 2))
+
+def minimumDistance(points):
+    """ Smallest distance between two different (x, z) points. """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    order = np.argsort(points[:, 0])
+    points = points[order]
+    best = np.inf
+    # Sweep along x: only the next few neighbours in x order can be closer than the best so far
+    for shift in range(1, len(points)):
+        offsets = points[shift:] - points[:-shift]
+        if offsets[:, 0].min() >= best:
+            break
+        best = min( best, np.sqrt((offsets ** 2).sum(axis=1)).min() )
+    return best
+
+def probeGrid(xMin, zMin, xMax, zMax, spacing):
+    """ (x, z) probes on a regular grid over a rectangle. """
+    x, z = np.meshgrid( np.arange(xMin, xMax, spacing) + spacing * 0.5, np.arange(zMin, zMax, spacing) + spacing * 0.5 )
+    return np.column_stack(( x.ravel(), z.ravel() ))
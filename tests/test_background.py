@@ -0,0 +1,127 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+import pytest
+
+import maya.cmds as cmds
+
+from scatter_settings import ScatterSettings
+from point_table import findTable
+from scene_output import readScatterTable
+from background import BackgroundScatter, ManualScheduler
+import background
+import instrumentation
+import scatter
+
+pytestmark = pytest.mark.usefixtures('terrain')
+
+def pendingWrites(scheduler):
+    return sum( 1 for function, args in list(scheduler.callbacks.queue) if function.__name__ == 'writeChunk' )
+
+@pytest.mark.parametrize('output, chunkSize', [ ('Locators', 0), ('Particles', 100) ])
+def test_finish_matches_scatter_points(output, chunkSize):
+    settings = ScatterSettings( discRadius=1.5, output=output, chunkSize=chunkSize )
+    scheduler = ManualScheduler()
+    done = []
+    job = BackgroundScatter( ['terrain'], settings, scheduler, done=done.append ).start()
+    assert scheduler.runUntilDone( job, 60 )
+
+    assert done == [ job.groupName ] and job.error is None
+    table = findTable( job.groupName )
+    assert np.allclose( readScatterTable( job.groupName ).positions, table.positions )
+
+    cmds.resetScene()
+    reference = findTable( scatter.scatterPoints( ['terrain'], ScatterSettings( **dict(settings.toDict(), raycast='BVH (NumPy)') ) ) )
+    assert np.allclose( table.positions, reference.positions )
+    assert np.allclose( table.rotations, reference.rotations )
+
+def test_progress_runs_on_scheduler():
+    scheduler = ManualScheduler()
+    progress = []
+    job = BackgroundScatter( ['terrain'], ScatterSettings( discRadius=0.5 ), scheduler, progress=progress.append ).start()
+    # Nothing reaches the caller before the scheduler runs the callbacks
+    assert progress == []
+    scheduler.runUntilDone( job, 60 )
+    assert all( 0.0 <= fraction <= 1.0 for fraction in progress )
+
+def test_worker_waits_for_scene_writes():
+    scheduler = ManualScheduler()
+    job = BackgroundScatter( ['terrain'], ScatterSettings( discRadius=1.0, chunkSize=50 ), scheduler,
+                             maxPendingChunks=2 ).start()
+    endTime = time.perf_counter() + 30.0
+    while pendingWrites(scheduler) < 2 and time.perf_counter() < endTime:
+        time.sleep(0.05)
+    # The worker does not compute a third chunk before a write has run
+    time.sleep(0.5)
+    assert pendingWrites(scheduler) == 2
+    scheduler.runUntilDone( job, 60 )
+    assert len( findTable(job.groupName) ) > 100
+
+def test_cancel_removes_written_points():
+    scheduler = ManualScheduler()
+    done = []
+    job = BackgroundScatter( ['terrain'], ScatterSettings( discRadius=1.0, chunkSize=50, output='Locators' ), scheduler,
+                             done=done.append, maxPendingChunks=1 ).start()
+    # Write the first chunk, then cancel while the worker waits for the next write
+    while not cmds.objExists( 'ScatterGroup' ):
+        scheduler.runPending( 0.1 )
+    job.cancel()
+    assert scheduler.runUntilDone( job, 60 )
+
+    job.thread.join( 10 )
+    assert not job.thread.is_alive()
+    assert done == [ None ] and job.error is None
+    assert not cmds.objExists( 'ScatterGroup' )
+
+def test_error_is_reported_on_main_thread():
+    scheduler = ManualScheduler()
+    done = []
+    job = BackgroundScatter( ['terrain'], ScatterSettings( sampler='Variable Poisson-Disc', discRadius=1.0 ), scheduler,
+                             done=done.append )
+    job.start()
+    # The worker fails as soon as it samples without a density
+    job.density = None
+    assert scheduler.runUntilDone( job, 60 )
+    assert done == [ None ]
+    assert job.error is not None
+
+def test_error_removes_temporary_cache(monkeypatch):
+    created = []
+    createDirectory = tempfile.mkdtemp
+    def mkdtemp(**kwargs):
+        created.append( createDirectory(**kwargs) )
+        return created[-1]
+    monkeypatch.setattr( background.tempfile, 'mkdtemp', mkdtemp )
+
+    scheduler = ManualScheduler()
+    job = BackgroundScatter( ['terrain'], ScatterSettings( sampler='Variable Poisson-Disc', discRadius=1.0, chunkSize=100 ),
+                             scheduler )
+    job.start()
+    job.density = None
+    assert scheduler.runUntilDone( job, 60 )
+    assert job.error is not None
+    assert len(created) == 1 and not os.path.exists( created[0] )
+
+def test_worker_records_into_its_own_stats():
+    instrumentation.enableInstrumentation( printReport=False )
+    try:
+        # A run of the main thread is active while the worker computes
+        mainStats = instrumentation.beginRun( 'mainThread' )
+        scheduler = ManualScheduler()
+        # A single chunk, so the worker does not wait for scene writes
+        job = BackgroundScatter( ['terrain'], ScatterSettings( discRadius=1.5 ), scheduler ).start()
+        job.thread.join( 60 )
+        assert not job.thread.is_alive()
+        assert 'sampling' not in mainStats.stageTimes and instrumentation.activeStats is mainStats
+        assert job.workerStats.counters['samples'] > 0
+
+        scheduler.runUntilDone( job, 60 )
+        assert instrumentation.activeStats is mainStats
+        assert instrumentation.lastStats is job.stats
+        assert job.stats.counters['scatterPoints'] == len( findTable(job.groupName) )
+        assert 'sceneOutput' in job.stats.stageTimes and 'sampling' in job.stats.stageTimes
+    finally:
+        instrumentation.endRun()
+        instrumentation.disableInstrumentation()
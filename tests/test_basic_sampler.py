@@ -0,0 +1,34 @@
+import numpy as np
+
+from basic_sampler import basicRandomSamplingArray, basicRandomSampling, iterBasicRandomSampling, basicGridDimensions
+
+def test_batches_are_bounded():
+    batches = list( iterBasicRandomSampling(0.0, 0.0, 100.0, 100.0, 500, 0.5, seed=1, batchSize=2000) )
+    assert len(batches) > 1
+    assert max( len(batch) for batch in batches ) <= 2000
+
+def test_batches_are_generated_lazily():
+    # 10^10 grid cells, which would not fit in memory at once
+    batch = next( iterBasicRandomSampling(0.0, 0.0, 100.0, 100.0, 100000, 0.5, seed=2, batchSize=100000) )
+    assert 0 < len(batch) <= 100000
+
+def test_one_sample_per_kept_cell():
+    dimX, dimZ, delta = basicGridDimensions(0.0, 0.0, 80.0, 40.0, 200)
+    samples = np.concatenate( list( iterBasicRandomSampling(0.0, 0.0, 80.0, 40.0, 200, 1.0, seed=3, batchSize=1000) ) )
+    assert len(samples) == (dimX - 1) * (dimZ - 1)
+    cells = np.round( samples / delta ).astype(np.int64)
+    assert len( np.unique(cells, axis=0) ) == len(samples)
+
+def test_probability():
+    samples = basicRandomSamplingArray(0.0, 0.0, 100.0, 100.0, 400, 0.25, seed=4)
+    assert abs( len(samples) / 399.0 ** 2 - 0.25 ) < 0.01
+
+def test_array_is_one_batch():
+    samples = basicRandomSamplingArray(0.0, 0.0, 100.0, 60.0, 300, 0.4, seed=5)
+    batches = list( iterBasicRandomSampling(0.0, 0.0, 100.0, 60.0, 300, 0.4, seed=5, batchSize=10 ** 6) )
+    assert len(batches) == 1 and np.array_equal( batches[0], samples )
+    assert basicRandomSampling(0.0, 0.0, 100.0, 60.0, 300, 0.4, seed=5) == [ tuple(sample) for sample in samples.tolist() ]
+
+def test_degenerate_domain():
+    assert len( basicRandomSamplingArray(0.0, 0.0, 100.0, 0.1, 10, 1.0) ) == 0
+    assert list( iterBasicRandomSampling(0.0, 0.0, 100.0, 0.1, 10, 1.0) ) == []
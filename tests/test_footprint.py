@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+
+from footprint import FootprintMask, filterSamples
+
+def randomMask(seed, numRows = 23, numColumns = 31, cellLength = 0.7):
+    cells = np.random.default_rng(seed).random((numRows, numColumns)) < 0.15
+    return FootprintMask(-3.0, 2.0, cellLength, cells)
+
+def bruteOverlaps(mask, xMin, zMin, xMax, zMax):
+    """ Checks every covered cell of the mask against the closed rectangle. """
+    for row, col in zip(*np.nonzero(mask.cells)):
+        cellX = mask.xMin + col * mask.cellLength
+        cellZ = mask.zMin + row * mask.cellLength
+        if cellX <= xMax and cellX + mask.cellLength >= xMin and cellZ <= zMax and cellZ + mask.cellLength >= zMin:
+            return True
+    return False
+
+def test_coverage():
+    mask = randomMask(0)
+    assert math.isclose(mask.coverage(), mask.cells.mean())
+
+def test_contains_points_matches_contains():
+    mask = randomMask(1)
+    points = np.random.default_rng(1).uniform((-5.0, 0.0), (22.0, 20.0), size=(2000, 2))
+    assert np.array_equal(mask.containsPoints(points), [ mask.contains(x, z) for x, z in points ])
+
+def test_overlaps_matches_brute_force():
+    mask = randomMask(2)
+    rng = np.random.default_rng(2)
+    for _ in range(500):
+        xMin, zMin = rng.uniform((-5.0, 0.0), (20.0, 18.0))
+        xMax, zMax = xMin + rng.uniform(0.01, 4.0), zMin + rng.uniform(0.01, 4.0)
+        assert mask.overlaps(xMin, zMin, xMax, zMax) == bruteOverlaps(mask, xMin, zMin, xMax, zMax)
+
+def test_overlaps_grid_matches_overlaps():
+    mask = randomMask(3)
+    for squareLength in (0.3, 1.1, 2.9):
+        grid = mask.overlapsGrid(-4.0, 1.5, squareLength, 12, 9)
+        expected = [ [ mask.overlaps(-4.0 + col * squareLength, 1.5 + row * squareLength,
+                                     -4.0 + (col + 1) * squareLength, 1.5 + (row + 1) * squareLength)
+                       for col in range(12) ] for row in range(9) ]
+        assert np.array_equal(grid, expected)
+
+def test_empty_mask():
+    mask = FootprintMask(0.0, 0.0, 1.0, np.zeros((4, 4), dtype=bool))
+    assert not mask.overlaps(-10.0, -10.0, 10.0, 10.0)
+    assert not mask.overlapsGrid(0.0, 0.0, 1.0, 4, 4).any()
+
+def test_crop_keeps_cells():
+    mask = randomMask(4)
+    cropped = mask.crop(1.0, 5.0, 9.0, 11.0)
+    points = np.random.default_rng(4).uniform((1.0, 5.0), (9.0, 11.0), size=(2000, 2))
+    assert np.array_equal(cropped.containsPoints(points), mask.containsPoints(points))
+
+def test_filter_samples():
+    mask = randomMask(5)
+    batch = np.random.default_rng(5).uniform((-3.0, 2.0), (18.0, 18.0), size=(500, 2))
+    kept = np.concatenate([ np.asarray(b).reshape(-1, 2) for b in filterSamples([ batch ], mask) ])
+    assert np.array_equal(kept, batch[mask.containsPoints(batch)])
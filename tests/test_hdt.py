@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+
+from hdt import hdtSampleSquare, ConstraintGrid
+from footprint import FootprintMask
+from tests.helpers import nearestDistances, uncoveredProbes, minimumDistance, probeGrid, sampleSquare
+
+def test_minimum_distance():
+    samples = sampleSquare(30.0, 1.0, seed=1)
+    assert minimumDistance(samples) >= 1.0 - 1e-9
+
+def test_samples_inside_domain():
+    samples = sampleSquare(20.0, 0.7, seed=2)
+    assert samples.min() >= 0.0 and samples.max() <= 20.0
+
+def test_maximal():
+    # No dart could be added: every location of the domain lies within the disc radius of a sample
+    samples = sampleSquare(30.0, 1.0, seed=3)
+    probes = probeGrid(0.0, 0.0, 30.0, 30.0, 0.05)
+    assert len(uncoveredProbes(probes, samples, 1.0)) == 0
+
+def test_default_has_no_dart_limit():
+    # More squares are popped than the old default limit of 100000 darts, the result must still be maximal
+    samples = sampleSquare(120.0, 0.5, seed=4)
+    assert len(samples) > 40000
+    assert minimumDistance(samples) >= 0.5 - 1e-9
+    probes = probeGrid(0.0, 0.0, 120.0, 120.0, 0.1)
+    assert len(uncoveredProbes(probes, samples, 0.5)) == 0
+
+def test_iteration_limit_stops_early():
+    limited = sampleSquare(30.0, 1.0, seed=5, maxIterations=100)
+    assert 0 < len(limited) < len(sampleSquare(30.0, 1.0, seed=5))
+
+def test_same_seed_same_samples():
+    assert np.array_equal(sampleSquare(15.0, 1.0, seed=6), sampleSquare(15.0, 1.0, seed=6))
+
+def test_constraint_points():
+    constraints = [ (5.0, 5.0), (10.0, 10.0) ]
+    samples = np.array( hdtSampleSquare(0.0, 0.0, 15.0, 1.0, random.Random(7), constraints) )
+    assert nearestDistances(constraints, samples).min() >= 1.0 - 1e-9
+    assert minimumDistance(samples) >= 1.0 - 1e-9
+
+def test_constraint_grid_distances():
+    grid = ConstraintGrid(3.0)
+    grid.insert(7.5, 7.5, 3.0)
+    samples = np.array( hdtSampleSquare(0.0, 0.0, 15.0, 1.0, random.Random(8), constraintGrid=grid) )
+    assert nearestDistances([ (7.5, 7.5) ], samples).min() >= 3.0 - 1e-9
+
+def test_footprint():
+    # Only the left half of the domain is covered
+    cells = np.zeros((20, 20), dtype=bool)
+    cells[:, :10] = True
+    footprint = FootprintMask(0.0, 0.0, 1.0, cells)
+    samples = sampleSquare(20.0, 1.0, seed=9, footprint=footprint)
+    assert len(samples) > 0
+    assert samples[:, 0].max() <= 10.0
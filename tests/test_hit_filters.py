@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import pytest
+
+from hit_filters import SlopeFilter, HeightFilter, NormalConeFilter, CurveFalloffFilter, MaskFilter
+from hit_filters import createHitFilters, filterHits
+
+def slopeNormals(angles):
+    angles = np.radians( np.asarray(angles, dtype=np.float64) )
+    return np.column_stack(( np.sin(angles), np.cos(angles), np.zeros(len(angles)) ))
+
+def test_slope_filter_includes_its_limits():
+    normals = slopeNormals([ 0.0, 20.0, 35.0, 35.001, 60.0, 90.0 ])
+    keep = SlopeFilter( 20.0, 35.0 )( np.zeros((6, 3)), normals, None )
+    assert keep.tolist() == [ False, True, True, False, False, False ]
+    # Unnormalised normals give the same result
+    assert SlopeFilter( 0.0, 90.0 )( np.zeros((6, 3)), normals * 3.0, None ).all()
+
+def test_height_filter():
+    positions = np.array([ (0.0, y, 0.0) for y in (-1.0, 0.5, 2.0, 3.5) ])
+    assert HeightFilter( 0.5, 2.0 )( positions, None, None ).tolist() == [ False, True, True, False ]
+    assert HeightFilter( maxHeight=0.5 )( positions, None, None ).tolist() == [ True, True, False, False ]
+    assert HeightFilter()( positions, None, None ).all()
+
+def test_normal_cone_filter_includes_its_border():
+    angles = [ 0.0, 45.0, 60.0, 60.001, 120.0 ]
+    normals = np.array([ (0.0, math.sin(math.radians(a)), -math.cos(math.radians(a))) for a in angles ])
+    keep = NormalConeFilter( (0.0, 0.0, -2.0), 60.0 )( np.zeros((5, 3)), normals, None )
+    assert keep.tolist() == [ True, True, True, False, False ]
+
+def test_curve_falloff_probabilities():
+    # A straight curve along x, the hits lie at increasing z-distances from it
+    curve = CurveFalloffFilter( [ (0.0, 0.0, 0.0), (100.0, 5.0, 0.0) ], 2.0, 6.0 )
+    distances = np.repeat( [ 1.0, 3.0, 4.0, 5.0, 7.0 ], 20000 )
+    positions = np.column_stack(( np.full(len(distances), 50.0), np.zeros(len(distances)), distances ))
+    assert np.allclose( curve.distances(positions), distances )
+    rates = curve( positions, None, np.random.default_rng(0) ).reshape(5, -1).mean(axis=1)
+    assert np.allclose( rates, [ 1.0, 0.75, 0.5, 0.25, 0.0 ], atol=0.02 )
+
+    inverted = CurveFalloffFilter( [ (0.0, 0.0, 0.0), (100.0, 5.0, 0.0) ], 2.0, 6.0, invert=True )
+    rates = inverted( positions, None, np.random.default_rng(0) ).reshape(5, -1).mean(axis=1)
+    assert np.allclose( rates, [ 0.0, 0.25, 0.5, 0.75, 1.0 ], atol=0.02 )
+
+def test_mask_rows_run_along_z():
+    # Only the last row is white: it covers the hits at the maximum z-coordinate
+    mask = np.zeros((3, 2))
+    mask[2, :] = 1.0
+    maskFilter = MaskFilter( mask, 0.0, 10.0, -4.0, 4.0 )
+    positions = np.array([ (0.0, 0.0, 4.0), (10.0, 0.0, 4.0), (5.0, 0.0, -4.0), (5.0, 0.0, 2.0) ])
+    assert np.allclose( maskFilter.sample(positions), [ 1.0, 1.0, 0.0, 0.5 ] )
+    assert maskFilter( positions[:3], None, np.random.default_rng(1) ).tolist() == [ True, True, False ]
+
+def test_later_filters_only_see_the_survivors():
+    seen = []
+    def recordingFilter(positions, normals, rng):
+        seen.append( positions[:, 1].copy() )
+        return np.ones(len(positions), dtype=bool)
+
+    positions = np.column_stack(( np.zeros(6), np.arange(6.0), np.zeros(6) ))
+    normals = slopeNormals( np.zeros(6) )
+    faceIds = np.arange(6) * 10
+    kept = filterHits( [ HeightFilter( 1.0, 4.0 ), recordingFilter ], (positions, normals, faceIds), np.random.default_rng(2) )
+    assert seen[0].tolist() == [ 1.0, 2.0, 3.0, 4.0 ]
+    assert kept[2].tolist() == [ 10, 20, 30, 40 ]
+
+def test_create_hit_filters():
+    bbox = [ 0.0, 0.0, -4.0, 10.0, 5.0, 4.0 ]
+    filters = createHitFilters( [ { 'type': 'slope', 'maxAngle': 30.0 }, { 'type': 'height', 'minHeight': 1.0 },
+                                  { 'type': 'curveFalloff', 'points': [ (0.0, 0.0, 0.0) ], 'innerDistance': 1.0,
+                                    'outerDistance': 2.0 },
+                                  { 'type': 'mask', 'path': 'mask.png' } ], bbox, lambda path: np.ones((2, 2)) )
+    assert [ type(hitFilter) for hitFilter in filters ] == [ SlopeFilter, HeightFilter, CurveFalloffFilter, MaskFilter ]
+    assert (filters[3].xMin, filters[3].zMin) == (0.0, -4.0)
+
+    with pytest.raises(ValueError):
+        createHitFilters( [ { 'type': 'mask', 'path': 'mask.png' } ], bbox )
+    with pytest.raises(ValueError):
+        createHitFilters( [ { 'type': 'noise' } ], bbox )
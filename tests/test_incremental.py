@@ -0,0 +1,71 @@
+import numpy as np
+
+from multiclass_hdt import createCrossDistances
+from footprint import FootprintMask
+from incremental import iterRegionSamples, pointsInRegion, expandRegion
+from tests.helpers import minimumDistance, uncoveredProbes, probeGrid, sampleSquare
+
+def resample(points, region, radius, seed, footprint = None):
+    removed = pointsInRegion( points, region )
+    kept = points[~removed]
+    newPoints = []
+    for batch in iterRegionSamples( region, [ radius ], createCrossDistances([ radius ]), kept, np.zeros(len(kept)),
+                                    seed, footprint=footprint ):
+        newPoints.extend( (x, z) for x, z, label in batch )
+    return kept, np.array(newPoints).reshape(-1, 2)
+
+def test_new_samples_stay_in_region():
+    points = sampleSquare(40.0, 1.0, seed=1)
+    region = expandRegion( (12.0, 15.0, 20.0, 31.0), 1.0 )
+    kept, newPoints = resample(points, region, 1.0, seed=2)
+    assert len(newPoints) > 0
+    assert pointsInRegion( newPoints, region ).all()
+    assert minimumDistance( np.concatenate((kept, newPoints)) ) >= 1.0 - 1e-9
+
+def test_region_is_filled_up_to_its_border():
+    # A narrow region: the square domain of the darts reaches far beyond it along x
+    points = sampleSquare(40.0, 1.0, seed=3)
+    region = (10.0, 5.0, 14.0, 35.0)
+    kept, newPoints = resample(points, region, 1.0, seed=4)
+    probes = probeGrid( region[0], region[1], region[2], region[3], 0.05 )
+    assert len( uncoveredProbes( probes, np.concatenate((kept, newPoints)), 1.0 ) ) == 0
+
+def test_region_with_coarse_footprint():
+    # Footprint cells which reach over the border of the region must not block darts inside of it
+    points = sampleSquare(40.0, 1.0, seed=5)
+    region = (10.3, 10.3, 17.7, 21.1)
+    footprint = FootprintMask( 8.0, 8.0, 4.0, np.ones((4, 3), dtype=bool) )
+    kept, newPoints = resample(points, region, 1.0, seed=6, footprint=footprint)
+    assert pointsInRegion( newPoints, region ).all()
+    probes = probeGrid( region[0], region[1], region[2], region[3], 0.05 )
+    assert len( uncoveredProbes( probes, np.concatenate((kept, newPoints)), 1.0 ) ) == 0
+
+def test_random_regions_have_no_holes():
+    # Regions of a coarse footprint which had uncovered seams when the darts outside of them were only dropped
+    # after they had been inserted
+    points = sampleSquare(40.0, 1.0, seed=3)
+    footprint = FootprintMask( 0.0, 0.0, 3.0, np.ones((14, 14), dtype=bool) )
+    for seed in (1, 21, 29):
+        rng = np.random.default_rng(seed)
+        xMin, zMin = rng.uniform(5.0, 20.0, 2)
+        region = (xMin, zMin, xMin + rng.uniform(1.0, 12.0), zMin + rng.uniform(1.0, 12.0))
+        kept, newPoints = resample(points, region, 1.0, seed, footprint=footprint)
+        assert pointsInRegion( newPoints, region ).all()
+        probes = probeGrid( region[0], region[1], region[2], region[3], 0.05 )
+        assert len( uncoveredProbes( probes, np.concatenate((kept, newPoints)), 1.0 ) ) == 0
+
+def test_clipped_footprint_queries():
+    rng = np.random.default_rng(7)
+    footprint = FootprintMask( 0.0, 0.0, 1.0, rng.random((20, 20)) < 0.5 )
+    rectangle = (3.3, 4.6, 11.2, 15.9)
+    clipped = footprint.clip( *rectangle )
+    points = rng.uniform(-1.0, 21.0, size=(2000, 2))
+    inside = pointsInRegion( points, rectangle ) & footprint.containsPoints( points )
+    assert np.array_equal( clipped.containsPoints(points), inside )
+    assert [ clipped.contains(x, z) for x, z in points ] == inside.tolist()
+
+    grid = clipped.overlapsGrid( -1.0, -1.0, 1.5, 15, 15 )
+    expected = [ [ clipped.overlaps( -1.0 + col * 1.5, -1.0 + row * 1.5, 0.5 + col * 1.5, 0.5 + row * 1.5 ) for col in range(15) ]
+                 for row in range(15) ]
+    assert np.array_equal( grid, expected )
+    assert not clipped.overlaps( 12.0, 0.0, 20.0, 20.0 )
@@ -0,0 +1,39 @@
+import numpy as np
+
+from multiclass_hdt import createCrossDistances, multiClassHdtPoissonDiscSampling, iterMultiClassHdtPoissonDiscSampling
+from tests.helpers import minimumDistance, nearestDistances
+
+def assertCrossDistances(samples, labels, crossDistances):
+    for i in range(len(crossDistances)):
+        for j in range(i, len(crossDistances)):
+            pointsI, pointsJ = samples[labels == i], samples[labels == j]
+            assert len(pointsI) > 0 and len(pointsJ) > 0
+            if i == j:
+                distance = minimumDistance( pointsI )
+            else:
+                distance = nearestDistances( pointsI, pointsJ ).min()
+            assert distance >= crossDistances[i][j] - 1e-9
+
+def test_default_cross_distances():
+    radii = [2.0, 1.0, 0.5]
+    assert createCrossDistances( radii ) == [ [2.0, 1.5, 1.25], [1.5, 1.0, 0.75], [1.25, 0.75, 0.5] ]
+    samples, labels = multiClassHdtPoissonDiscSampling( 0.0, 30.0, 0.0, 30.0, radii, seed=1 )
+    assert len(samples) == len(labels)
+    assertCrossDistances( np.array(samples), np.array(labels), createCrossDistances(radii) )
+
+def test_custom_cross_distances():
+    # The small class keeps a wide berth around the large one
+    radii = [3.0, 0.5]
+    crossDistances = [ [3.0, 2.25], [2.25, 0.5] ]
+    samples, labels = multiClassHdtPoissonDiscSampling( 0.0, 30.0, 0.0, 30.0, radii, crossDistances, seed=2 )
+    assertCrossDistances( np.array(samples), np.array(labels), crossDistances )
+
+def test_labels_line_up_with_points():
+    radii = [0.5, 2.0, 1.0]
+    samples, labels = multiClassHdtPoissonDiscSampling( 0.0, 20.0, 0.0, 20.0, radii, seed=3 )
+    batches = [ sample for batch in iterMultiClassHdtPoissonDiscSampling( 0.0, 20.0, 0.0, 20.0, radii, seed=3, batchSize=100 )
+                for sample in batch ]
+    assert [ (x, z) for x, z, _ in batches ] == samples
+    assert [ label for _, _, label in batches ] == labels
+    # The classes are sampled from the largest radius to the smallest
+    assert labels == sorted( labels, key=lambda label: -radii[label] )
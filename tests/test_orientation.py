@@ -0,0 +1,37 @@
+import numpy as np
+
+from orientation import aimYAngles, eulerToMatrices, matricesToEuler, eulerToQuaternions, computeOrientations
+from scatter import aimY
+
+def randomNormals(rng, count):
+    normals = rng.normal(size=(count, 3))
+    return normals / np.linalg.norm(normals, axis=1)[:, None]
+
+def test_aim_angles_match_aim_y():
+    rng = np.random.default_rng(0)
+    # Normals along the z-axis have no direction in the xy-plane
+    normals = np.concatenate(( randomNormals(rng, 500), [ (0.0, 0.0, 1.0), (0.0, 0.0, -1.0), (1e-7, 0.0, -1.0) ] ))
+    xAngles, zAngles = aimYAngles( normals )
+    expected = np.array([ aimY(normal) for normal in normals ])
+    # aimY computes in single precision
+    assert np.allclose( xAngles, expected[:, 0], atol=1e-3 )
+    assert np.allclose( zAngles, expected[:, 1], atol=1e-3 )
+
+def test_yaw_keeps_y_axis_on_normal():
+    rng = np.random.default_rng(1)
+    normals = np.concatenate(( randomNormals(rng, 500), [ (0.0, 0.0, 1.0), (0.0, 0.0, -1.0), (0.0, 1.0, 0.0) ] ))
+    rotations, scales = computeOrientations( normals, [0.0, 360.0], [0.5, 2.0], np.random.default_rng(2) )
+    matrices = eulerToMatrices( rotations )
+    assert np.allclose( matrices[:, :, 1], normals, atol=1e-9 )
+    assert np.allclose( np.matmul( matrices.transpose(0, 2, 1), matrices ), np.eye(3), atol=1e-9 )
+    assert ((scales >= 0.5) & (scales <= 2.0)).all()
+
+def test_outputs_describe_the_same_rotations():
+    normals = randomNormals( np.random.default_rng(3), 200 )
+    rotations = computeOrientations( normals, [-90.0, 90.0], [1.0, 1.0], np.random.default_rng(4) )[0]
+    matrices = computeOrientations( normals, [-90.0, 90.0], [1.0, 1.0], np.random.default_rng(4), output='matrix' )[0]
+    quaternions = computeOrientations( normals, [-90.0, 90.0], [1.0, 1.0], np.random.default_rng(4), output='quaternion' )[0]
+    assert np.allclose( matrices, eulerToMatrices(rotations) )
+    assert np.allclose( np.linalg.norm(quaternions, axis=1), 1.0 )
+    assert np.allclose( quaternions, eulerToQuaternions(rotations) )
+    assert np.allclose( eulerToMatrices( matricesToEuler(matrices) ), matrices, atol=1e-9 )
@@ -0,0 +1,17 @@
+import numpy as np
+
+from parallel_hdt import parallelHdtPoissonDiscSampling
+from tests.helpers import minimumDistance, uncoveredProbes, probeGrid
+
+def test_result_does_not_depend_on_workers():
+    serial = parallelHdtPoissonDiscSampling( 0.0, 60.0, 0.0, 60.0, 1.0, numWorkers=1, tilesPerSide=8, seed=5 )
+    parallel = parallelHdtPoissonDiscSampling( 0.0, 60.0, 0.0, 60.0, 1.0, numWorkers=4, tilesPerSide=8, seed=5 )
+    assert len(serial) > 0
+    assert serial == parallel
+
+def test_minimum_distance_across_tile_borders():
+    # Small tiles put most samples close to a tile border
+    samples = np.array( parallelHdtPoissonDiscSampling( 0.0, 60.0, 0.0, 60.0, 1.0, numWorkers=1, tilesPerSide=16, seed=6 ) )
+    assert ((samples >= 0.0) & (samples <= 60.0)).all()
+    assert minimumDistance( samples ) >= 1.0 - 1e-9
+    assert len( uncoveredProbes( probeGrid(0.0, 0.0, 60.0, 60.0, 0.1), samples, 1.0 ) ) == 0
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from point_table import ScatterPointTable, registerTable, findTable, removeTable, saveTable, loadTable, concatenateTables
+from scatter_settings import ScatterSettings
+import scatter
+
+def randomTable(seed, count):
+    rng = np.random.default_rng(seed)
+    return ScatterPointTable( rng.uniform(-50, 50, size=(count, 3)), rng.uniform(-180, 180, size=(count, 3)),
+                              rng.uniform(0.5, 2.0, count), labels=rng.integers(-1, 3, count), params={ 'seed': seed } )
+
+def test_save_and_load(tmp_path):
+    table = randomTable(0, 500)
+    saveTable( table, str(tmp_path / 'cache') )
+    for mmap in (True, False):
+        loaded = loadTable( str(tmp_path / 'cache'), mmap=mmap )
+        assert np.allclose( loaded.positions, table.positions, atol=1e-4 )
+        assert np.array_equal( loaded.labels, table.labels )
+        assert loaded.params == table.params
+        assert loaded.ownedDirectory is None
+
+def test_concatenate_tables():
+    first, second = randomTable(1, 10), randomTable(2, 5)
+    table = concatenateTables( [ first, second ], { 'seed': 3 } )
+    assert len(table) == 15 and table.params == { 'seed': 3 }
+    assert np.array_equal( table.scales, np.concatenate(( first.scales, second.scales )) )
+    assert len( concatenateTables( [] ) ) == 0
+
+def test_removed_table_deletes_owned_cache(tmp_path):
+    path = str(tmp_path / 'cache')
+    saveTable( randomTable(4, 100), path )
+    registerTable( 'OwnedGroup', loadTable( path, owned=True ) )
+    removeTable( 'OwnedGroup' )
+    assert not os.path.exists( path )
+
+def test_replaced_table_deletes_owned_cache(tmp_path):
+    path = str(tmp_path / 'cache')
+    saveTable( randomTable(5, 100), path )
+    registerTable( 'OwnedGroup', loadTable( path, owned=True ) )
+    registerTable( 'OwnedGroup', randomTable(6, 10) )
+    assert not os.path.exists( path )
+    removeTable( 'OwnedGroup' )
+
+def test_user_cache_is_kept(tmp_path):
+    path = str(tmp_path / 'cache')
+    saveTable( randomTable(7, 100), path )
+    registerTable( 'UserGroup', loadTable( path ) )
+    removeTable( 'UserGroup' )
+    assert os.path.isdir( path )
+
+@pytest.mark.parametrize('terrain', [ (40.0, 20) ], indirect=True)
+def test_streamed_scatter_owns_temporary_cache(terrain):
+    groupName = scatter.scatterPoints( ['terrain'], ScatterSettings( discRadius=1.0, chunkSize=200 ) )
+    directory = findTable( groupName ).ownedDirectory
+    assert directory is not None and os.path.isdir( directory )
+
+    # A regional re-scatter replaces the memory mapped table with an updated table in memory
+    assert scatter.rescatterRegion( groupName, (-5.0, -5.0, 5.0, 5.0) ) is not None
+    assert findTable( groupName ).ownedDirectory is None
+    assert not os.path.exists( directory )
+    removeTable( groupName )
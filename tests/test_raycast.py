@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+import maya.OpenMaya as om
+
+from raycast import MeshSnapshot, TriangleBVH, RayCaster, intersectRaysTriangles
+from selection import compileMeshNames
+from mesh_cache import MeshGeometryCache
+from scatter import checkIntersections
+
+def randomSoup(rng, numTriangles, extent = 10.0, size = 1.5):
+    centers = rng.uniform(-extent, extent, size=(numTriangles, 1, 3))
+    vertices = (centers + rng.uniform(-size, size, size=(numTriangles, 3, 3))).reshape(-1, 3)
+    return MeshSnapshot( vertices, np.arange(len(vertices)).reshape(-1, 3) )
+
+def heightField(resolution = 20, size = 20.0):
+    x, z = np.meshgrid( np.linspace(-size * 0.5, size * 0.5, resolution + 1), np.linspace(-size * 0.5, size * 0.5, resolution + 1) )
+    vertices = np.column_stack(( x.ravel(), np.sin(x.ravel() * 0.5) + np.cos(z.ravel() * 0.3), z.ravel() ))
+    row, col = np.meshgrid( np.arange(resolution), np.arange(resolution), indexing='ij' )
+    corner = (row * (resolution + 1) + col).ravel()
+    triangles = np.concatenate(( np.column_stack(( corner, corner + resolution + 1, corner + 1 )),
+                                 np.column_stack(( corner + 1, corner + resolution + 1, corner + resolution + 2 )) ))
+    return MeshSnapshot( vertices, triangles, faceIds=np.concatenate(( np.arange(len(corner)), np.arange(len(corner)) )) )
+
+def bruteForce(snapshots, origins, directions, maxDistance = np.inf):
+    """ Closest hit of every ray against every triangle of every mesh. """
+    distances = np.full(len(origins), np.inf)
+    meshIndices = np.full(len(origins), -1)
+    triangleIds = np.full(len(origins), -1)
+    for meshIndex, snapshot in enumerate(snapshots):
+        for triangle in range(len(snapshot.triangles)):
+            count = len(origins)
+            hit, t, u, v = intersectRaysTriangles( origins, directions, np.broadcast_to(snapshot.v0[triangle], (count, 3)),
+                                                   np.broadcast_to(snapshot.edge1[triangle], (count, 3)),
+                                                   np.broadcast_to(snapshot.edge2[triangle], (count, 3)) )
+            closer = hit & (t < distances) & (t <= maxDistance)
+            distances[closer] = t[closer]
+            meshIndices[closer] = meshIndex
+            triangleIds[closer] = triangle
+    return distances, meshIndices, triangleIds
+
+def randomRays(rng, count, extent = 12.0):
+    origins = rng.uniform(-extent, extent, size=(count, 3))
+    directions = rng.normal(size=(count, 3))
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+    return origins, directions
+
+def test_bvh_leaves_cover_all_triangles():
+    snapshot = randomSoup(np.random.default_rng(0), 300)
+    bvh = TriangleBVH(snapshot, leafSize=4)
+    assert sorted(bvh.order.tolist()) == list(range(300))
+
+def test_random_rays_match_brute_force():
+    rng = np.random.default_rng(1)
+    snapshots = [ randomSoup(rng, 200), randomSoup(rng, 150) ]
+    origins, directions = randomRays(rng, 2000)
+    hits = RayCaster(snapshots, leafSize=4, batchSize=512).intersect(origins, directions)
+    distances, meshIndices, triangleIds = bruteForce(snapshots, origins, directions)
+
+    assert np.array_equal(hits.hit, np.isfinite(distances))
+    assert np.allclose(hits.distances[hits.hit], distances[hits.hit])
+    assert np.array_equal(hits.meshIndices, meshIndices)
+    assert np.array_equal(hits.triangleIds, triangleIds)
+    assert np.allclose(hits.points[hits.hit], origins[hits.hit] + directions[hits.hit] * distances[hits.hit, None])
+
+def test_max_distance():
+    rng = np.random.default_rng(2)
+    snapshots = [ randomSoup(rng, 200) ]
+    origins, directions = randomRays(rng, 1000)
+    hits = RayCaster(snapshots).intersect(origins, directions, maxDistance=5.0)
+    distances, meshIndices, triangleIds = bruteForce(snapshots, origins, directions, maxDistance=5.0)
+    assert np.array_equal(hits.hit, np.isfinite(distances))
+    assert np.all(hits.distances[hits.hit] <= 5.0)
+    assert np.all(np.isinf(hits.distances[~hits.hit]))
+
+def test_downward_rays_on_height_field():
+    rng = np.random.default_rng(3)
+    snapshot = heightField()
+    origins = np.column_stack(( rng.uniform(-9.5, 9.5, 3000), np.full(3000, 10.0), rng.uniform(-9.5, 9.5, 3000) ))
+    hits = RayCaster([ snapshot ]).intersect(origins, (0.0, -1.0, 0.0))
+    distances, meshIndices, triangleIds = bruteForce([ snapshot ], origins, np.tile((0.0, -1.0, 0.0), (3000, 1)))
+
+    # Every ray over the terrain hits it, at the same height as the brute force
+    assert hits.hit.all()
+    assert np.allclose(hits.distances, distances)
+    assert np.array_equal(hits.faceIds, snapshot.faceIds[hits.triangleIds])
+
+def test_missing_rays():
+    snapshot = heightField()
+    hits = RayCaster([ snapshot ]).intersect([ (0.0, 10.0, 0.0), (50.0, 10.0, 0.0) ], (0.0, 1.0, 0.0))
+    assert not hits.hit.any()
+    assert np.array_equal(hits.meshIndices, [ -1, -1 ])
+
+def test_maya_api_intersections_need_compiled_meshes():
+    om.meshes.clear()
+    om.createGridMesh('terrain', size=20.0, resolution=10, height=lambda x, z: 0.1 * x)
+    meshes = compileMeshNames( ['terrain'], [[]] )
+    caches = [ MeshGeometryCache(mesh.fnMesh) for mesh in meshes ]
+    origin, direction = om.MFloatPoint(1.0, 10.0, 2.0, 1.0), om.MFloatVector(0, -1, 0)
+    found, point, normal = checkIntersections( meshes, origin, direction, caches )
+    assert found and abs( point[1] - 0.1 ) < 1e-5
+    with pytest.raises(TypeError):
+        checkIntersections( [ (meshes[0].fnMesh, []) ], origin, direction, caches )
+    om.meshes.clear()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from scatter_settings import ScatterSettings
+from point_table import findTable
+import instrumentation
+import scatter
+
+pytestmark = pytest.mark.parametrize('terrain', [ (40.0, 20) ], indirect=True)
+
+@pytest.fixture(autouse=True)
+def emptyCache(terrain):
+    scatter.resultCache.clear()
+    instrumentation.enableInstrumentation( printReport=False )
+    yield
+    instrumentation.disableInstrumentation()
+    scatter.setDensityFunction( None )
+    scatter.resultCache.clear()
+
+def scatterTable(settings):
+    table = findTable( scatter.scatterPoints( ['terrain'], settings ) )
+    return table, instrumentation.lastStats.counters.get( 'resultCacheHits', 0 )
+
+def test_repeated_scatter_hits_cache():
+    settings = ScatterSettings( discRadius=1.0, seed=3 )
+    first, firstHits = scatterTable( settings )
+    second, secondHits = scatterTable( settings )
+    assert (firstHits, secondHits) == (0, 1)
+    assert np.array_equal( first.positions, second.positions )
+
+def test_procedural_density_is_not_cached():
+    # Two closures of the same function share their module and name but differ in their density
+    def createDensity(value):
+        def density(x, z):
+            return np.full( np.shape(x), value )
+        return density
+
+    settings = ScatterSettings( sampler='Variable Poisson-Disc', discRadius=0.5, maxDiscRadius=2.0, seed=3 )
+    scatter.setDensityFunction( createDensity(1.0) )
+    dense, denseHits = scatterTable( settings )
+    scatter.setDensityFunction( createDensity(0.0) )
+    sparse, sparseHits = scatterTable( settings )
+    assert (denseHits, sparseHits) == (0, 0)
+    assert len( scatter.resultCache ) == 0
+    assert len( sparse ) < len( dense )
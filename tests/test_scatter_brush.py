@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+import maya.cmds as cmds
+
+from point_table import findTable
+from scatter_settings import ScatterSettings
+from scene_output import readScatterTable
+from scatter_brush import ScatterBrush
+from tests.helpers import minimumDistance
+import scatter
+
+pytestmark = pytest.mark.usefixtures('terrain')
+
+def scatterGroup(output):
+    return scatter.scatterPoints( ['terrain'], ScatterSettings( discRadius=1.5, output=output ) )
+
+@pytest.mark.parametrize('output', [ 'Locators', 'Particles' ])
+def test_stroke_updates_scene_and_table(output):
+    groupName = scatterGroup(output)
+    numPoints = len( findTable(groupName) )
+    brush = ScatterBrush( groupName, brushRadius=6.0, seed=1 )
+
+    numErased = brush.erase(0.0, 0.0)
+    brush.flush()
+    numPainted = 0
+    for step in range(20):
+        numPainted += brush.paint(step * 0.3, 0.0)
+        brush.flush()
+    table = brush.endStroke()
+
+    assert numErased > 0 and numPainted > 0
+    assert len(table) == numPoints - numErased + numPainted
+    assert findTable(groupName) is table
+    assert minimumDistance( table.positions[:, [0, 2]] ) >= 1.5 - 1e-6
+    assert np.allclose( readScatterTable(groupName).positions, table.positions, atol=1e-5 )
+
+def test_painted_points_are_previewed_outside_of_the_group():
+    groupName = scatterGroup('Locators')
+    brush = ScatterBrush( groupName, brushRadius=6.0, seed=2 )
+    brush.erase(10.0, 10.0)
+    brush.flush()
+    numLocators = len( cmds.listRelatives(groupName, children=True) )
+
+    assert brush.paint(10.0, 10.0) > 0
+    brush.flush()
+    # The painted points are a particle preview until the end of the stroke
+    assert cmds.objExists( brush.previewGroup )
+    assert len( cmds.listRelatives(groupName, children=True) ) == numLocators
+
+    previewGroup = brush.previewGroup
+    brush.endStroke()
+    assert not cmds.objExists( previewGroup )
+    assert len( cmds.listRelatives(groupName, children=True) ) > numLocators
+
+def test_flush_calls_do_not_depend_on_the_number_of_points():
+    groupName = scatterGroup('Locators')
+    brush = ScatterBrush( groupName, brushRadius=12.0, seed=3 )
+    brush.erase(0.0, 0.0)
+    brush.flush()
+    callCounts = []
+    for radius in (2.0, 12.0):
+        brush.setBrushRadius(radius)
+        # Enough events to fill the brush within the frame budget of each paint call
+        for step in range(10):
+            brush.erase(radius * 3.0, 0.0)
+            brush.paint(radius * 3.0, 0.0)
+            cmds.commandCounts.clear()
+            brush.flush()
+            callCounts.append( sum(cmds.commandCounts.values()) )
+    assert max(callCounts) <= 20
+
+def test_erasing_painted_points_in_the_same_stroke():
+    groupName = scatterGroup('Locators')
+    brush = ScatterBrush( groupName, brushRadius=5.0, seed=4 )
+    brush.erase(-10.0, -10.0)
+    numPainted = brush.paint(-10.0, -10.0)
+    brush.flush()
+    brush.erase(-10.0, -10.0)
+    brush.flush()
+    # The preview shows the painted points which were not erased again
+    numLeft = len( brush.strokePoints()[0] )
+    assert numLeft < numPainted
+    preview = readScatterTable( brush.previewGroup ) if numLeft > 0 else None
+    assert numLeft == 0 or len(preview) == numLeft
+    table = brush.endStroke()
+    assert np.allclose( readScatterTable(groupName).positions, table.positions, atol=1e-5 )
+
+    # The next stroke removes locators created by the previous one
+    brush.paint(-10.0, -10.0)
+    table = brush.endStroke()
+    brush.erase(-10.0, -10.0)
+    table = brush.endStroke()
+    assert np.allclose( readScatterTable(groupName).positions, table.positions, atol=1e-5 )
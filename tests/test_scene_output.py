@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import maya.cmds as cmds
+
+from point_table import ScatterPointTable
+from scene_output import LocatorBackend, ParticleBackend, readScatterTable, createOutputBackend
+
+@pytest.fixture(autouse=True)
+def scene():
+    cmds.resetScene()
+    yield
+    cmds.resetScene()
+
+def randomColumns(seed, count):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-50, 50, size=(count, 3)), rng.uniform(-180, 180, size=(count, 3)), rng.uniform(0.5, 2.0, count)
+
+def assertTable(table, positions, rotations, scales):
+    assert len(table) == len(positions)
+    assert np.allclose(table.positions, positions)
+    assert np.allclose(table.rotations, rotations)
+    assert np.allclose(table.scales, scales)
+
+@pytest.mark.parametrize('backendClass', [ LocatorBackend, ParticleBackend ])
+def test_write_and_read(backendClass):
+    positions, rotations, scales = randomColumns(0, 50)
+    group = backendClass(cmds).write('ScatterGroup', positions, rotations, scales, (1.0, 0.0, 0.0))
+    assertTable(backendClass(cmds).read(group), positions, rotations, scales)
+    assertTable(readScatterTable(group, cmds), positions, rotations, scales)
+
+@pytest.mark.parametrize('backendClass', [ LocatorBackend, ParticleBackend ])
+def test_append_chunks(backendClass):
+    positions, rotations, scales = randomColumns(1, 60)
+    backend = backendClass(cmds)
+    group = backend.write('ScatterGroup', positions[:25], rotations[:25], scales[:25], (0.0, 1.0, 0.0))
+    backend.append(group, positions[25:], rotations[25:], scales[25:], (0.0, 1.0, 0.0))
+    assertTable(backend.read(group), positions, rotations, scales)
+
+@pytest.mark.parametrize('backendClass', [ LocatorBackend, ParticleBackend ])
+def test_update(backendClass):
+    positions, rotations, scales = randomColumns(2, 40)
+    backend = backendClass(cmds)
+    group = backend.write('ScatterGroup', positions, rotations, scales, (0.0, 0.0, 1.0))
+
+    # Remove some points and add new ones at the end of the table, as a regional re-scatter does
+    removed = [ 3, 4, 17, 39 ]
+    kept = np.setdiff1d(np.arange(40), removed)
+    newPositions, newRotations, newScales = randomColumns(3, 7)
+    table = ScatterPointTable( np.concatenate((positions[kept], newPositions)), np.concatenate((rotations[kept], newRotations)),
+                               np.concatenate((scales[kept], newScales)) )
+    backend.update(group, removed, table, 7, (0.0, 0.0, 1.0))
+    assertTable(backend.read(group), table.positions, table.rotations, table.scales)
+
+def test_locator_update_keeps_other_locators():
+    positions, rotations, scales = randomColumns(4, 20)
+    backend = LocatorBackend(cmds)
+    group = backend.write('ScatterGroup', positions, rotations, scales, (1.0, 1.0, 1.0))
+    before = cmds.listRelatives(group, children=True)
+    table = ScatterPointTable( positions[1:], rotations[1:], scales[1:] )
+    backend.update(group, [ 0 ], table, 0, (1.0, 1.0, 1.0))
+    assert cmds.listRelatives(group, children=True) == before[1:]
+
+def test_particles_use_one_node():
+    positions, rotations, scales = randomColumns(5, 1000)
+    group = ParticleBackend(cmds).write('ScatterGroup', positions, rotations, scales, (1.0, 1.0, 1.0))
+    assert len(cmds.listRelatives(group, allDescendents=True, type='particle')) == 1
+    assert cmds.commandCounts['particle'] == 1
+
+def test_empty_group_reads_none():
+    group = cmds.group(em=True, name='ScatterGroup')
+    assert LocatorBackend(cmds).read(group) is None
+    assert ParticleBackend(cmds).read(group) is None
+    assert readScatterTable(group, cmds) is None
+
+def test_create_output_backend():
+    assert isinstance(createOutputBackend('Locators', cmds), LocatorBackend)
+    assert isinstance(createOutputBackend('Particles', cmds), ParticleBackend)
@@ -0,0 +1,52 @@
+import numpy as np
+
+from variable_radius import DensityMap, MultiLevelGrid, radiusFromDensity, variableRadiusPoissonDiscSampling
+
+def gradient(x, z):
+    # Full density at x = 0, none at x = 40
+    return 1.0 - x / 40.0
+
+def conflicts(points, radii):
+    """ Number of pairs closer than the larger of their radii, by brute force. """
+    offsets = points[:, None, :] - points[None, :, :]
+    distances = np.sqrt( (offsets ** 2).sum(axis=2) )
+    limits = np.maximum( radii[:, None], radii[None, :] )
+    np.fill_diagonal( distances, np.inf )
+    return int( (distances < limits - 1e-9).sum() ) // 2
+
+def test_no_pair_closer_than_larger_radius():
+    points = np.array( variableRadiusPoissonDiscSampling( 0.0, 40.0, 0.0, 20.0, 0.3, 3.0, gradient, seed=1 ) )
+    radii = np.array([ radiusFromDensity( gradient(x, z), 0.3, 3.0 ) for x, z in points ])
+    assert len(points) > 100
+    assert ((points >= 0.0) & (points <= [ 40.0, 20.0 ])).all()
+    assert conflicts( points, radii ) == 0
+    # The dense side holds far more points than the sparse side
+    assert (points[:, 0] < 10.0).sum() > 5 * (points[:, 0] > 30.0).sum()
+
+def test_is_clear_matches_brute_force():
+    rng = np.random.default_rng(2)
+    grid = MultiLevelGrid( 0.0, 0.0, 0.25, 4.0 )
+    points = rng.uniform(0.0, 30.0, size=(300, 2))
+    radii = rng.uniform(0.25, 4.0, 300)
+    for (x, z), radius in zip(points, radii):
+        grid.insert( x, z, radius )
+
+    queries = rng.uniform(-2.0, 32.0, size=(2000, 2))
+    queryRadii = rng.uniform(0.25, 4.0, 2000)
+    distances = np.sqrt( ((queries[:, None, :] - points[None, :, :]) ** 2).sum(axis=2) )
+    expected = (distances >= np.maximum( queryRadii[:, None], radii[None, :] )).all(axis=1)
+    assert [ grid.isClear( x, z, radius ) for (x, z), radius in zip(queries, queryRadii) ] == expected.tolist()
+
+def test_density_map_is_bilinear_with_rows_along_z():
+    values = np.array([ [ 0.0, 1.0 ],
+                        [ 0.5, 0.5 ],
+                        [ 1.0, 0.0 ] ])
+    density = DensityMap( values, 0.0, 10.0, -2.0, 2.0 )
+    # Corners: the first row lies at zMin, the first column at xMin
+    assert density( 0.0, -2.0 ) == 0.0 and density( 10.0, -2.0 ) == 1.0
+    assert density( 0.0, 2.0 ) == 1.0 and density( 10.0, 2.0 ) == 0.0
+    assert abs( density( 5.0, -2.0 ) - 0.5 ) < 1e-12
+    assert abs( density( 2.5, -1.0 ) - 0.375 ) < 1e-12
+    # Outside of the domain the border values are used, functions are clamped to [0, 1]
+    assert density( -5.0, -9.0 ) == 0.0
+    assert DensityMap( lambda x, z: 2.0, 0.0, 1.0, 0.0, 1.0 )( 0.5, 0.5 ) == 1.0